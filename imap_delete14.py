@@ -15,7 +15,7 @@ import sys
 # ------------------------------ templates ------------------------------
 # Keep long text in module-level constants so functions stay tiny.
 
-T_README = """# IMAP Delete Tool
+T_README = '''# IMAP Delete Tool
 
 Graceful IMAP mailbox cleaner with batching, rate limiting, and excellent
 user feedback.
@@ -36,11 +36,11 @@ python3 -m imap_delete --help
 python3 -m imap_delete --user you@gmail.com --password 'app_pass' --dry-run
 
 # Delete emails before 2020
-python3 -m imap_delete --user you@gmail.com --password 'app_pass' \
+python3 -m imap_delete --user you@gmail.com --password 'app_pass' \\
     --query 'BEFORE 1-Jan-2020' --i-understand-this-deletes-mail
 
 # Custom server
-python3 -m imap_delete --server imap.example.com --port 993 \
+python3 -m imap_delete --server imap.example.com --port 993 \\
     --user you@example.com --password 'pass' --dry-run
 ```
 
@@ -64,13 +64,13 @@ pytest -q
 
 Use an App Password, not your regular password.
 Generate one at: https://myaccount.google.com/apppasswords
-"""
+'''
 
-T_REQUIREMENTS = """pytest>=7.0.0
+T_REQUIREMENTS = '''pytest>=7.0.0
 mypy>=1.10.0
-"""
+'''
 
-T_SETUP = """from setuptools import setup, find_packages
+T_SETUP = '''from setuptools import setup, find_packages
 
 setup(
     name="imap-delete",
@@ -84,15 +84,14 @@ setup(
         ],
     },
 )
-"""
+'''
 
-T_INIT = """"""IMAP Delete Tool - Graceful mailbox cleaner."""\
-"""
+T_INIT = '''"""IMAP Delete Tool - Graceful mailbox cleaner."""
 __all__ = ["__version__"]
 __version__ = "1.0.0"
-"""
+'''
 
-T_CONFIG = """"""Configuration constants."""
+T_CONFIG = '''"""Configuration constants."""
 
 DEFAULT_SERVER = "imap.gmail.com"
 DEFAULT_PORT = 993
@@ -103,12 +102,13 @@ BATCH_SIZE = 50
 RATE_LIMIT_DELAY = 0.1
 CONNECTION_TIMEOUT = 30
 MAX_RETRIES = 3
-"""
+NOOP_INTERVAL = 240  # seconds; stays well under Gmail's idle drop
+'''
 
-T_BATCH = """"""Batch helpers."""
+T_BATCH = '''"""Batch helpers."""
 from __future__ import annotations
 
-from typing import List
+from typing import Sequence
 from .config import BATCH_SIZE
 
 
@@ -117,81 +117,127 @@ def calculate_total_batches(total: int) -> int:
     return (total + BATCH_SIZE - 1) // BATCH_SIZE
 
 
-def make_message_set(batch: List[bytes]) -> bytes:
-    """IMAP message set from a batch of ids."""
-    return b",".join(batch)
-"""
+def make_message_set(batch: Sequence[int]) -> bytes:
+    """IMAP message set from a batch of integer ids."""
+    return ",".join(map(str, batch)).encode("ascii")
+'''
 
-T_DELETION = """"""Deletion operations - marking and expunging."""
+T_DELETION = '''"""Deletion operations - marking and expunging."""
 from __future__ import annotations
 
 import imaplib
+import sys
 import time
 import logging
-from typing import Iterable, List
+from typing import Optional, Sequence
 
-from .config import DELETED_FLAG, BATCH_SIZE, RATE_LIMIT_DELAY, MAX_RETRIES
+from .config import (
+    DELETED_FLAG, BATCH_SIZE, RATE_LIMIT_DELAY, MAX_RETRIES, NOOP_INTERVAL,
+)
 from .batch import calculate_total_batches, make_message_set
+from .sizing import imap_fetch_set_size
+
+# Pre-encoded STORE arguments; imaplib.store() would re-wrap and re-encode
+# the str flag on every batch. .SILENT stops the server echoing one FETCH
+# per message, which _simple_command would leave queued in untagged_responses.
+_STORE_OP = b"+FLAGS.SILENT"
+_DELETED_FLAGS = b"(" + DELETED_FLAG.encode("ascii") + b")"
 
+# Without a tty, one summary record every N batches replaces the chatter.
+PROGRESS_LOG_EVERY = 10
 
-def _store(
+
+def _try_store(
     imap: imaplib.IMAP4_SSL, msg_set: bytes
-) -> None:
-    """Single STORE call, isolated for retry wrapper."""
-    imap.store(msg_set, "+FLAGS", DELETED_FLAG)
+) -> Optional[BaseException]:
+    """One STORE; return a transient error or NO reply instead of raising."""
+    try:
+        typ, data = imap._simple_command(
+            "STORE", msg_set, _STORE_OP, _DELETED_FLAGS)
+    except (imaplib.IMAP4.abort, OSError) as err:
+        return err
+    if typ != "OK":
+        return imaplib.IMAP4.error(f"STORE returned {typ}: {data}")
+    return None
 
 
 def _retry_store(
     imap: imaplib.IMAP4_SSL, msg_set: bytes, log: logging.Logger,
     batch_num: int, total_batches: int
 ) -> None:
-    """Retry STORE with basic backoff."""
+    """Retry STORE with basic backoff; raise only on terminal failure."""
+    err: Optional[BaseException] = None
     for attempt in range(MAX_RETRIES):
-        try:
-            _store(imap, msg_set)
+        err = _try_store(imap, msg_set)
+        if err is None:
             return
-        except (imaplib.IMAP4.abort, OSError) as err:
-            if attempt == MAX_RETRIES - 1:
-                log.error(
-                    "✗ Batch %d/%d failed after %d attempts",
-                    batch_num, total_batches, MAX_RETRIES,
-                )
-                raise RuntimeError(f"Failed after {MAX_RETRIES}: {err}")
-            log.warning(
-                "Retry %d/%d for batch %d...",
-                attempt + 1, MAX_RETRIES, batch_num,
-            )
+        if attempt < MAX_RETRIES - 1:
+            log.warning("Retry %d/%d for batch %d...",
+                        attempt + 1, MAX_RETRIES, batch_num)
             time.sleep(1)
+    log.error("✗ Batch %d/%d failed after %d attempts",
+              batch_num, total_batches, MAX_RETRIES)
+    raise RuntimeError(f"Failed after {MAX_RETRIES}: {err}")
 
 
-def _mark_batch(
-    imap: imaplib.IMAP4_SSL, batch: List[bytes], batch_num: int,
-    total_batches: int, log: logging.Logger
+def _process_batch(
+    imap: imaplib.IMAP4_SSL, batch: Sequence[int], batch_num: int,
+    total_batches: int, log: logging.Logger, mark: bool
 ) -> int:
-    """Mark a single batch as deleted."""
+    """FETCH a batch's total size and, when mark is set, flag it deleted."""
     msg_set = make_message_set(batch)
-    log.info(
-        "Batch %d/%d: Marking %d messages...",
-        batch_num, total_batches, len(batch),
-    )
-    _retry_store(imap, msg_set, log, batch_num, total_batches)
-    log.info("✓ Batch %d/%d complete", batch_num, total_batches)
-    return len(batch)
+    size = imap_fetch_set_size(imap, msg_set)
+    if mark:
+        _retry_store(imap, msg_set, log, batch_num, total_batches)
+    return size
 
 
-def imap_mark_deleted(
-    imap: imaplib.IMAP4_SSL, ids: Iterable[bytes], log: logging.Logger
+def _progress(bnum: int, total_batches: int, done: int, total: int) -> None:
+    """Rewrite one tty status line instead of emitting a log record."""
+    end = "\\n" if bnum == total_batches else ""
+    sys.stderr.write(f"\\r[{bnum}/{total_batches}] {done}/{total} msgs{end}")
+    sys.stderr.flush()
+
+
+def _report_batch(
+    log: logging.Logger, bnum: int, total_batches: int, done: int, total: int
+) -> None:
+    """Log first/last batch (all when verbose); progress line otherwise."""
+    if bnum > 1 and not log.isEnabledFor(logging.DEBUG):
+        tty = sys.stderr.isatty()
+        if tty:
+            _progress(bnum, total_batches, done, total)
+        if bnum < total_batches and (tty or bnum % PROGRESS_LOG_EVERY):
+            return
+    log.info("✓ Batch %d/%d complete (%d/%d messages)",
+             bnum, total_batches, done, total)
+
+
+def _between_batches(imap: imaplib.IMAP4_SSL, last_noop: float) -> float:
+    """Rate-limit sleep plus a NOOP once the session nears idle timeout."""
+    time.sleep(RATE_LIMIT_DELAY)
+    now = time.monotonic()
+    if now - last_noop < NOOP_INTERVAL:
+        return last_noop
+    imap.noop()
+    return now
+
+
+def imap_fetch_and_mark(
+    imap: imaplib.IMAP4_SSL, ids: Sequence[int], log: logging.Logger,
+    mark: bool,
 ) -> int:
-    """Mark ids as deleted in rate-limited batches."""
-    id_list = list(ids)
-    count = 0
-    total_batches = calculate_total_batches(len(id_list))
-    for bnum, i in enumerate(range(0, len(id_list), BATCH_SIZE), 1):
-        batch = id_list[i:i + BATCH_SIZE]
-        count += _mark_batch(imap, batch, bnum, total_batches, log)
-        if i + BATCH_SIZE < len(id_list):
-            time.sleep(RATE_LIMIT_DELAY)
-    return count
+    """Single walk over ids: sum sizes, flag deleted when mark is set."""
+    total = 0
+    last_noop = time.monotonic()
+    total_batches = calculate_total_batches(len(ids))
+    for bnum, i in enumerate(range(0, len(ids), BATCH_SIZE), 1):
+        batch = ids[i:i + BATCH_SIZE]
+        total += _process_batch(imap, batch, bnum, total_batches, log, mark)
+        _report_batch(log, bnum, total_batches, i + len(batch), len(ids))
+        if i + BATCH_SIZE < len(ids):
+            last_noop = _between_batches(imap, last_noop)
+    return total
 
 
 def imap_expunge(imap: imaplib.IMAP4_SSL) -> None:
@@ -200,33 +246,33 @@ def imap_expunge(imap: imaplib.IMAP4_SSL) -> None:
         imap.expunge()
     except imaplib.IMAP4.abort as err:
         raise RuntimeError(f"Expunge failed (server may be slow): {err}")
-"""
+'''
 
-T_UTILS = """"""Utility functions."""
+T_UTILS = '''"""Utility functions."""
 from __future__ import annotations
 
 import logging
+import re
+import time
+
+# Built once at import: callers run per log line / per FETCH response.
+_LOG_FORMAT = "%(asctime)s %(levelname)5s %(message)s"
+_UNITS = ("B", "KB", "MB", "GB", "TB")
+_SIZE_RE = re.compile(rb"RFC822\\.SIZE\\s+(\\d+)")
 
 
 def human_size(n: int) -> str:
     """Convert bytes to a compact human-readable string."""
-    units = ("B", "KB", "MB", "GB", "TB")
-    size = float(n)
-    for u in units:
-        if size < 1024 or u == "TB":
-            return f"{size:.1f}{u}"
-        size /= 1024
-    return f"{size:.1f}TB"
+    if n < 1024:
+        return f"{float(n):.1f}B"
+    idx = min((n.bit_length() - 1) // 10, len(_UNITS) - 1)
+    return f"{n / (1 << (idx * 10)):.1f}{_UNITS[idx]}"
 
 
 def parse_size_from_fetch(resp: bytes) -> int:
     """Parse RFC822.SIZE from IMAP fetch response; return 0 if absent."""
-    try:
-        txt = resp.decode(errors="ignore")
-        part = txt.split("RFC822.SIZE", 1)[1]
-        return int(part.strip(" )"))
-    except Exception:
-        return 0
+    match = _SIZE_RE.search(resp)
+    return int(match.group(1)) if match else 0
 
 
 def should_delete(dry_run: bool, confirmed: bool) -> bool:
@@ -234,22 +280,43 @@ def should_delete(dry_run: bool, confirmed: bool) -> bool:
     return (not dry_run) and confirmed
 
 
+class _SecondCacheFormatter(logging.Formatter):
+    """Formatter that runs strftime at most once per wall-clock second."""
+
+    _last_sec = -1
+    _last_str = ""
+
+    def formatTime(
+        self, record: logging.LogRecord, datefmt: str | None = None
+    ) -> str:
+        """Same output as the default asctime, cached per second."""
+        sec = int(record.created)
+        if sec != self._last_sec:
+            stamp = self.converter(record.created)
+            self._last_str = time.strftime(self.default_time_format, stamp)
+            self._last_sec = sec
+        return self.default_msec_format % (self._last_str, record.msecs)
+
+
 def setup_logger(verbose: bool) -> logging.Logger:
     """Configure root logger and return named logger."""
     level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        format="%(asctime)s %(levelname)5s %(message)s", level=level
-    )
+    handler = logging.StreamHandler()
+    handler.setFormatter(_SecondCacheFormatter(_LOG_FORMAT))
+    logging.basicConfig(level=level, handlers=[handler])
     return logging.getLogger("imap-delete")
-"""
+'''
 
-T_IMAP_OPS = """"""IMAP operations - connection and selection."""
+T_IMAP_OPS = '''"""IMAP operations - connection and selection."""
 from __future__ import annotations
 
+import array
 import imaplib
-from typing import List
+import re
 from .config import CONNECTION_TIMEOUT
 
+_ID_RE = re.compile(rb"\\d+")
+
 
 def imap_connect(
     server: str, port: int, user: str, password: str
@@ -278,20 +345,30 @@ def _warn_large(count: int) -> None:
     )
 
 
-def imap_search(imap: imaplib.IMAP4_SSL, query: str) -> List[bytes]:
-    """Run IMAP SEARCH and return a list of ids (bytes)."""
+def _parse_ids(raw: bytes) -> array.array[int]:
+    """Pack SEARCH ids into a uint64 array (8 bytes each, no bytes objs)."""
+    ids = array.array("Q")
+    ids.extend(int(m.group()) for m in _ID_RE.finditer(raw))
+    return ids
+
+
+def imap_search(imap: imaplib.IMAP4_SSL, query: str) -> array.array[int]:
+    """Run IMAP SEARCH and return the matching ids as packed integers."""
     typ, data = imap.search(None, query)
     if typ != "OK":
         raise RuntimeError(f"search failed: {typ} {data}")
-    result = data[0].split() if data and data[0] else []
+    result = _parse_ids(data[0] if data and data[0] else b"")
     _warn_large(len(result))
     return result
 
 
 def close_imap_mailbox(imap: imaplib.IMAP4_SSL) -> None:
-    """Close mailbox gently; ignore errors."""
+    """Deselect mailbox gently; UNSELECT (RFC 3691) skips CLOSE's expunge."""
     try:
-        imap.close()
+        if "UNSELECT" in imap.capabilities:
+            imap.unselect()
+        else:
+            imap.close()
     except (imaplib.IMAP4.error, OSError):
         pass
 
@@ -302,9 +379,9 @@ def logout_imap(imap: imaplib.IMAP4_SSL) -> None:
         imap.logout()
     except (imaplib.IMAP4.error, OSError):
         pass
-"""
+'''
 
-T_CLI = """"""Command-line argument parsing."""
+T_CLI = '''"""Command-line argument parsing."""
 from __future__ import annotations
 
 import argparse
@@ -355,9 +432,9 @@ def build_parser() -> argparse.ArgumentParser:
     _add_safety(p)
     _add_logging(p)
     return p
-"""
+'''
 
-T_LOGGING = """"""Logging and output helpers."""
+T_LOGGING = '''"""Logging and output helpers."""
 from __future__ import annotations
 
 from .utils import human_size
@@ -424,35 +501,35 @@ def log_missing_confirmation(log) -> None:
     log.info("   Add this flag to confirm deletion:")
     log.info("   --i-understand-this-deletes-mail")
     log.info("")
-"""
+'''
 
-T_SIZING = """"""Fetch and estimate sizes for a set of ids."""
+T_SIZING = '''"""Fetch and estimate sizes for a set of ids."""
 from __future__ import annotations
 
 import imaplib
-from typing import Iterable
+from typing import Union
 from .utils import parse_size_from_fetch
 
 
-def imap_fetch_sizes(
-    imap: imaplib.IMAP4_SSL, ids: Iterable[bytes], log
-) -> int:
-    """Fetch RFC822.SIZE for each id and sum them."""
-    total = 0
-    for mid in ids:
-        typ, data = imap.fetch(mid, b"(RFC822.SIZE)")
-        if typ == "OK" and data and isinstance(data[0], tuple):
-            total += parse_size_from_fetch(data[0][1])
-    return total
-"""
+def _fetch_line(item: Union[bytes, tuple]) -> bytes:
+    """Response line of a FETCH item (literal items arrive as tuples)."""
+    return item[0] if isinstance(item, tuple) else item
+
+
+def imap_fetch_set_size(imap: imaplib.IMAP4_SSL, msg_set: bytes) -> int:
+    """One FETCH of RFC822.SIZE for a whole message set; sum the sizes."""
+    typ, data = imap.fetch(msg_set, "(RFC822.SIZE)")
+    if typ != "OK" or not data:
+        return 0
+    return sum(parse_size_from_fetch(_fetch_line(it)) for it in data if it)
+'''
 
-T_WORKFLOW = """"""High-level workflow orchestration."""
+T_WORKFLOW = '''"""High-level workflow orchestration."""
 from __future__ import annotations
 
-from typing import List
+from typing import Sequence
 from .imap_ops import imap_connect, imap_select, imap_search
-from .sizing import imap_fetch_sizes
-from .deletion import imap_mark_deleted, imap_expunge
+from .deletion import imap_fetch_and_mark, imap_expunge
 from .logging import (
     log_deletion_start, log_deletion_complete, log_expunge_complete,
     log_dry_run_info, log_missing_confirmation,
@@ -460,14 +537,25 @@ from .logging import (
 from .utils import human_size
 
 
-def do_delete_flow(imap, ids: List[bytes], log) -> None:
-    log_deletion_start(log, len(ids))
-    deleted = imap_mark_deleted(imap, ids, log)
-    log_deletion_complete(log, deleted)
+def _finish_deletion(imap, count: int, log) -> None:
+    log_deletion_complete(log, count)
     imap_expunge(imap)
     log_expunge_complete(log)
 
 
+def do_fused_flow(imap, ids: Sequence[int], log, dry_run: bool) -> int:
+    """One pass: batched size FETCH, plus STORE/EXPUNGE unless dry_run."""
+    if dry_run:
+        log.info("")
+    else:
+        log_deletion_start(log, len(ids))
+    size_est = imap_fetch_and_mark(imap, ids, log, mark=not dry_run)
+    log.info("✓ Size calculation complete: %s total", human_size(size_est))
+    if not dry_run:
+        _finish_deletion(imap, len(ids), log)
+    return size_est
+
+
 def handle_no_deletion(args, log) -> None:
     if args.dry_run:
         log_dry_run_info(log)
@@ -488,21 +576,14 @@ def select_mailbox(imap, mailbox: str, log) -> None:
     log.info("✓ Mailbox selected")
 
 
-def search_messages(imap, query: str, log) -> List[bytes]:
+def search_messages(imap, query: str, log) -> Sequence[int]:
     log.info("🔍 Searching for messages matching: %r", query)
     ids = imap_search(imap, query)
     log.info("✓ Found %d message(s)", len(ids))
     return ids
+'''
 
-
-def calculate_sizes(imap, ids: List[bytes], log) -> int:
-    log.info("")
-    size_est = imap_fetch_sizes(imap, ids, log)
-    log.info("✓ Size calculation complete: %s total", human_size(size_est))
-    return size_est
-"""
-
-T_SESSION = """"""Session cleanup helpers."""
+T_SESSION = '''"""Session cleanup helpers."""
 from __future__ import annotations
 
 from .imap_ops import close_imap_mailbox, logout_imap
@@ -514,9 +595,9 @@ def close_session(imap, log) -> None:
     close_imap_mailbox(imap)
     logout_imap(imap)
     log.info("✓ Disconnected")
-"""
+'''
 
-T_MAIN = """"""Main entry point."""
+T_MAIN = '''"""Main entry point."""
 from __future__ import annotations
 
 import time
@@ -526,7 +607,7 @@ from .session import close_session
 from .logging import log_summary, print_header
 from .workflow import (
     connect_and_auth, select_mailbox, search_messages,
-    calculate_sizes, do_delete_flow, handle_no_deletion,
+    do_fused_flow, handle_no_deletion,
 )
 
 
@@ -545,13 +626,13 @@ def run() -> int:
         if not ids:
             log.info("No messages to process!")
             return 0
-        size_est = calculate_sizes(imap, ids, log)
+        delete = should_delete(args.dry_run,
+                               args.i_understand_this_deletes_mail)
+        size_est = do_fused_flow(imap, ids, log, dry_run=not delete)
         elapsed = time.time() - start
         log_summary(log, args.mailbox, len(ids), size_est, elapsed,
                     args.dry_run)
-        if should_delete(args.dry_run, args.i_understand_this_deletes_mail):
-            do_delete_flow(imap, ids, log)
-        else:
+        if not delete:
             handle_no_deletion(args, log)
         return 0
     finally:
@@ -560,12 +641,14 @@ def run() -> int:
 
 def main() -> None:
     raise SystemExit(run())
-"""
+'''
 
-T_TESTS = """"""Test suite for IMAP delete tool."""
+T_TESTS = '''"""Test suite for IMAP delete tool."""
 import pytest
 from imap_delete.utils import human_size, parse_size_from_fetch, should_delete
+from imap_delete.batch import make_message_set
 from imap_delete.config import DELETED_FLAG
+from imap_delete.imap_ops import _parse_ids
 
 
 def test_should_delete_guard_dry_run() -> None:
@@ -582,6 +665,12 @@ def test_human_size_rounding() -> None:
     assert human_size(1048576) == "1.0MB"
 
 
+def test_human_size_unit_boundaries() -> None:
+    assert human_size(1023 * 1024) == "1023.0KB"
+    assert human_size(1 << 40) == "1.0TB"
+    assert human_size(1 << 50) == "1024.0TB"
+
+
 def test_parse_size_from_fetch_ok() -> None:
     resp = b"1 (RFC822.SIZE 12345)"
     assert parse_size_from_fetch(resp) == 12345
@@ -591,11 +680,22 @@ def test_parse_size_from_fetch_bad() -> None:
     assert parse_size_from_fetch(b"garbage") == 0
 
 
+def test_make_message_set_from_ints() -> None:
+    assert make_message_set([3, 17, 42]) == b"3,17,42"
+
+
+def test_parse_ids_packs_search_response() -> None:
+    ids = _parse_ids(b"1 22 333")
+    assert ids.typecode == "Q"
+    assert list(ids) == [1, 22, 333]
+    assert len(_parse_ids(b"")) == 0
+
+
 def test_deleted_flag_format() -> None:
     assert DELETED_FLAG == r"\\Deleted"
-"""
+'''
 
-T_GITIGNORE = """__pycache__/
+T_GITIGNORE = '''__pycache__/
 *.py[cod]
 *$py.class
 *.so
@@ -621,9 +721,9 @@ htmlcov/
 .env
 venv/
 ENV/
-"""
+'''
 
-T_PYPROJECT = """[tool.mypy]
+T_PYPROJECT = '''[tool.mypy]
 python_version = "3.9"
 ignore_missing_imports = true
 strict = true
@@ -636,19 +736,38 @@ warn_unreachable = true
 
 [tool.pytest.ini_options]
 addopts = "-q"
-"""
+'''
 
 # ------------------------------ generator ------------------------------
 
+# Templates are constants, so encode each one once at import.
+_TEMPLATES_B: Dict[str, bytes] = {
+    name: text.encode("utf-8")
+    for name, text in list(globals().items())
+    if name.startswith("T_")
+}
+
+
 def _root() -> Path:
     """Project root path."""
     return Path("imap-delete")
 
 
-def _write(path: Path, content: str) -> None:
-    """Create parent dirs and write content."""
+def _unchanged(path: Path, data: bytes) -> bool:
+    """True when path already holds exactly data (cheap size check first)."""
+    try:
+        return path.stat().st_size == len(data) and path.read_bytes() == data
+    except OSError:
+        return False
+
+
+def _write(path: Path, data: bytes) -> None:
+    """Create parent dirs and write data unless it is already there."""
+    if _unchanged(path, data):  # keep mtimes so tool caches stay valid
+        print(f"= Unchanged {path.as_posix()}")
+        return
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content)
+    path.write_bytes(data)
     print(f"✓ Created {path.as_posix()}")
 
 
@@ -662,28 +781,29 @@ def _tests_path(*parts: str) -> Path:
     return _root().joinpath("tests", *parts)
 
 
-def _files() -> List[Tuple[Path, str]]:
+def _files() -> List[Tuple[Path, bytes]]:
     """All files to generate as (path, content) tuples."""
     return [
-        (_root().joinpath("README.md"), T_README),
-        (_root().joinpath("requirements.txt"), T_REQUIREMENTS),
-        (_root().joinpath("setup.py"), T_SETUP),
-        (_pkg_path("__init__.py"), T_INIT),
-        (_pkg_path("config.py"), T_CONFIG),
-        (_pkg_path("batch.py"), T_BATCH),
-        (_pkg_path("deletion.py"), T_DELETION),
-        (_pkg_path("utils.py"), T_UTILS),
-        (_pkg_path("imap_ops.py"), T_IMAP_OPS),
-        (_pkg_path("cli.py"), T_CLI),
-        (_pkg_path("logging.py"), T_LOGGING),
-        (_pkg_path("sizing.py"), T_SIZING),
-        (_pkg_path("workflow.py"), T_WORKFLOW),
-        (_pkg_path("session.py"), T_SESSION),
-        (_pkg_path("main.py"), T_MAIN),
-        (_tests_path("__init__.py"), ""),
-        (_tests_path("test_imap_delete.py"), T_TESTS),
-        (_root().joinpath(".gitignore"), T_GITIGNORE),
-        (_root().joinpath("pyproject.toml"), T_PYPROJECT),
+        (_root().joinpath("README.md"), _TEMPLATES_B["T_README"]),
+        (_root().joinpath("requirements.txt"),
+         _TEMPLATES_B["T_REQUIREMENTS"]),
+        (_root().joinpath("setup.py"), _TEMPLATES_B["T_SETUP"]),
+        (_pkg_path("__init__.py"), _TEMPLATES_B["T_INIT"]),
+        (_pkg_path("config.py"), _TEMPLATES_B["T_CONFIG"]),
+        (_pkg_path("batch.py"), _TEMPLATES_B["T_BATCH"]),
+        (_pkg_path("deletion.py"), _TEMPLATES_B["T_DELETION"]),
+        (_pkg_path("utils.py"), _TEMPLATES_B["T_UTILS"]),
+        (_pkg_path("imap_ops.py"), _TEMPLATES_B["T_IMAP_OPS"]),
+        (_pkg_path("cli.py"), _TEMPLATES_B["T_CLI"]),
+        (_pkg_path("logging.py"), _TEMPLATES_B["T_LOGGING"]),
+        (_pkg_path("sizing.py"), _TEMPLATES_B["T_SIZING"]),
+        (_pkg_path("workflow.py"), _TEMPLATES_B["T_WORKFLOW"]),
+        (_pkg_path("session.py"), _TEMPLATES_B["T_SESSION"]),
+        (_pkg_path("main.py"), _TEMPLATES_B["T_MAIN"]),
+        (_tests_path("__init__.py"), b""),
+        (_tests_path("test_imap_delete.py"), _TEMPLATES_B["T_TESTS"]),
+        (_root().joinpath(".gitignore"), _TEMPLATES_B["T_GITIGNORE"]),
+        (_root().joinpath("pyproject.toml"), _TEMPLATES_B["T_PYPROJECT"]),
     ]
 
 
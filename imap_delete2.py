@@ -5,7 +5,7 @@ gmail_imap_delete.py
 Carefully delete Gmail messages over IMAP in small batches without hammering the server.
 
 Features
-- Proper IMAP quoting and modified UTF-7 handling of mailbox names.
+- Proper IMAP quoting of mailbox names; no dependency on an 'imap4-utf-7' codec.
 - Small batch UID deletion with pauses and exponential backoff.
 - Safe processing order: labels first -> All Mail -> Trash/Spam purge.
 - Dry-run by default; requires explicit destructive confirmation flag.
@@ -25,20 +25,29 @@ Usage (XOAUTH2: you supply an access token):
 from __future__ import annotations
 
 import argparse
+import hashlib
 import imaplib
+import json
 import logging
 import os
+import random
 import re
 import signal
 import socket
+import ssl
 import sys
+import threading
 import time
-from typing import Iterable, List, Sequence, Tuple, Optional, Set
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Sequence, Tuple, Optional, Set
 
 # ---- Constants --------------------------------------------------------------
 
 GMAIL_IMAP_HOST = "imap.gmail.com"
 GMAIL_IMAP_PORT_SSL = 993
+imaplib.Commands.setdefault('COMPRESS', ('AUTH', 'SELECTED'))  # RFC 4978; unknown to imaplib
 
 SPECIAL_FLAG_MAP = {
     br'\All': 'all',
@@ -46,19 +55,33 @@ SPECIAL_FLAG_MAP = {
     br'\Junk': 'spam',
     br'\Spam': 'spam',
 }
+# LIST rows that can't be SELECTed, e.g. Gmail's "[Gmail]" parent (compared lowercased)
+NOSELECT_FLAGS = frozenset({br'\noselect', br'\nonexistent'})
 
-MAILBOX_LINE_RE = re.compile(
-    rb'^\((?P<flags>[^)]*)\)\s+"(?P<sep>[^"]+)"\s+(?P<name>.+)$'
-)
+STATUS_MESSAGES_RE = re.compile(rb'MESSAGES\s+(\d+)')
+STATUS_UIDNEXT_RE = re.compile(rb'UIDNEXT\s+(\d+)')
 
-DEFAULT_BATCH_SIZE = 50
+DEFAULT_BATCH_SIZE = 500
+SEARCH_WINDOW = 10000  # messages expected per windowed UID SEARCH
+MAX_UID_SET_CHARS = 7000  # RFC 2683 §3.2.1.5: servers take >= 8000-octet command lines
 DEFAULT_PAUSE = 0.5
+ADAPTIVE_OK_STREAK = 5  # clean batches before the adaptive pause halves
+DEFAULT_MAX_CONNECTIONS = 4  # Gmail allows ~15 per account; stay well below
+KEEPALIVE_INTERVAL = 25 * 60  # seconds; Gmail drops sessions idle for ~30 min
 MAX_RETRIES = 5
 BASE_BACKOFF = 0.8
-BACKOFF_JITTER = 0.25  # seconds
+MAX_BACKOFF = 30.0  # seconds; cap for a single retry sleep
+MAX_RETRY_SECONDS = 30.0  # wall-clock budget for one command's retries
+# Response codes for NO replies that retrying cannot fix
+UNRECOVERABLE_CODES = (b'[PARSE]', b'[AUTHENTICATIONFAILED]', b'[ALERT]', b'[OVERQUOTA]', b'[NONEXISTENT]',
+                       b'[TRYCREATE]')
+
+FOLDER_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "gmail_imap_delete")
+FOLDER_CACHE_MAX_AGE = 24 * 3600  # seconds
 
 # global stop flag for graceful shutdown
 STOP_REQUESTED = False
+_folder_cache_in_use: Optional[str] = None  # set when LIST was served from disk
 
 
 # ---- Utilities --------------------------------------------------------------
@@ -76,13 +99,70 @@ def setup_logging(verbosity: int) -> None:
     )
 
 
-def chunked(seq: Sequence[bytes], size: int) -> Iterable[Sequence[bytes]]:
+def chunked(seq: Sequence[int], size: int) -> Iterable[Sequence[int]]:
     for i in range(0, len(seq), size):
         yield seq[i:i + size]
 
 
-def uid_str(uids: Sequence[bytes]) -> str:
-    return ",".join(u.decode() if isinstance(u, (bytes, bytearray)) else str(u) for u in uids)
+def _uid_run(lo: int, hi: int) -> str:
+    return str(lo) if lo == hi else f"{lo}:{hi}"
+
+
+def parse_uids(raw: Optional[bytes]) -> array:
+    """SEARCH response -> ascending UIDs, parsed once into a compact 64-bit array."""
+    return array('Q', sorted(map(int, raw.split()))) if raw else array('Q')
+
+
+def _uid_spans(nums: Sequence[int], lo: int, hi: int, runs: List[Tuple[int, int]]) -> None:
+    """Collect runs of ascending nums[lo:hi]; a span exactly as wide as it is long is one run."""
+    dense = nums[hi - 1] - nums[lo] == hi - 1 - lo
+    if not dense and hi - lo > 32:
+        mid = (lo + hi) // 2
+        _uid_spans(nums, lo, mid, runs)
+        _uid_spans(nums, mid, hi, runs)
+        return
+    start = prev = nums[lo]
+    if runs and runs[-1][1] + 1 == start:
+        start = runs.pop()[0]  # continue the run the previous span ended with
+    if dense:
+        runs.append((start, nums[hi - 1]))
+        return
+    # Short fragmented span: a plain scan beats further bisection
+    for n in nums[lo + 1:hi]:
+        if n != prev + 1:
+            runs.append((start, prev))
+            start = n
+        prev = n
+    runs.append((start, prev))
+
+
+def uid_str(uids: Sequence[int]) -> str:
+    """
+    Compact sequence set for ascending UIDs, e.g. 1,2,3,7,9,10 -> '1:3,7,9:10'.
+    Dense stretches are found by bisection, so cost follows the number of runs
+    rather than the number of UIDs.
+    """
+    if not len(uids):
+        return ""
+    runs: List[Tuple[int, int]] = []
+    _uid_spans(uids, 0, len(uids), runs)
+    return ",".join(_uid_run(lo, hi) for lo, hi in runs)
+
+
+def uid_batches(uids: Sequence[int], size: int) -> Iterable[Tuple[Sequence[int], str]]:
+    """Yield (batch, sequence set); halve any batch whose set exceeds MAX_UID_SET_CHARS."""
+    for batch in chunked(uids, size):
+        yield from _bounded_uid_sets(batch)
+
+
+def _bounded_uid_sets(batch: Sequence[int]) -> Iterable[Tuple[Sequence[int], str]]:
+    us = uid_str(batch)
+    if len(us) <= MAX_UID_SET_CHARS or len(batch) == 1:
+        yield batch, us
+        return
+    mid = len(batch) // 2
+    yield from _bounded_uid_sets(batch[:mid])
+    yield from _bounded_uid_sets(batch[mid:])
 
 
 def imap_quote_mailbox(name: str | bytes) -> str:
@@ -91,26 +171,31 @@ def imap_quote_mailbox(name: str | bytes) -> str:
     Input may be bytes (modified UTF-7) or str; output is a quoted str.
     """
     if isinstance(name, (bytes, bytearray)):
-        # Gmail LIST returns modified UTF-7; decode to str
-        name = name.decode('imap4-utf-7', errors='strict')
+        # Names from LIST are already modified UTF-7 on the wire; keep the bytes
+        b = bytes(name)
+    else:
+        b = name.encode('utf-8', errors='backslashreplace')
     # Escape backslash and double-quote per RFC
-    name = name.replace('\\', '\\\\').replace('"', r'\"')
-    return f'"{name}"'
+    b = b.replace(b'\\', b'\\\\').replace(b'"', b'\\"')
+    # imaplib wants str; latin-1 round-trips bytes 1:1
+    return '"' + b.decode('latin-1') + '"'
 
 
 def parse_list_line(raw: bytes) -> Tuple[Set[bytes], bytes, bytes]:
     """
     Parse IMAP LIST raw line: returns (flags, delimiter, name) as bytes.
     """
-    m = MAILBOX_LINE_RE.match(raw)
-    if not m:
+    # Sliced by hand: '(flags) "sep" name' needs no regex backtracking
+    close = raw.find(b')') if raw.startswith(b'(') else -1
+    rest = raw[close + 1:].lstrip() if close > 0 else b''
+    sep_end = rest.find(b'"', 1) if rest.startswith(b'"') else -1
+    if sep_end < 2:
         # Fall back to a lightweight parse
         return set(), b'/', raw.strip().strip(b'"')
-    flags = set(m.group('flags').split())
-    name = m.group('name').strip()
+    name = rest[sep_end + 1:].strip()
     if name.startswith(b'"') and name.endswith(b'"'):
         name = name[1:-1]
-    return flags, m.group('sep'), name
+    return set(raw[1:close].split()), rest[1:sep_end], name
 
 
 def classify_mailbox(flags: Set[bytes]) -> Optional[str]:
@@ -121,8 +206,9 @@ def classify_mailbox(flags: Set[bytes]) -> Optional[str]:
 
 
 def backoff_sleep(attempt: int, base: float = BASE_BACKOFF) -> None:
-    # jittered exponential backoff
-    delay = (base * (2 ** attempt)) + (BACKOFF_JITTER * attempt)
+    # full jitter: uniform over the capped exponential window, so parallel
+    # sessions that failed together do not retry in lockstep
+    delay = random.uniform(0, min(MAX_BACKOFF, base * (2 ** attempt)))
     time.sleep(delay)
 
 
@@ -141,11 +227,22 @@ def install_signal_handlers():
 
 # ---- IMAP helpers with retries ---------------------------------------------
 
+def is_unrecoverable(typ: str, data) -> bool:
+    """BAD, or NO carrying a permanent response code: fail now instead of backing off."""
+    if typ == 'BAD':
+        return True
+    if typ != 'NO':
+        return False
+    text = b" ".join(d for d in data or () if isinstance(d, bytes)).upper()
+    return any(code in text for code in UNRECOVERABLE_CODES)
+
+
 def imap_call_with_retry(M: imaplib.IMAP4_SSL, cmd: str, *args, max_retries: int = MAX_RETRIES):
     """
     Call IMAP command with retries on transient errors.
     Returns (typ, data). Raises on persistent failure.
     """
+    deadline = time.monotonic() + MAX_RETRY_SECONDS
     for attempt in range(max_retries + 1):
         try:
             logging.debug("IMAP %s %s", cmd, " ".join(map(str, args)))
@@ -153,28 +250,33 @@ def imap_call_with_retry(M: imaplib.IMAP4_SSL, cmd: str, *args, max_retries: int
             typ, data = method(*args)
             if typ == 'OK':
                 return typ, data
+            if is_unrecoverable(typ, data):
+                raise imaplib.IMAP4.error(f"{cmd} failed: {typ} {data}")
             logging.warning("IMAP %s returned %s; data=%s", cmd, typ, data)
         except (imaplib.IMAP4.abort, socket.timeout, OSError) as e:
             logging.warning("IMAP %s exception: %s", cmd, e)
 
-        if attempt < max_retries:
+        if attempt < max_retries and time.monotonic() < deadline:
             backoff_sleep(attempt)
         else:
             raise imaplib.IMAP4.error(f"{cmd} failed after retries")
 
 
 def imap_uid_with_retry(M: imaplib.IMAP4_SSL, *args, max_retries: int = MAX_RETRIES):
+    deadline = time.monotonic() + MAX_RETRY_SECONDS
     for attempt in range(max_retries + 1):
         try:
             logging.debug("IMAP UID %s", " ".join(map(str, args)))
             typ, data = M.uid(*args)
             if typ == 'OK':
                 return typ, data
+            if is_unrecoverable(typ, data):
+                raise imaplib.IMAP4.error(f"UID {args[0]} failed: {typ} {data}")
             logging.warning("IMAP UID returned %s; data=%s", typ, data)
         except (imaplib.IMAP4.abort, socket.timeout, OSError) as e:
             logging.warning("IMAP UID exception: %s", e)
 
-        if attempt < max_retries:
+        if attempt < max_retries and time.monotonic() < deadline:
             backoff_sleep(attempt)
         else:
             raise imaplib.IMAP4.error("UID command failed after retries")
@@ -182,6 +284,163 @@ def imap_uid_with_retry(M: imaplib.IMAP4_SSL, *args, max_retries: int = MAX_RETR
 
 # ---- Core deletion logic ----------------------------------------------------
 
+def has_cap(M: imaplib.IMAP4_SSL, cap: str) -> bool:
+    """Capability lookup against the frozenset imap_login() stores; no round trip."""
+    return cap in M.capabilities
+
+
+# Untagged replies a delete leaves queued. imaplib files every one, but only
+# its own expunge() pops any, so over thousands of batches they would pile up
+DELETE_RESPONSES = ('EXPUNGE', 'VANISHED', 'COPYUID', 'OK')
+
+
+def drop_delete_responses(M: imaplib.IMAP4_SSL) -> None:
+    for key in DELETE_RESPONSES:
+        M.untagged_responses.pop(key, None)
+
+
+def expunge_uids(M: imaplib.IMAP4_SSL, us: str):
+    """
+    Expunge only the given UIDs via UID EXPUNGE (UIDPLUS) so the server does not
+    rescan the whole mailbox per batch; plain EXPUNGE when UIDPLUS is missing.
+    """
+    if has_cap(M, 'UIDPLUS'):
+        result = imap_uid_with_retry(M, 'EXPUNGE', us)
+    else:
+        result = imap_call_with_retry(M, 'expunge')
+    drop_delete_responses(M)
+    return result
+
+
+def pipelined_store_expunge(M: imaplib.IMAP4_SSL, us: str) -> bool:
+    """
+    Send UID STORE and UID EXPUNGE back to back, then read both tagged replies:
+    one round trip per batch instead of two (RFC 3501 §5.5). imaplib's
+    _command() only writes, and _command_complete() matches replies by tag.
+    """
+    if not has_cap(M, 'UIDPLUS'):
+        return False
+    try:
+        tags = [
+            M._command('UID', 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)'),
+            M._command('UID', 'EXPUNGE', us),
+        ]
+        done = [M._command_complete('UID', t)[0] for t in tags] == ['OK', 'OK']
+        drop_delete_responses(M)  # _command_complete pops nothing itself
+        return done
+    except (imaplib.IMAP4.error, socket.timeout, OSError) as e:
+        logging.warning("Pipelined STORE+EXPUNGE failed: %s; retrying serially", e)
+        return False
+
+
+def stream_list(M: imaplib.IMAP4_SSL) -> Iterator[bytes]:
+    """
+    LIST "" "*", yielding each row as imaplib reads it instead of after the
+    tagged OK, so callers can act on early rows while the tail is in flight.
+    """
+    tag = M._command('LIST', '""', '*')
+    while M.tagged_commands[tag] is None:
+        M._get_response()
+        yield from M.untagged_responses.pop('LIST', ())
+    typ, data = M.tagged_commands.pop(tag)
+    yield from M.untagged_responses.pop('LIST', ())
+    if typ != 'OK':
+        raise imaplib.IMAP4.error(f"Could not list mailboxes: {data}")
+
+
+def leave_mailbox(M: imaplib.IMAP4_SSL, expunge_leftovers: bool):
+    """
+    Deselect the mailbox. UNSELECT (RFC 3691) skips CLOSE's implicit expunge;
+    CLOSE is kept when a failed batch may have left flagged messages behind.
+    """
+    if expunge_leftovers or not has_cap(M, 'UNSELECT'):
+        return imap_call_with_retry(M, "close")
+    return imap_call_with_retry(M, "unselect")
+
+
+def store_and_expunge(M: imaplib.IMAP4_SSL, us: str, display: str, pause: float) -> bool:
+    """Delete one batch: pipelined first, serial retry path as the fallback."""
+    if pipelined_store_expunge(M, us):
+        return True
+    if has_cap(M, 'UIDPLUS') and not connection_alive(M):
+        # Serial retries on a dropped socket would only burn the retry budget
+        raise imaplib.IMAP4.abort("connection lost")
+    typ, _ = imap_uid_with_retry(M, 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)')
+    if typ != 'OK':
+        logging.warning("STORE failed in %s; continuing with backoff", display)
+        time.sleep(max(pause * 2, 2.0))
+        return False
+
+    typ, _ = expunge_uids(M, us)
+    if typ != 'OK':
+        logging.warning("EXPUNGE failed in %s; continuing with backoff", display)
+        time.sleep(max(pause * 2, 2.0))
+        return False
+    return True
+
+
+def move_uids(M: imaplib.IMAP4_SSL, us: str, target: bytes | str) -> bool:
+    """UID MOVE (RFC 6851) one batch: a single command instead of STORE + EXPUNGE."""
+    try:
+        typ, _ = imap_uid_with_retry(M, 'MOVE', us, imap_quote_mailbox(target))
+        drop_delete_responses(M)
+        return typ == 'OK'
+    except imaplib.IMAP4.error as e:
+        logging.warning("UID MOVE to %s failed: %s; deleting in place", safe_display_name(target), e)
+        return False
+
+
+def delete_batch(M: imaplib.IMAP4_SSL, us: str, trash: bytes | str | None, display: str, pause: float) -> bool:
+    """Move the batch to Trash when a target is given and MOVE is supported, else STORE+EXPUNGE."""
+    if trash and has_cap(M, 'MOVE') and move_uids(M, us, trash):
+        return True
+    return store_and_expunge(M, us, display, pause)
+
+
+def mailbox_status(M: imaplib.IMAP4_SSL, mbox_quoted: str) -> Tuple[Optional[int], Optional[int]]:
+    """(MESSAGES, UIDNEXT) from STATUS, without selecting the mailbox; None where unavailable."""
+    try:
+        typ, data = imap_call_with_retry(M, "status", mbox_quoted, "(MESSAGES UIDNEXT)")
+    except imaplib.IMAP4.error:
+        return None, None
+    line = data[0] if typ == 'OK' and data and data[0] else b''
+    return tuple(int(m.group(1)) if m else None
+                 for m in (STATUS_MESSAGES_RE.search(line), STATUS_UIDNEXT_RE.search(line)))
+
+
+def search_windows(count: Optional[int], uidnext: Optional[int]) -> List[str]:
+    """
+    UID ranges below UIDNEXT to SEARCH one at a time, each sized to hold about
+    SEARCH_WINDOW messages. Bounded on purpose: 'n:*' would also match the
+    highest UID when every UID is below n.
+    """
+    if not count or not uidnext:
+        return ['1:*']
+    span = max(SEARCH_WINDOW, SEARCH_WINDOW * uidnext // count)
+    return [f"{lo}:{min(lo + span, uidnext) - 1}" for lo in range(1, uidnext, span)]
+
+
+def window_uids(
+    session: Callable[[], imaplib.IMAP4_SSL],
+    windows: Iterable[str],
+    limit: Optional[int],
+) -> Iterator[memoryview]:
+    """
+    UID SEARCH window by window on session() (the current connection, which a
+    reconnect may replace), so only one window of UIDs is resident at a time.
+    """
+    for window in windows:
+        if limit is not None and limit <= 0:
+            return
+        typ, data = imap_uid_with_retry(session(), 'SEARCH', None, 'UID', window)
+        # memoryview: the limit cut and every batch slice are views, not copies
+        uids = memoryview(parse_uids(data[0] if typ == 'OK' and data else None))
+        if limit is not None:
+            uids = uids[:limit]
+            limit -= len(uids)
+        yield uids
+
+
 def delete_in_mailbox(
     M: imaplib.IMAP4_SSL,
     mailbox_name_bytes: bytes | str,
@@ -189,72 +448,162 @@ def delete_in_mailbox(
     dry_run: bool,
     pause: float,
     max_messages: Optional[int] = None,
+    adaptive_pause: bool = True,
+    reconnect: Optional[Callable[[], imaplib.IMAP4_SSL]] = None,
+    trash: bytes | str | None = None,
 ) -> Tuple[int, int]:
     """
     Select mailbox, search UIDs, and delete in batches.
     Returns (total_seen, total_deleted).
     """
     mbox_quoted = imap_quote_mailbox(mailbox_name_bytes)
-    typ, _ = imap_call_with_retry(M, "select", mbox_quoted, readonly=dry_run)
+    count, uidnext = mailbox_status(M, mbox_quoted)
+    if count == 0:
+        logging.info("[skip] %s: empty", safe_display_name(mailbox_name_bytes))
+        return 0, 0
+    if dry_run and count is not None:
+        # STATUS already answers the dry-run question; no SELECT needed
+        logging.info("[dry-run] %s: %d messages", safe_display_name(mailbox_name_bytes), count)
+        return count, 0
+    try:
+        typ, _ = imap_call_with_retry(M, "examine" if dry_run else "select", mbox_quoted)
+    except imaplib.IMAP4.error as e:
+        typ, _ = 'NO', e
     if typ != 'OK':
         logging.error("Cannot select %s", mbox_quoted)
+        invalidate_folder_cache()
         return 0, 0
 
-    typ, data = imap_uid_with_retry(M, 'SEARCH', None, 'ALL')
-    if typ != 'OK' or data is None:
-        logging.error("Search failed in %s", mbox_quoted)
-        imap_call_with_retry(M, "close")
-        return 0, 0
-
-    uids = data[0].split() if data and data[0] else []
-    total = len(uids)
-    if max_messages is not None:
-        uids = uids[:max_messages]
+    found = window_uids(lambda: M, search_windows(count, uidnext), max_messages)
+    if dry_run or count is None:
+        # Without STATUS there is a single '1:*' window; count it up front
+        found = list(found)
+        total = sum(map(len, found))
+    else:
+        total = count
 
     if dry_run:
+        # No CLOSE: the next SELECT/EXAMINE (or LOGOUT) deselects this one implicitly
         logging.info("[dry-run] %s: %d messages", safe_display_name(mailbox_name_bytes), total)
-        imap_call_with_retry(M, "close")
         return total, 0
 
     deleted = 0
-    for batch in chunked(uids, batch_size):
+    failed = False
+    delay, streak = pause, 0
+    batches = (b for uids in found for b in uid_batches(uids, batch_size))
+    for batch, us in batches:
         if STOP_REQUESTED:
             logging.warning("Stop requested; ending early in %s", safe_display_name(mailbox_name_bytes))
             break
 
-        us = uid_str(batch)
-        typ, _ = imap_uid_with_retry(M, 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)')
-        if typ != 'OK':
-            logging.warning("STORE failed in %s; continuing with backoff", safe_display_name(mailbox_name_bytes))
-            time.sleep(max(pause * 2, 2.0))
-            continue
-
-        typ, _ = imap_call_with_retry(M, 'expunge')
-        if typ != 'OK':
-            logging.warning("EXPUNGE failed in %s; continuing with backoff", safe_display_name(mailbox_name_bytes))
-            time.sleep(max(pause * 2, 2.0))
+        try:
+            ok = delete_batch(M, us, trash, safe_display_name(mailbox_name_bytes), pause)
+        except imaplib.IMAP4.abort as e:
+            if reconnect is None:
+                raise
+            # Gmail recycles long-lived sessions: log in again, re-SELECT, retry the batch
+            logging.warning("Session dropped in %s (%s); reconnecting", safe_display_name(mailbox_name_bytes), e)
+            M = reconnect()
+            imap_call_with_retry(M, "select", mbox_quoted)
+            ok = delete_batch(M, us, trash, safe_display_name(mailbox_name_bytes), pause)
+        if not ok:
+            failed = True
+            if adaptive_pause:
+                # Server pushed back: restart from the error-path pause
+                delay, streak = max(pause * 2, 2.0), 0
             continue
 
         deleted += len(batch)
         logging.info("[%s] deleted %d / %d", safe_display_name(mailbox_name_bytes), deleted, total)
-        time.sleep(pause)
+        streak += 1
+        if adaptive_pause and streak % ADAPTIVE_OK_STREAK == 0:
+            delay = delay / 2 if delay >= 0.05 else 0.0
+        time.sleep(delay)
 
-    imap_call_with_retry(M, "close")
+    leave_mailbox(M, expunge_leftovers=failed)
     logging.info("[done] %s: deleted %d/%d", safe_display_name(mailbox_name_bytes), deleted, total)
     return total, deleted
 
 
 def safe_display_name(name: bytes | str) -> str:
-    try:
-        if isinstance(name, (bytes, bytearray)):
-            return name.decode('imap4-utf-7')
-        return name
-    except Exception:
-        return str(name)
+    if isinstance(name, (bytes, bytearray)):
+        return name.decode('ascii', errors='backslashreplace')
+    return name
 
 
 # ---- Authentication ---------------------------------------------------------
 
+class ResumingIMAP4_SSL(imaplib.IMAP4_SSL):
+    """
+    IMAP4_SSL with Nagle disabled and one TLS session shared by every
+    connection, so worker logins after the first resume instead of doing a
+    full handshake. Sessions only resume within the SSLContext that made them.
+    """
+    context = ssl.create_default_context()
+    tls_session: Optional[ssl.SSLSession] = None
+    _deflater = _inflater = None  # set once COMPRESS=DEFLATE is active
+    _inbuf = bytearray()  # inflated bytes; the unread ones start at _inpos
+    _inpos = 0
+
+    def __init__(self, host: str, port: int):
+        super().__init__(host, port, ssl_context=self.context)
+
+    def _create_socket(self, timeout):
+        sock = imaplib.IMAP4._create_socket(self, timeout)
+        # Many small commands with tiny replies: don't let Nagle hold them back
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return self.ssl_context.wrap_socket(sock, server_hostname=self.host, session=ResumingIMAP4_SSL.tls_session)
+
+    def compress(self) -> bool:
+        """Negotiate COMPRESS=DEFLATE (RFC 4978); all later traffic is a raw deflate stream."""
+        typ, _ = self._simple_command('COMPRESS', 'DEFLATE')
+        if typ != 'OK':
+            return False
+        self._deflater = zlib.compressobj(wbits=-15)
+        self._inflater = zlib.decompressobj(wbits=-15)
+        self._inbuf = bytearray()
+        return True
+
+    def send(self, data: bytes) -> None:
+        if self._deflater:
+            data = self._deflater.compress(data) + self._deflater.flush(zlib.Z_SYNC_FLUSH)
+        super().send(data)
+
+    def _fill(self) -> bool:
+        chunk = self.sock.recv(16384)
+        if self._inpos:
+            # Drop what was already read once per chunk, not once per line
+            del self._inbuf[:self._inpos]
+            self._inpos = 0
+        self._inbuf += self._inflater.decompress(chunk)
+        return bool(chunk)
+
+    def readline(self) -> bytes:
+        if not self._inflater:
+            return super().readline()
+        scanned = 0  # unread bytes already searched for the newline
+        while (end := self._inbuf.find(b'\n', self._inpos + scanned)) < 0:
+            scanned = len(self._inbuf) - self._inpos
+            if scanned > imaplib._MAXLINE:
+                raise self.error("got more than %d bytes" % imaplib._MAXLINE)
+            if not self._fill():
+                end = len(self._inbuf) - 1
+                break
+        line = bytes(self._inbuf[self._inpos:end + 1])
+        self._inpos = end + 1
+        return line
+
+    def read(self, size: int) -> bytes:
+        if not self._inflater:
+            return super().read(size)
+        while len(self._inbuf) - self._inpos < size and self._fill():
+            pass
+        end = min(self._inpos + size, len(self._inbuf))
+        data = bytes(self._inbuf[self._inpos:end])
+        self._inpos = end
+        return data
+
+
 def imap_login(
     user: str,
     password: Optional[str],
@@ -264,7 +613,7 @@ def imap_login(
     timeout: float,
 ) -> imaplib.IMAP4_SSL:
     socket.setdefaulttimeout(timeout)
-    M = imaplib.IMAP4_SSL(server, port)
+    M = ResumingIMAP4_SSL(server, port)
     if xoauth2_access_token:
         # XOAUTH2 flow where you already possess a valid access token.
         # Construct SASL XOAUTH2 string as documented by Google.
@@ -284,55 +633,272 @@ def imap_login(
         if typ != 'OK':
             raise imaplib.IMAP4.error(f"Login failed: {data}")
         logging.info("Authenticated with password (App Password recommended).")
+    M._get_capabilities()  # post-auth list is the one that advertises UIDPLUS on Gmail
+    M.capabilities = frozenset(M.capabilities)
+    if has_cap(M, 'COMPRESS=DEFLATE') and M.compress():
+        logging.debug("COMPRESS=DEFLATE active")
+    # TLS 1.3 tickets arrive after the handshake; by now the session is resumable
+    logging.debug("TLS session reused: %s", M.sock.session_reused)
+    ResumingIMAP4_SSL.tls_session = M.sock.session or ResumingIMAP4_SSL.tls_session
     return M
 
 
 # ---- Mailbox discovery / ordering ------------------------------------------
 
+def folder_cache_path(server: str, user: str) -> str:
+    """One cache per account: the same user name on another server has its own folders."""
+    key = f"{server}_{user}".replace(os.sep, "_")
+    return os.path.join(FOLDER_CACHE_DIR, key + ".mboxes.json")
+
+
+def load_folder_cache(path: str) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_folder_cache(path: str, rows: List[Tuple[Optional[str], bytes]], digest: str) -> None:
+    """Write the unfiltered (kind, name) rows; an unchanged tree only refreshes the mtime."""
+    try:
+        cached = load_folder_cache(path)
+        if cached and cached.get("digest") == digest:
+            os.utime(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            # latin-1 round-trips arbitrary mailbox-name bytes through JSON
+            json.dump({"digest": digest, "mailboxes": [[k, n.decode("latin-1")] for k, n in rows]}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logging.debug("Could not write folder cache %s: %s", path, e)
+
+
+def invalidate_folder_cache() -> None:
+    """Drop the on-disk folder list once a mailbox taken from it fails to open."""
+    global _folder_cache_in_use
+    path, _folder_cache_in_use = _folder_cache_in_use, None
+    if path:
+        logging.info("Cached folder list is stale; it will be refreshed next run")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def listed_mailboxes(M: imaplib.IMAP4_SSL, cache_path: Optional[str]) -> Iterator[Tuple[Optional[str], bytes]]:
+    """
+    (kind, name_bytes) for every selectable mailbox: from the folder cache
+    when it is under FOLDER_CACHE_MAX_AGE old, else a streamed LIST that
+    refreshes it.
+    """
+    global _folder_cache_in_use
+    try:
+        fresh = cache_path and time.time() - os.path.getmtime(cache_path) < FOLDER_CACHE_MAX_AGE
+    except OSError:
+        fresh = False
+    cached = load_folder_cache(cache_path) if fresh else None
+    if cached and "mailboxes" in cached:
+        # LIST "" "" only returns the hierarchy delimiter: a cheap liveness probe
+        imap_call_with_retry(M, "list", '""', '""')
+        logging.info("Using cached folder list (%d mailboxes)", len(cached["mailboxes"]))
+        _folder_cache_in_use = cache_path
+        for kind, name in cached["mailboxes"]:
+            yield kind, name.encode("latin-1")
+        return
+
+    digest = hashlib.sha256()
+    rows: List[Tuple[Optional[str], bytes]] = []
+    for raw in stream_list(M):
+        digest.update(raw)
+        flags, _, name = parse_list_line(raw)
+        if any(f.lower() in NOSELECT_FLAGS for f in flags):
+            continue  # never selectable, so it would only fail and void the cache
+        rows.append((classify_mailbox(flags), name))
+        yield rows[-1]
+    if cache_path:
+        save_folder_cache(cache_path, rows, digest.hexdigest())
+
+
+def substring_pattern(filters: List[str]) -> Optional[re.Pattern]:
+    """One case-folded alternation for a list of substring filters; None if empty."""
+    if not filters:
+        return None
+    return re.compile("|".join(re.escape(sub.lower()) for sub in filters))
+
+
+class TrashMailbox:
+    """
+    The \\Trash mailbox's name as LIST reports it. Label workers start while
+    LIST is still streaming, so get() waits until its row has been seen or the
+    listing has ended; None means there is no \\Trash to move mail into.
+    """
+    def __init__(self):
+        self.name: Optional[bytes] = None
+        self._known = threading.Event()
+
+    def found(self, name: bytes) -> None:
+        if not self._known.is_set():
+            self.name = name
+            self._known.set()
+
+    def listing_done(self) -> None:
+        self._known.set()
+
+    def get(self) -> Optional[bytes]:
+        self._known.wait()
+        return self.name
+
+
 def discover_mailboxes(
     M: imaplib.IMAP4_SSL,
     include_filters: List[str],
     exclude_filters: List[str],
-) -> List[Tuple[Optional[str], bytes]]:
+    cache_path: Optional[str] = None,
+    trash: Optional[TrashMailbox] = None,
+) -> Iterator[Tuple[Optional[str], bytes]]:
     """
-    Returns list of (kind, name_bytes) where kind ∈ {None, 'all','trash','spam'}.
+    Yield (kind, name_bytes) for each matching LIST row as it arrives, where
+    kind ∈ {None, 'all','trash','spam'}. Ordering is left to run_mailboxes().
+    The \\Trash row is reported to `trash` even when the filters skip it.
     """
-    typ, boxes = imap_call_with_retry(M, "list")
-    if typ != 'OK' or boxes is None:
-        raise imaplib.IMAP4.error("Could not list mailboxes")
+    inc = substring_pattern(include_filters)
+    exc = substring_pattern(exclude_filters)
+    seen: Set[Tuple[Optional[str], bytes]] = set()
+    try:
+        for kind, name in listed_mailboxes(M, cache_path):
+            if kind == 'trash' and trash:
+                trash.found(name)
+            nstr = safe_display_name(name).lower()
+
+            if inc and not inc.search(nstr):
+                continue
+            if exc and exc.search(nstr):
+                continue
+            if (kind, name) in seen:
+                continue
+
+            seen.add((kind, name))
+            yield kind, name
+    finally:
+        if trash:
+            trash.listing_done()
 
-    mailboxes: List[Tuple[Optional[str], bytes]] = []
-    for raw in boxes:
-        flags, _, name = parse_list_line(raw)
-        kind = classify_mailbox(flags)
-        nstr = safe_display_name(name).lower()
 
-        if include_filters and not any(sub.lower() in nstr for sub in include_filters):
-            continue
-        if exclude_filters and any(sub.lower() in nstr for sub in exclude_filters):
-            continue
+# ---- Parallel mailbox workers ----------------------------------------------
 
-        mailboxes.append((kind, name))
+# imaplib connections are not thread-safe: each worker thread logs in once and
+# keeps its own session for every mailbox it is handed.
+_thread_state = threading.local()
+_open_connections: List[imaplib.IMAP4_SSL] = []
+_open_connections_lock = threading.Lock()
 
-    # Order:
-    # safe => normal labels first, then All Mail, then Trash, then Spam
-    normals = [(k, n) for (k, n) in mailboxes if k not in ('all', 'trash', 'spam')]
-    all_mail = [(k, n) for (k, n) in mailboxes if k == 'all']
-    trash = [(k, n) for (k, n) in mailboxes if k == 'trash']
-    spam = [(k, n) for (k, n) in mailboxes if k == 'spam']
 
-    ordered = normals + all_mail + trash + spam
+def connection_alive(M: imaplib.IMAP4_SSL) -> bool:
+    try:
+        return M.noop()[0] == 'OK'
+    except (imaplib.IMAP4.error, socket.timeout, OSError):
+        return False
 
-    # De-dup just in case
-    seen: Set[Tuple[Optional[str], bytes]] = set()
-    result: List[Tuple[Optional[str], bytes]] = []
-    for item in ordered:
-        if item not in seen:
-            result.append(item)
-            seen.add(item)
+
+def thread_connection(login: dict, fresh: bool = False) -> imaplib.IMAP4_SSL:
+    """
+    Return this thread's authenticated session, logging in only on first use.
+    A session idle past KEEPALIVE_INTERVAL is probed with NOOP and replaced if dead;
+    fresh=True replaces it unconditionally (the server already dropped it).
+    """
+    M = getattr(_thread_state, 'M', None)
+    if M is not None and not fresh and time.monotonic() - _thread_state.last_used > KEEPALIVE_INTERVAL:
+        fresh = not connection_alive(M)
+    if M is not None and fresh:
+        with _open_connections_lock:
+            _open_connections.remove(M)
+        try:
+            M.shutdown()  # close the socket now rather than whenever M is collected
+        except Exception:
+            pass
+        M = None
+    if M is None:
+        M = imap_login(**login)
+        with _open_connections_lock:
+            _open_connections.append(M)
+    _thread_state.M = M
+    _thread_state.last_used = time.monotonic()
+    return M
+
+
+def logout_all() -> None:
+    with _open_connections_lock:
+        for M in _open_connections:
+            try:
+                M.logout()
+            except Exception:
+                pass
+        _open_connections.clear()
+
+
+def process_mailbox(login: dict, kind: Optional[str], name: bytes, args: argparse.Namespace,
+                    trash: TrashMailbox) -> Tuple[int, int]:
+    if STOP_REQUESTED:
+        logging.warning("Stop requested; skipping mailbox %s", safe_display_name(name))
+        return 0, 0
+    logging.info("Processing mailbox: %s (kind=%s)", safe_display_name(name), kind or "normal")
+    result = delete_in_mailbox(
+        thread_connection(login),
+        name,
+        batch_size=max(1, args.batch_size),
+        dry_run=args.dry_run,
+        pause=max(0.0, args.pause),
+        max_messages=args.max_messages,
+        adaptive_pause=args.adaptive_pause,
+        reconnect=lambda: thread_connection(login, fresh=True),
+        trash=trash.get() if kind is None and args.move_to_trash else None,
+    )
+    time.sleep(max(args.pause, 0.5))  # gentle extra pause between folders
     return result
 
 
+def gather(futures) -> Tuple[int, int]:
+    results = [f.result() for f in futures]
+    return sum(t for t, _ in results), sum(d for _, d in results)
+
+
+def run_stage(pool: ThreadPoolExecutor, login: dict, stage, args: argparse.Namespace,
+              trash: TrashMailbox) -> Tuple[int, int]:
+    """Run one stage's mailboxes in parallel; returning acts as the barrier before the next kind."""
+    return gather([pool.submit(process_mailbox, login, kind, name, args, trash) for kind, name in stage])
+
+
+def run_mailboxes(pool: ThreadPoolExecutor, login: dict, mailboxes, args: argparse.Namespace,
+                  trash: TrashMailbox) -> Tuple[int, int]:
+    """
+    Labels are submitted the moment discovery yields them, overlapping the
+    LIST tail; All Mail, Trash and Spam then run as successive stages.
+    """
+    labels = []
+    stages = {'all': [], 'trash': [], 'spam': []}
+    for kind, name in mailboxes:
+        if kind is None:
+            labels.append(pool.submit(process_mailbox, login, kind, name, args, trash))
+        else:
+            stages[kind].append((kind, name))
+    if not labels and not any(stages.values()):
+        logging.warning("No mailboxes matched the filters.")
+
+    total_seen, total_deleted = gather(labels)
+    for stage in filter(None, stages.values()):
+        if STOP_REQUESTED:
+            logging.warning("Stop requested; halting before mailbox %s", safe_display_name(stage[0][1]))
+            break
+        t, d = run_stage(pool, login, stage, args, trash)
+        total_seen += t
+        total_deleted += d
+    return total_seen, total_deleted
+
+
+
 # ---- Main -------------------------------------------------------------------
 
 def main():
@@ -343,19 +909,27 @@ def main():
     auth.add_argument("--xoauth2-access-token", help="If provided, authenticate via XOAUTH2 using this access token.")
 
     perf = ap.add_argument_group("Performance & Safety")
-    perf.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="UIDs per batch (keep small).")
+    perf.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="UIDs per batch (capped by command length).")
     perf.add_argument("--pause", type=float, default=DEFAULT_PAUSE, help="Seconds to sleep between batches.")
+    perf.add_argument("--move-to-trash", type=lambda x: x.lower() in {"1", "true", "yes"}, default=True,
+                      help="true/false: UID MOVE label messages to the \\Trash mailbox instead of only unlabelling them.")
+    perf.add_argument("--adaptive-pause", type=lambda x: x.lower() in {"1", "true", "yes"}, default=True,
+                      help="true/false: halve --pause after every 5 clean batches, reset it on errors.")
     perf.add_argument("--max-messages", type=int, default=None, help="Optional cap per mailbox for testing.")
     perf.add_argument("--dry-run", type=lambda x: x.lower() in {"1", "true", "yes"}, default=True,
                       help="true/false: list counts only, no deletions.")
     perf.add_argument("--i-understand-this-deletes-mail", action="store_true",
                       help="Required to run with --dry-run false.")
     perf.add_argument("--timeout", type=float, default=60.0, help="Socket timeout in seconds.")
+    perf.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS,
+                      help="Parallel IMAP sessions used for mailboxes of the same kind.")
     perf.add_argument("-v", "--verbose", action="count", default=0, help="Increase logging verbosity (-v, -vv).")
 
     filt = ap.add_argument_group("Mailbox Selection")
     filt.add_argument("--include", action="append", default=[], help="Substring filter (can repeat).")
     filt.add_argument("--exclude", action="append", default=[], help="Substring exclude (can repeat).")
+    filt.add_argument("--no-cache", action="store_true",
+                      help="Always LIST folders instead of reusing the cached tree (refreshed daily).")
 
     net = ap.add_argument_group("Network")
     net.add_argument("--server", default=GMAIL_IMAP_HOST)
@@ -368,16 +942,16 @@ def main():
     if not args.dry_run and not args.i_understand_this_deletes_mail:
         ap.error("Destructive run requires --i-understand-this-deletes-mail")
 
-    # Connect & authenticate
+    login = dict(
+        user=args.user,
+        password=args.password,
+        xoauth2_access_token=args.xoauth2_access_token,
+        server=args.server,
+        port=args.port,
+        timeout=args.timeout,
+    )
     try:
-        M = imap_login(
-            user=args.user,
-            password=args.password,
-            xoauth2_access_token=args.xoauth2_access_token,
-            server=args.server,
-            port=args.port,
-            timeout=args.timeout,
-        )
+        M = thread_connection(login)
     except imaplib.IMAP4.error as e:
         logging.error("Login/authentication failed: %s", e)
         sys.exit(1)
@@ -385,32 +959,21 @@ def main():
     total_seen = 0
     total_deleted = 0
     try:
-        mailboxes = discover_mailboxes(M, args.include, args.exclude)
-        if not mailboxes:
-            logging.warning("No mailboxes matched the filters.")
-        for kind, name in mailboxes:
-            if STOP_REQUESTED:
-                logging.warning("Stop requested; halting before mailbox %s", safe_display_name(name))
-                break
-
-            logging.info("Processing mailbox: %s (kind=%s)", safe_display_name(name), kind or "normal")
-            t, d = delete_in_mailbox(
-                M,
-                name,
-                batch_size=max(1, args.batch_size),
-                dry_run=args.dry_run,
-                pause=max(0.0, args.pause),
-                max_messages=args.max_messages,
-            )
-            total_seen += t
-            total_deleted += d
-            # Gentle extra pause between folders
-            time.sleep(max(args.pause, 0.5))
+        # Labels run concurrently; All Mail, Trash and Spam each wait for the previous kind.
+        with ThreadPoolExecutor(max_workers=max(1, args.max_connections)) as pool:
+            cache_path = None if args.no_cache else folder_cache_path(args.server, args.user)
+            trash = TrashMailbox()
+            mailboxes = discover_mailboxes(M, args.include, args.exclude, cache_path, trash)
+            try:
+                total_seen, total_deleted = run_mailboxes(pool, login, mailboxes, args, trash)
+            except BaseException:
+                # Ends the listing too, so no worker is left waiting on the Trash name.
+                # Drop queued mailboxes; running ones finish before logout_all()
+                mailboxes.close()
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
     finally:
-        try:
-            M.logout()
-        except Exception:
-            pass
+        logout_all()
 
     if args.dry_run:
         print(f"[dry-run complete] Total messages seen across selected folders: {total_seen}")
@@ -10,8 +10,17 @@ Design:
 - After every window, re-check the mailbox EXISTS count; when it reaches 0, stop.
 - Dry-run by default; destructive runs require --i-understand-this-deletes-mail.
 - Safe order: normal labels -> All Mail -> Trash -> Spam.
+- With LIST-STATUS (RFC 5819) one LIST also returns every mailbox's message
+  count, so empty mailboxes are skipped without logging in for them.
+- Label batches are UID MOVEd to the \\Trash mailbox LIST reports (one
+  command per batch, whatever the account's language calls it); on
+  Gmail a STORE \Deleted + EXPUNGE there would only remove the label.
 - Retries with backoff, batch-sized deletes, and gentle pauses.
-- Avoids imaplib's 1,000,000-byte response limit by never using UID SEARCH ALL.
+- Mailboxes of the same kind run concurrently, capped by --max-connections (at
+  most Gmail's 15) so the RTT of one folder overlaps work in another. Each
+  worker logs in once and reuses its session for every mailbox it picks up.
+- Windowed searches keep replies far below imaplib's 1,000,000-byte line
+  limit. --window all raises that limit and deletes from one search instead.
 
 Examples:
   Dry run:
@@ -29,14 +38,20 @@ Examples:
 
 import argparse
 import datetime as dt
+import functools
 import imaplib
 import logging
+import random
 import re
 import signal
 import socket
+import ssl
 import sys
+import threading
 import time
-from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 # -------------------- Constants --------------------
 
@@ -49,22 +64,38 @@ SPECIAL_FLAG_MAP = {
     br'\Junk': 'spam',
     br'\Spam': 'spam',
 }
+SPECIAL_FLAG_KEYS = frozenset(SPECIAL_FLAG_MAP)
 
-MAILBOX_LINE_RE = re.compile(
-    rb'^\((?P<flags>[^)]*)\)\s+"(?P<sep>[^"]+)"\s+(?P<name>.+)$'
-)
+ESEARCH_COUNT_RE = re.compile(rb'\bCOUNT\s+(\d+)')
+_DIGITS_RE = re.compile(rb'\d+')
+STATUS_MESSAGES_RE = re.compile(rb'\bMESSAGES\s+(\d+)')
 
-DEFAULT_BATCH_SIZE = 50
+DEFAULT_BATCH_SIZE = 200
+MAX_UIDS_PER_COMMAND = 500  # safety ceiling on UIDs named in one STORE/MOVE
+MAX_UID_SET_CHARS = 7000  # RFC 2683 §3.2.1.5: servers take >= 8000-octet command lines
 DEFAULT_PAUSE = 0.5
+DEFAULT_MAX_CONNECTIONS = 4  # leave headroom for the user's other clients
+GMAIL_MAX_CONNECTIONS = 15  # simultaneous IMAP sessions Gmail allows per account
 MAX_RETRIES = 5
-BASE_BACKOFF = 0.8
-BACKOFF_JITTER = 0.25  # seconds
+KEEPALIVE_INTERVAL = 25 * 60  # seconds; Gmail drops sessions idle for ~30 min
+BASE_BACKOFF = 1.0  # seconds; shortest retry sleep
+MAX_BACKOFF = 30.0  # seconds; cap for a single retry sleep
+
+# NO replies carrying these response codes (RFC 5530) are temporary; any other NO is final
+TRANSIENT_NO_CODES = (b'[UNAVAILABLE]', b'[INUSE]', b'[LIMIT]', b'[THROTTLED]')
+
+ESEARCH_SPLIT_COUNT = 10000  # windows holding more are halved before their UIDs are fetched
+
+# Adaptive day windows: grow after empty windows, shrink after crowded ones
+MAX_SPAN_DAYS = 365
+DENSE_WINDOW_COUNT = 5000
+MAX_RESPONSE_LINE = 64 * 1024 * 1024  # imaplib's cap for --window all; ~8M UIDs
 
 # Limits to avoid infinite backfill loops if something goes odd:
 DEFAULT_MAX_WINDOWS = 2000   # plenty for ~38 years of weeks
 DEFAULT_MAX_YEARS_BACK = 30  # hard stop
 
-STOP_REQUESTED = False
+STOP_EVENT = threading.Event()  # set by SIGINT/SIGTERM; polled once per window and per batch
 
 # -------------------- Logging ---------------------
 
@@ -86,8 +117,37 @@ def chunked(seq: Sequence[bytes], size: int) -> Iterable[Sequence[bytes]]:
     for i in range(0, len(seq), size):
         yield seq[i:i + size]
 
+def _uid_run(lo: int, hi: int) -> str:
+    return str(lo) if lo == hi else f"{lo}:{hi}"
+
 def uid_str(uids: Sequence[bytes]) -> str:
-    return ",".join(u.decode() if isinstance(u, (bytes, bytearray)) else str(u) for u in uids)
+    """Compact sequence set with ranges, e.g. 1,2,3,7,9,10 -> '1:3,7,9:10'."""
+    nums = sorted(int(u) for u in uids)
+    if not nums:
+        return ""
+    runs: List[str] = []
+    start = prev = nums[0]
+    for n in nums[1:]:
+        if n != prev + 1:
+            runs.append(_uid_run(start, prev))
+            start = n
+        prev = n
+    runs.append(_uid_run(start, prev))
+    return ",".join(runs)
+
+def uid_batches(uids: Sequence[bytes], size: int) -> Iterable[Tuple[Sequence[bytes], str]]:
+    """Yield (batch, sequence set); halve any batch whose set exceeds MAX_UID_SET_CHARS."""
+    for batch in chunked(uids, size):
+        yield from _bounded_uid_sets(batch)
+
+def _bounded_uid_sets(batch: Sequence[bytes]) -> Iterable[Tuple[Sequence[bytes], str]]:
+    us = uid_str(batch)
+    if len(us) <= MAX_UID_SET_CHARS or len(batch) == 1:
+        yield batch, us
+        return
+    mid = len(batch) // 2
+    yield from _bounded_uid_sets(batch[:mid])
+    yield from _bounded_uid_sets(batch[mid:])
 
 def imap_quote_mailbox(name: Union[bytes, str]) -> str:
     """
@@ -108,33 +168,43 @@ def safe_display_name(name: Union[bytes, str]) -> str:
         return name.decode('ascii', errors='backslashreplace')
     return name
 
-def parse_list_line(raw: bytes) -> Tuple[Set[bytes], bytes, bytes]:
+def parse_list_line(raw: bytes) -> Tuple[FrozenSet[bytes], bytes, bytes]:
     """
     Parse IMAP LIST raw line: returns (flags, delimiter, name) as bytes.
     """
-    m = MAILBOX_LINE_RE.match(raw)
-    if not m:
-        return set(), b'/', raw.strip().strip(b'"')
-    flags = set(m.group('flags').split())
-    name = m.group('name').strip()
+    # Linear split on the RFC 3501 separators: '(flags) "sep" name'
+    flags, found, rest = raw[1:].partition(b') "')
+    sep, found_name, name = rest.partition(b'" ')
+    name = name.strip()
+    if raw[:1] != b'(' or not found or not found_name or not sep or not name or b')' in flags:
+        return frozenset(), b'/', raw.strip().strip(b'"')
     if name.startswith(b'"') and name.endswith(b'"'):
         name = name[1:-1]
-    return flags, m.group('sep'), name
+    return frozenset(flags.split()), sep, name
 
-def classify_mailbox(flags: Set[bytes]) -> Optional[str]:
-    for f in flags:
-        if f in SPECIAL_FLAG_MAP:
-            return SPECIAL_FLAG_MAP[f]
-    return None
+def classify_mailbox(flags: FrozenSet[bytes]) -> Optional[str]:
+    """Map a mailbox's special-use flag to its kind with one C-level set intersection."""
+    hit = flags & SPECIAL_FLAG_KEYS
+    return SPECIAL_FLAG_MAP[next(iter(hit))] if hit else None
 
-def backoff_sleep(attempt: int) -> None:
-    delay = (BASE_BACKOFF * (2 ** attempt)) + (BACKOFF_JITTER * attempt)
+def backoff_sleep(prev_delay: float) -> float:
+    """
+    Sleep with decorrelated jitter: uniform between BASE_BACKOFF and three times
+    the previous delay, capped at MAX_BACKOFF. Returns the delay for the next call,
+    so concurrent connections drift apart instead of retrying in lockstep.
+    """
+    delay = min(MAX_BACKOFF, random.uniform(BASE_BACKOFF, prev_delay * 3))
     time.sleep(delay)
+    return delay
+
+def is_transient(data) -> bool:
+    """True when a NO reply says the failure is temporary and worth retrying."""
+    text = b' '.join(d for d in data or () if isinstance(d, bytes)).upper()
+    return any(code in text for code in TRANSIENT_NO_CODES)
 
 def install_signal_handlers():
     def _handler(signum, frame):
-        global STOP_REQUESTED
-        STOP_REQUESTED = True
+        STOP_EVENT.set()
         logging.warning("Stop requested (signal %s). Finishing current batch, then exiting…", signum)
     for sig in (signal.SIGINT, signal.SIGTERM):
         try:
@@ -148,43 +218,165 @@ def imap_call_with_retry(M: imaplib.IMAP4_SSL, cmd: str, *args, max_retries: int
     """
     Generic IMAP call retry wrapper.
     Supports keyword args so we can use SELECT(..., readonly=True).
+    Dropped connections and temporary NO replies are retried; other NOs raise at once.
     """
+    delay = BASE_BACKOFF
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)  # skip the join entirely below -vv
     for attempt in range(max_retries + 1):
         try:
-            logging.debug("IMAP %s %s %s", cmd, " ".join(map(str, args)), kwargs if kwargs else "")
+            if debug:
+                logging.debug("IMAP %s %s %s", cmd, " ".join(map(str, args)), kwargs if kwargs else "")
             method = getattr(M, cmd)
             typ, data = method(*args, **kwargs)
             if typ == 'OK':
                 return typ, data
             logging.warning("IMAP %s returned %s; data=%s", cmd, typ, data)
+            if not is_transient(data):
+                raise imaplib.IMAP4.error(f"{cmd} refused: {data}")
         except (imaplib.IMAP4.abort, socket.timeout, OSError) as e:
             logging.warning("IMAP %s exception: %s", cmd, e)
         if attempt < max_retries:
-            backoff_sleep(attempt)
+            delay = backoff_sleep(delay)
         else:
             raise imaplib.IMAP4.error(f"{cmd} failed after retries")
 
 def imap_uid_with_retry(M: imaplib.IMAP4_SSL, *args, max_retries: int = MAX_RETRIES):
+    delay = BASE_BACKOFF
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
     for attempt in range(max_retries + 1):
         try:
-            logging.debug("IMAP UID %s", " ".join(map(str, args)))
+            if debug:
+                logging.debug("IMAP UID %s", " ".join(map(str, args)))
             typ, data = M.uid(*args)
             if typ == 'OK':
                 return typ, data
             logging.warning("IMAP UID returned %s; data=%s", typ, data)
+            if not is_transient(data):
+                raise imaplib.IMAP4.error(f"UID {args[0]} refused: {data}")
         except (imaplib.IMAP4.abort, socket.timeout, OSError) as e:
             logging.warning("IMAP UID exception: %s", e)
         if attempt < max_retries:
-            backoff_sleep(attempt)
+            delay = backoff_sleep(delay)
         else:
             raise imaplib.IMAP4.error("UID command failed after retries")
 
+def has_cap(M: imaplib.IMAP4_SSL, cap: str) -> bool:
+    """Capability lookup against the list imap_login() refreshed; no round trip."""
+    return cap in M.capabilities
+
+def imap_msg_command(M: imaplib.IMAP4_SSL, by_uid: bool, cmd: str, *args):
+    """Run a message command (STORE, MOVE) addressed by UID or by sequence number, with retries."""
+    if by_uid:
+        return imap_uid_with_retry(M, cmd, *args)
+    return imap_call_with_retry(M, '_simple_command', cmd, *args)
+
+# Untagged replies a delete leaves queued; EXISTS stays for observed_exists()
+DELETE_RESPONSES = ('EXPUNGE', 'VANISHED', 'COPYUID', 'OK')
+
+def drop_delete_responses(M: imaplib.IMAP4_SSL) -> None:
+    """imaplib keeps every untagged reply until someone pops it; a big mailbox would pile them up."""
+    for key in DELETE_RESPONSES:
+        M.untagged_responses.pop(key, None)
+
+def move_uids(M: imaplib.IMAP4_SSL, us: str, target: Union[bytes, str], by_uid: bool = True) -> bool:
+    """UID MOVE (RFC 6851) one batch: a single command instead of STORE + EXPUNGE."""
+    try:
+        return imap_msg_command(M, by_uid, 'MOVE', us, imap_quote_mailbox(target))[0] == 'OK'
+    except imaplib.IMAP4.error as e:
+        logging.warning("UID MOVE to %s failed: %s; deleting in place", safe_display_name(target), e)
+        return False
+    finally:
+        drop_delete_responses(M)
+
+def pipelined_store_expunge(M: imaplib.IMAP4_SSL, us: str, by_uid: bool = True) -> bool:
+    """
+    Write UID STORE and EXPUNGE back to back, then read both tagged replies:
+    one round trip per batch instead of two. imaplib's _command() only sends,
+    and _command_complete() waits for the reply carrying that tag.
+    """
+    store = ('UID', 'STORE') if by_uid else ('STORE',)
+    try:
+        tags = [
+            M._command(*store, us, '+FLAGS.SILENT', r'(\Deleted)'),
+            M._command('EXPUNGE'),
+        ]
+        done = [M._command_complete(name, tag)[0] for name, tag in zip((store[0], 'EXPUNGE'), tags)] == ['OK', 'OK']
+        drop_delete_responses(M)  # _command_complete pops nothing itself
+        return done
+    except (imaplib.IMAP4.error, socket.timeout, OSError) as e:
+        logging.warning("Pipelined STORE+EXPUNGE failed: %s; retrying serially", e)
+        return False
+
+def store_and_expunge(M: imaplib.IMAP4_SSL, us: str, display: str, pause: float, by_uid: bool = True) -> bool:
+    """Delete one batch: pipelined first, the serial retry path as the fallback."""
+    if pipelined_store_expunge(M, us, by_uid):
+        return True
+    typ, _ = imap_msg_command(M, by_uid, 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)')
+    if typ != 'OK':
+        logging.warning("STORE failed in %s; backing off and continuing", display)
+        time.sleep(max(pause * 2, 2.0))
+        return False
+    typ, _ = imap_call_with_retry(M, 'expunge')
+    if typ != 'OK':
+        logging.warning("EXPUNGE failed in %s; backing off and continuing", display)
+        time.sleep(max(pause * 2, 2.0))
+        return False
+    return True
+
+def store_deleted(M: imaplib.IMAP4_SSL, us: str, display: str, pause: float, by_uid: bool = True) -> bool:
+    """Flag one batch \\Deleted and leave the expunge to uid_expunge() at the end of the window."""
+    typ, _ = imap_msg_command(M, by_uid, 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)')
+    if typ != 'OK':
+        logging.warning("STORE failed in %s; backing off and continuing", display)
+        time.sleep(max(pause * 2, 2.0))
+        return False
+    return True
+
+def uid_expunge(M: imaplib.IMAP4_SSL, uids: Sequence[bytes], display: str) -> bool:
+    """
+    UID EXPUNGE (RFC 4315, UIDPLUS) everything flagged in a window: one command
+    per sequence set rather than one EXPUNGE per batch, and only these UIDs,
+    so mail someone else marked \\Deleted is left alone.
+    """
+    ok = True
+    for _, us in _bounded_uid_sets(uids):
+        typ, _ = imap_uid_with_retry(M, 'EXPUNGE', us)
+        if typ != 'OK':
+            logging.warning("UID EXPUNGE failed in %s; they go at CLOSE instead", display)
+            ok = False
+    drop_delete_responses(M)
+    return ok
+
+def delete_batch(
+    M: imaplib.IMAP4_SSL,
+    us: str,
+    trash: Optional[Union[bytes, str]],
+    display: str,
+    pause: float,
+    by_uid: bool = True,
+    expunge: bool = True,
+) -> bool:
+    """
+    Move the batch to Trash when a target is given and MOVE is supported, else
+    STORE+EXPUNGE. expunge False only flags it, for a later uid_expunge().
+    """
+    if trash and has_cap(M, 'MOVE') and move_uids(M, us, trash, by_uid):
+        return True
+    if not expunge:
+        return store_deleted(M, us, display, pause, by_uid)
+    return store_and_expunge(M, us, display, pause, by_uid)
+
 # --------------- Date utilities (backwards windows) ------------------
 
 MONTH_NAMES = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
 
+@functools.lru_cache(maxsize=4096)
 def imap_date(d: dt.date) -> str:
-    """Return IMAP date literal like 01-Jan-2024 (English month names)."""
+    """
+    Return IMAP date literal like 01-Jan-2024 (English month names).
+    Cached: each window's start is the next window's end, and every mailbox
+    walks the same dates.
+    """
     return f"{d.day:02d}-{MONTH_NAMES[d.month-1]}-{d.year}"
 
 def iter_day_windows_backward(end_exclusive: dt.date, span_days: int, hard_stop: dt.date,
@@ -192,6 +384,8 @@ def iter_day_windows_backward(end_exclusive: dt.date, span_days: int, hard_stop:
     """
     Yield windows [start, end) going backward by span_days, starting from end_exclusive.
     Stops at hard_stop (inclusive) or max_windows.
+    .send(days) resizes the following windows; it yields None back without
+    advancing, so the caller can keep iterating with a plain for loop.
     """
     produced = 0
     end = end_exclusive
@@ -199,10 +393,21 @@ def iter_day_windows_backward(end_exclusive: dt.date, span_days: int, hard_stop:
         start = end - dt.timedelta(days=span_days)
         if start < hard_stop:
             start = hard_stop
-        yield (start, end)
+        resized = yield (start, end)
+        while resized is not None:
+            span_days = resized
+            resized = yield None
         end = start
         produced += 1
 
+def next_span_days(span_days: int, count: int) -> int:
+    """Double the window after an empty one (up to a year), halve it after a crowded one."""
+    if count == 0:
+        return min(span_days * 2, max(span_days, MAX_SPAN_DAYS))
+    if count > DENSE_WINDOW_COUNT:
+        return max(span_days // 2, 1)
+    return span_days
+
 def first_of_month(d: dt.date) -> dt.date:
     return dt.date(d.year, d.month, 1)
 
@@ -230,38 +435,89 @@ def iter_month_windows_backward(end_exclusive: dt.date, months_per_window: int,
         cur_end = first_of_month(cur_start)  # previous boundary
         cur_start = month_add(cur_end, -months_per_window)
 
+def iter_whole_range(end_exclusive: dt.date, hard_stop: dt.date,
+                     passes: int) -> Iterator[Tuple[dt.date, dt.date]]:
+    """
+    Yield the full [hard_stop, end) range up to `passes` times, for --window all.
+    Repeating it catches mail that arrived while the previous pass ran.
+    """
+    for _ in range(passes):
+        yield (hard_stop, end_exclusive)
+
 # --------------- Core deletion (backwards) ------------------
 
+def esearch_count(M: imaplib.IMAP4_SSL, since_s: str, before_s: str) -> Optional[int]:
+    """
+    Count a window's messages with ESEARCH (RFC 4731) without transferring
+    their UIDs. Returns None when the server lacks ESEARCH.
+    """
+    if not has_cap(M, 'ESEARCH'):
+        return None
+    typ, _ = imap_uid_with_retry(M, 'SEARCH', 'RETURN', '(COUNT)', 'SINCE', since_s, 'BEFORE', before_s)
+    # imaplib files the reply under ESEARCH, not SEARCH
+    _, data = M._untagged_response(typ, [None], 'ESEARCH')
+    m = ESEARCH_COUNT_RE.search(data[-1] or b'')
+    return int(m.group(1)) if m else None
+
 def search_uids_in_window(
     M: imaplib.IMAP4_SSL,
     start: dt.date,
     end: dt.date,
-) -> List[bytes]:
+    by_uid: bool = True,
+    split_over: Optional[int] = ESEARCH_SPLIT_COUNT,
+) -> bytes:
     """
     Run a windowed UID SEARCH: SINCE start BEFORE end.
-    Returns a list of UID bytes for that window.
+    Returns the raw space-separated UID bytes for that window, left unsplit so
+    dry runs can count them without building a list. An ESEARCH COUNT probe
+    skips empty windows and halves crowded ones to keep each reply small.
+    With by_uid False a plain SEARCH returns sequence numbers instead.
+    split_over None fetches the window in one reply however large.
     """
     since_s = imap_date(start)
     before_s = imap_date(end)
+    count = esearch_count(M, since_s, before_s) if split_over is not None else None
+    if count == 0:
+        return b''
+    if count is not None and count > split_over and (end - start).days > 1:
+        mid = start + (end - start) / 2
+        halves = (search_uids_in_window(M, mid, end, by_uid, split_over),
+                  search_uids_in_window(M, start, mid, by_uid, split_over))
+        return b' '.join(filter(None, halves))
     logging.debug("SEARCH window SINCE %s BEFORE %s", since_s, before_s)
-    typ, data = imap_uid_with_retry(M, 'SEARCH', None, 'SINCE', since_s, 'BEFORE', before_s)
+    if by_uid:
+        typ, data = imap_uid_with_retry(M, 'SEARCH', None, 'SINCE', since_s, 'BEFORE', before_s)
+    else:
+        typ, data = imap_call_with_retry(M, 'search', None, 'SINCE', since_s, 'BEFORE', before_s)
     if typ != 'OK' or not data or data[0] is None:
-        return []
-    return data[0].split()
+        return b''
+    return data[0].strip()
+
+def uid_count(uids: bytes) -> int:
+    """Number of UIDs in a SEARCH reply; SEARCH separates them with single spaces."""
+    return uids.count(b' ') + 1 if uids else 0
 
 def select_and_get_exists(M: imaplib.IMAP4_SSL, mbox_quoted: str, readonly: bool) -> int:
     """SELECT (or read-only) and return EXISTS count."""
     typ, data = imap_call_with_retry(M, "select", mbox_quoted, readonly=readonly)
-    if typ != 'OK' or not data:
+    # imaplib leaves the EXISTS it returned queued; drop it so observed_exists only sees later ones
+    M.untagged_responses.pop('EXISTS', None)
+    if typ != 'OK' or not data or not data[0]:
         return 0
     try:
         return int(data[0])
-    except Exception:
+    except ValueError:
         # Some servers return [b'123'] or similar; be defensive.
-        try:
-            return int(re.findall(rb'\d+', data[0])[0])  # type: ignore[index]
-        except Exception:
-            return 0
+        m = _DIGITS_RE.search(data[0])
+        return int(m.group(0)) if m else 0
+
+def observed_exists(M: imaplib.IMAP4_SSL, expected: int) -> int:
+    """
+    Mailbox size without another SELECT: the latest untagged EXISTS the server
+    volunteered since the last check, else our own count after the expunges.
+    """
+    updates = M.untagged_responses.pop('EXISTS', None)
+    return int(updates[-1]) if updates else max(0, expected)
 
 def delete_in_mailbox(
     M: imaplib.IMAP4_SSL,
@@ -273,10 +529,19 @@ def delete_in_mailbox(
     window_size: int,
     max_windows: int,
     hard_stop_years: int,
+    trash: Optional[Union[bytes, str]] = None,
+    by_uid: bool = True,
+    adaptive_window: bool = False,
 ) -> Tuple[int, int]:
     """
     Process a mailbox starting from TODAY backwards until it's empty (EXISTS == 0)
     or hard stop is reached. Returns (total_seen, total_deleted) across all windows.
+    With trash set, batches are moved there instead of expunged in place.
+    Each run SELECTs once; destructive runs follow EXISTS from the server's
+    untagged updates and dry runs end once every message has been counted. by_uid False addresses messages by sequence number.
+    adaptive_window lets day windows grow or shrink with the hits they return.
+    window_kind "all" searches the whole range at once and repeats only while
+    mail remains and the last pass deleted something.
     """
     mbox_quoted = imap_quote_mailbox(mailbox_name)
 
@@ -285,7 +550,7 @@ def delete_in_mailbox(
     hard_stop_date = dt.date(max(1970, today.year - hard_stop_years), 1, 1)
 
     # initial exists (read-only so we don't alter anything on dry-run)
-    exists = select_and_get_exists(M, mbox_quoted, readonly=True)
+    exists = select_and_get_exists(M, mbox_quoted, readonly=dry_run)
     logging.info("[%s] initial messages: %d", safe_display_name(mailbox_name), exists)
     if exists == 0:
         imap_call_with_retry(M, "close")
@@ -297,21 +562,30 @@ def delete_in_mailbox(
     # Build backward windows iterator
     if window_kind == "months":
         windows_iter = iter_month_windows_backward(tomorrow, window_size, hard_stop_date, max_windows)
+    elif window_kind == "all":
+        windows_iter = iter_whole_range(tomorrow, hard_stop_date, 1 if dry_run else max_windows)
     else:
         windows_iter = iter_day_windows_backward(tomorrow, window_size, hard_stop_date, max_windows)
-
-    # For destructive runs, re-open read-write once at start
-    if not dry_run:
-        imap_call_with_retry(M, "select", mbox_quoted, readonly=False)
+    span_days = window_size
+    # With UIDPLUS, batches are only flagged and each window ends in one UID EXPUNGE
+    defer_expunge = by_uid and has_cap(M, 'UIDPLUS') and not (trash and has_cap(M, 'MOVE'))
 
     for start, end in windows_iter:
-        if STOP_REQUESTED:
+        if STOP_EVENT.is_set():
             logging.warning("Stop requested; ending early in %s", safe_display_name(mailbox_name))
             break
 
         # Find UIDs in this backward window
-        uids = search_uids_in_window(M, start, end)
-        count = len(uids)
+        uids = search_uids_in_window(M, start, end, by_uid or dry_run,
+                                     None if window_kind == "all" else ESEARCH_SPLIT_COUNT)
+        count = uid_count(uids)
+        if adaptive_window and window_kind == "days":
+            span_days = next_span_days(span_days, count)
+            windows_iter.send(span_days)
+        if not uids:
+            if window_kind == "all":
+                break  # the whole range is empty; another pass would search it for nothing
+            continue  # nothing changed, so no EXISTS re-check either
         total_seen += count
 
         if dry_run:
@@ -319,39 +593,48 @@ def delete_in_mailbox(
                          safe_display_name(mailbox_name), count, start.isoformat(), end.isoformat())
         else:
             # Delete in small batches
-            for batch in chunked(uids, batch_size):
-                if STOP_REQUESTED:
+            ids = uids.split()
+            if not by_uid:
+                # Highest sequence numbers first: expunging them leaves lower ones unchanged
+                ids.reverse()
+            window_deleted = 0
+            flagged: List[bytes] = []
+            for batch, us in uid_batches(ids, batch_size):
+                if STOP_EVENT.is_set():
                     logging.warning("Stop requested mid-batch in %s", safe_display_name(mailbox_name))
                     break
                 if not batch:
                     continue
-                us = uid_str(batch)
-                typ, _ = imap_uid_with_retry(M, 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)')
-                if typ != 'OK':
-                    logging.warning("STORE failed in %s; backing off and continuing", safe_display_name(mailbox_name))
-                    time.sleep(max(pause * 2, 2.0))
-                    continue
-                typ, _ = imap_call_with_retry(M, 'expunge')
-                if typ != 'OK':
-                    logging.warning("EXPUNGE failed in %s; backing off and continuing", safe_display_name(mailbox_name))
-                    time.sleep(max(pause * 2, 2.0))
+                if not delete_batch(M, us, trash, safe_display_name(mailbox_name), pause, by_uid,
+                                    expunge=not defer_expunge):
                     continue
+                if defer_expunge:
+                    flagged.extend(batch)
                 total_deleted += len(batch)
+                window_deleted += len(batch)
                 logging.info("[%s] deleted %d (+%d) in window up to %s",
                              safe_display_name(mailbox_name), total_deleted, len(batch), end.isoformat())
                 time.sleep(pause)
+            if flagged:
+                uid_expunge(M, flagged, safe_display_name(mailbox_name))
 
-        # Re-check EXISTS to know if we're done (read-only to avoid surprises)
-        exists = select_and_get_exists(M, mbox_quoted, readonly=True)
+        if dry_run:
+            # Nothing was removed, so EXISTS can't have moved; stop once every message was counted
+            if total_seen >= exists:
+                imap_call_with_retry(M, "close")
+                logging.info("[done] all %d messages in %s counted", exists, safe_display_name(mailbox_name))
+                return total_seen, total_deleted
+            continue
+        exists = observed_exists(M, exists - window_deleted)
         logging.info("[%s] messages remaining: %d", safe_display_name(mailbox_name), exists)
         if exists == 0:
             imap_call_with_retry(M, "close")
             logging.info("[done] %s is empty", safe_display_name(mailbox_name))
             return total_seen, total_deleted
-
-        # Re-open read-write for next window if destructive
-        if not dry_run:
-            imap_call_with_retry(M, "select", mbox_quoted, readonly=False)
+        if window_kind == "all" and window_deleted == 0:
+            logging.warning("[%s] a whole-range pass deleted nothing; not repeating it",
+                            safe_display_name(mailbox_name))
+            break
 
     # Hard stop reached; close up
     imap_call_with_retry(M, "close")
@@ -361,24 +644,71 @@ def delete_in_mailbox(
 
 # -------- Mailbox discovery / ordering ---------
 
+def parse_status_line(raw: bytes) -> Tuple[bytes, Optional[int]]:
+    """Split a STATUS reply like '"INBOX" (MESSAGES 12)' into (name, messages)."""
+    name, _, items = raw.rpartition(b' (')
+    name = name.strip()
+    if name.startswith(b'"') and name.endswith(b'"'):
+        name = name[1:-1]
+    m = STATUS_MESSAGES_RE.search(items)
+    return name, int(m.group(1)) if m else None
+
+def list_with_status(M: imaplib.IMAP4_SSL) -> Tuple[List[bytes], Dict[bytes, int]]:
+    """
+    LIST every mailbox. With LIST-STATUS (RFC 5819) the same round trip also
+    returns each mailbox's MESSAGES count; otherwise the count dict is empty.
+    """
+    if not has_cap(M, 'LIST-STATUS'):
+        typ, boxes = imap_call_with_retry(M, "list")
+        return boxes, {}
+    typ, _ = imap_call_with_retry(M, "_simple_command", "LIST", '""', '*', 'RETURN (STATUS (MESSAGES))')
+    _, boxes = M._untagged_response(typ, [None], 'LIST')
+    _, statuses = M._untagged_response(typ, [None], 'STATUS')
+    counts: Dict[bytes, int] = {}
+    for raw in statuses:
+        if isinstance(raw, bytes):
+            name, messages = parse_status_line(raw)
+            if messages is not None:
+                counts[name] = messages
+    return boxes, counts
+
+def filter_pattern(filters: List[str]) -> Optional[re.Pattern]:
+    """
+    Compile substring filters into one case-insensitive alternation that runs
+    on the raw LIST name bytes, so each name is scanned once; None if no filters.
+    """
+    if not filters:
+        return None
+    return re.compile(b'|'.join(re.escape(f.encode('utf-8')) for f in filters), re.IGNORECASE)
+
 def discover_mailboxes(
     M: imaplib.IMAP4_SSL,
     include_filters: List[str],
     exclude_filters: List[str],
-) -> List[Tuple[Optional[str], bytes]]:
-    typ, boxes = imap_call_with_retry(M, "list")
-    if typ != 'OK' or boxes is None:
+) -> Tuple[List[Tuple[Optional[str], bytes]], Dict[bytes, int], Optional[bytes]]:
+    """
+    Return the ordered (kind, name) list to process, any message counts
+    LIST-STATUS reported alongside it, keyed by mailbox name, and the name of
+    the mailbox flagged \\Trash (None if there is none), found before the
+    filters apply.
+    """
+    boxes, counts = list_with_status(M)
+    if boxes is None or boxes == [None]:
         raise imaplib.IMAP4.error("Could not list mailboxes")
 
+    include_re = filter_pattern(include_filters)
+    exclude_re = filter_pattern(exclude_filters)
     mailboxes: List[Tuple[Optional[str], bytes]] = []
+    trash_name: Optional[bytes] = None
     for raw in boxes:
         flags, _, name = parse_list_line(raw)
         kind = classify_mailbox(flags)
-        nstr = safe_display_name(name).lower()
+        if kind == 'trash' and trash_name is None:
+            trash_name = name
 
-        if include_filters and not any(sub.lower() in nstr for sub in include_filters):
+        if include_re and not include_re.search(name):
             continue
-        if exclude_filters and any(sub.lower() in nstr for sub in exclude_filters):
+        if exclude_re and exclude_re.search(name):
             continue
 
         mailboxes.append((kind, name))
@@ -396,10 +726,13 @@ def discover_mailboxes(
         if item not in seen:
             result.append(item)
             seen.add(item)
-    return result
+    return result, counts, trash_name
 
 # ---------------- Authentication ---------------
 
+# Shared by every login so the CA store is loaded once, not once per worker session
+TLS_CONTEXT = ssl.create_default_context()
+
 def imap_login(
     user: str,
     password: Optional[str],
@@ -409,7 +742,9 @@ def imap_login(
     timeout: float,
 ) -> imaplib.IMAP4_SSL:
     socket.setdefaulttimeout(timeout)
-    M = imaplib.IMAP4_SSL(server, port)
+    M = imaplib.IMAP4_SSL(server, port, ssl_context=TLS_CONTEXT)
+    # Commands are small and often pipelined; don't let Nagle hold them back
+    M.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
     if xoauth2_access_token:
         auth_string = f'user={user}\x01auth=Bearer {xoauth2_access_token}\x01\x01'
         def _auth_cb(response):
@@ -425,8 +760,142 @@ def imap_login(
         if typ != 'OK':
             raise imaplib.IMAP4.error(f"Login failed: {data}")
         logging.info("Authenticated with password (App Password recommended).")
+    M._get_capabilities()  # Gmail advertises MOVE only after authentication
     return M
 
+# --------------- Concurrent driver ---------------
+
+def stage_key(item: Tuple[Optional[str], bytes]) -> Optional[str]:
+    """Group normal labels together; All Mail, Trash and Spam each form their own stage."""
+    return item[0] if item[0] in ('all', 'trash', 'spam') else None
+
+# Pool threads keep their login between mailboxes; SESSIONS lets main log them all out
+_WORKER = threading.local()
+SESSIONS: List[imaplib.IMAP4_SSL] = []
+SESSIONS_LOCK = threading.Lock()
+
+def connection_alive(M: imaplib.IMAP4_SSL) -> bool:
+    try:
+        return M.noop()[0] == 'OK'
+    except (imaplib.IMAP4.error, socket.timeout, OSError):
+        return False
+
+def worker_session(login: dict) -> imaplib.IMAP4_SSL:
+    """
+    This thread's IMAP session, logging in only the first time it is needed.
+    A session idle past KEEPALIVE_INTERVAL (e.g. while an earlier stage ran)
+    is probed with NOOP and replaced if the server has dropped it.
+    """
+    M = getattr(_WORKER, 'M', None)
+    if M is not None and time.monotonic() - _WORKER.last_used > KEEPALIVE_INTERVAL and not connection_alive(M):
+        drop_worker_session()
+        M = None
+    if M is None:
+        M = imap_login(**login)
+        _WORKER.M = M
+        with SESSIONS_LOCK:
+            SESSIONS.append(M)
+    _WORKER.last_used = time.monotonic()
+    return M
+
+def _logout_quietly(M: imaplib.IMAP4_SSL) -> None:
+    try:
+        M.logout()
+    except Exception:
+        pass
+
+def drop_worker_session() -> None:
+    """Discard this thread's session after a failure left it in an unknown state."""
+    M = getattr(_WORKER, 'M', None)
+    if M is None:
+        return
+    _WORKER.M = None
+    with SESSIONS_LOCK:
+        SESSIONS.remove(M)
+    _logout_quietly(M)
+
+def logout_sessions() -> None:
+    """Log out every worker session once the pool has finished."""
+    with SESSIONS_LOCK:
+        sessions = SESSIONS[:]
+        SESSIONS.clear()
+    for M in sessions:
+        _logout_quietly(M)
+
+def process_mailbox(
+    login: dict,
+    kind_lbl: Optional[str],
+    name: bytes,
+    args: argparse.Namespace,
+    window_kind: str,
+    window_size: int,
+    trash: Optional[bytes],
+) -> Tuple[int, int]:
+    """
+    Run one mailbox on the calling thread's session (imaplib sessions are not
+    thread-safe, so no two threads share one). Returns (seen, deleted) like
+    delete_in_mailbox.
+    """
+    if STOP_EVENT.is_set():
+        logging.warning("Stop requested; skipping mailbox %s", safe_display_name(name))
+        return 0, 0
+    M = worker_session(login)
+    try:
+        logging.info("Processing mailbox: %s (kind=%s)", safe_display_name(name), kind_lbl or "normal")
+        result = delete_in_mailbox(
+            M,
+            name,
+            batch_size=max(1, min(args.batch_size, args.max_uids_per_command)),
+            dry_run=args.dry_run,
+            pause=max(0.0, args.pause),
+            window_kind=window_kind,
+            window_size=window_size,
+            max_windows=max(1, args.max_windows),
+            hard_stop_years=max(1, args.max_years_back),
+            trash=trash if kind_lbl is None and args.move_to_trash else None,
+            by_uid=not args.use_sequence_numbers,
+            adaptive_window=args.adaptive_window,
+        )
+        time.sleep(max(args.pause, 0.5))  # gentle extra pause between folders
+        return result
+    except (imaplib.IMAP4.error, socket.timeout, OSError) as e:
+        drop_worker_session()
+        if STOP_EVENT.is_set():
+            raise  # stopping anyway; main reports it instead of starting more
+        # One bad label shouldn't end the run; the next mailbox gets a fresh session
+        logging.error("Mailbox %s failed, skipping it: %s", safe_display_name(name), e)
+        return 0, 0
+    except BaseException:
+        drop_worker_session()
+        raise
+
+def run_stages(
+    pool: ThreadPoolExecutor,
+    login: dict,
+    mailboxes: List[Tuple[Optional[str], bytes]],
+    args: argparse.Namespace,
+    window_kind: str,
+    window_size: int,
+    trash: Optional[bytes],
+) -> Tuple[int, int]:
+    """
+    Run each stage's mailboxes in parallel; collecting a stage's results is the
+    barrier that keeps the safe order labels -> All Mail -> Trash -> Spam.
+    """
+    total_seen = 0
+    total_deleted = 0
+    for _, stage in groupby(mailboxes, key=stage_key):
+        if STOP_EVENT.is_set():
+            logging.warning("Stop requested; halting before remaining mailboxes")
+            break
+        futures = [pool.submit(process_mailbox, login, kind_lbl, name, args, window_kind, window_size, trash)
+                   for kind_lbl, name in stage]
+        for f in futures:
+            t, d = f.result()
+            total_seen += t
+            total_deleted += d
+    return total_seen, total_deleted
+
 # -------------------- Main ---------------------
 
 def main():
@@ -437,13 +906,22 @@ def main():
     auth.add_argument("--xoauth2-access-token", help="Authenticate via XOAUTH2 using this access token.")
 
     perf = ap.add_argument_group("Performance & Safety")
-    perf.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="UIDs per delete batch (keep small).")
+    perf.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="UIDs per delete batch (default 200).")
+    perf.add_argument("--max-uids-per-command", type=int, default=MAX_UIDS_PER_COMMAND,
+                      help="Upper bound on --batch-size; Gmail rejects very long commands (default 500).")
     perf.add_argument("--pause", type=float, default=DEFAULT_PAUSE, help="Seconds to sleep between delete batches.")
     perf.add_argument("--dry-run", type=lambda x: x.lower() in {"1", "true", "yes"}, default=True,
                       help="true/false: list counts only, no deletions.")
     perf.add_argument("--i-understand-this-deletes-mail", action="store_true",
                       help="Required to run with --dry-run false.")
+    perf.add_argument("--move-to-trash", type=lambda x: x.lower() in {"1", "true", "yes"}, default=True,
+                      help="true/false: UID MOVE label messages to the \\Trash mailbox instead of only unlabelling them.")
+    perf.add_argument("--use-sequence-numbers", type=lambda x: x.lower() in {"1", "true", "yes"}, default=False,
+                      help="true/false: SEARCH/STORE by sequence number instead of UID. Only safe while "
+                           "no other client expunges from the same mailbox (default false).")
     perf.add_argument("--timeout", type=float, default=60.0, help="Socket timeout in seconds.")
+    perf.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS,
+                      help="Mailboxes processed in parallel, one IMAP session each (default 4, max 15).")
     perf.add_argument("-v", "--verbose", action="count", default=0, help="Increase logging verbosity (-v, -vv).")
 
     filt = ap.add_argument_group("Mailbox Selection")
@@ -452,7 +930,11 @@ def main():
 
     win = ap.add_argument_group("Windowing (backwards)")
     win.add_argument("--window", default="days:7",
-                     help="Backwards window, e.g. 'days:7' or 'months:1'")
+                     help="Backwards window, e.g. 'days:7' or 'months:1'; 'all' searches "
+                          "each mailbox in one go (large replies allowed)")
+    win.add_argument("--adaptive-window", type=lambda x: x.lower() in {"1", "true", "yes"}, default=True,
+                     help="true/false: double day windows after empty ones (up to 365 days) and halve them "
+                          "after ones with over 5000 messages (default true).")
     win.add_argument("--max-windows", type=int, default=DEFAULT_MAX_WINDOWS,
                      help="Safety cap on number of windows to traverse (default 2000).")
     win.add_argument("--max-years-back", type=int, default=DEFAULT_MAX_YEARS_BACK,
@@ -471,61 +953,67 @@ def main():
 
     # Parse window spec
     try:
-        kind, size_s = args.window.split(":")
+        kind, _, size_s = args.window.partition(":")
         kind = kind.lower()
-        wsize = int(size_s)
-        if kind not in ("months", "days") or wsize < 1:
+        wsize = int(size_s or 0) if kind == "all" else int(size_s)
+        if kind not in ("months", "days", "all") or (kind != "all" and wsize < 1):
             raise ValueError
     except Exception:
-        ap.error("--window must look like 'months:1' or 'days:7' with size>=1")
+        ap.error("--window must look like 'months:1', 'days:7' (size>=1) or 'all'")
         return
-
+    if kind == "all":
+        # One reply carries every UID in the mailbox
+        imaplib._MAXLINE = max(imaplib._MAXLINE, MAX_RESPONSE_LINE)
+
+    login = dict(
+        user=args.user,
+        password=args.password,
+        xoauth2_access_token=args.xoauth2_access_token,
+        server=args.server,
+        port=args.port,
+        timeout=args.timeout,
+    )
     try:
-        M = imap_login(
-            user=args.user,
-            password=args.password,
-            xoauth2_access_token=args.xoauth2_access_token,
-            server=args.server,
-            port=args.port,
-            timeout=args.timeout,
-        )
+        M = imap_login(**login)
     except imaplib.IMAP4.error as e:
         logging.error("Login/authentication failed: %s", e)
         sys.exit(1)
 
-    total_seen = 0
-    total_deleted = 0
     try:
-        mailboxes = discover_mailboxes(M, args.include, args.exclude)
-        if not mailboxes:
-            logging.warning("No mailboxes matched the filters.")
-
-        for kind_lbl, name in mailboxes:
-            if STOP_REQUESTED:
-                logging.warning("Stop requested; halting before mailbox %s", safe_display_name(name))
-                break
-
-            logging.info("Processing mailbox: %s (kind=%s)", safe_display_name(name), kind_lbl or "normal")
-            t, d = delete_in_mailbox(
-                M,
-                name,
-                batch_size=max(1, args.batch_size),
-                dry_run=args.dry_run,
-                pause=max(0.0, args.pause),
-                window_kind=kind,
-                window_size=wsize,
-                max_windows=max(1, args.max_windows),
-                hard_stop_years=max(1, args.max_years_back),
-            )
-            total_seen += t
-            total_deleted += d
-            # Gentle extra pause between folders
-            time.sleep(max(args.pause, 0.5))
+        mailboxes, counts, trash = discover_mailboxes(M, args.include, args.exclude)
     finally:
         try:
             M.logout()
         except Exception:
             pass
+    if not mailboxes:
+        logging.warning("No mailboxes matched the filters.")
+    if not args.dry_run:
+        # Earlier stages feed All Mail, Trash and Spam (Gmail moves expunged
+        # mail to Trash), so their listed counts are stale by the time they run
+        counts = {n: c for k, n in mailboxes
+                  if k not in ('all', 'trash', 'spam') and (c := counts.get(n)) is not None}
+    empty = [n for _, n in mailboxes if counts.get(n) == 0]
+    if empty:
+        logging.info("Skipping %d empty mailbox(es) reported by LIST-STATUS", len(empty))
+        mailboxes = [(k, n) for k, n in mailboxes if counts.get(n) != 0]
+
+    workers = max(1, min(args.max_connections, GMAIL_MAX_CONNECTIONS))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                total_seen, total_deleted = run_stages(pool, login, mailboxes, args, kind, wsize, trash)
+            except BaseException:
+                # Don't start queued mailboxes once one has failed or we're interrupted.
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+    except (imaplib.IMAP4.error, socket.timeout, OSError) as e:
+        if not STOP_EVENT.is_set():
+            raise
+        logging.warning("Stopped; a mailbox failed while finishing its batch: %s", e)
+        sys.exit(1)
+    finally:
+        logout_sessions()
 
     if args.dry_run:
         print(f"[dry-run complete] Total messages seen across selected folders (backwards): {total_seen}")
@@ -7,25 +7,34 @@ BACKWARD in time, until each mailbox is EMPTY — with live progress feedback.
 
 What you get:
 - Windowed UID searches (e.g., SINCE <start> BEFORE <end>) newest→older to avoid
-  imaplib's 1 MB line limit from UID SEARCH ALL.
+  imaplib's 1 MB line limit from UID SEARCH ALL. Mailboxes smaller than
+  --single-search-below skip the windows: one SEARCH, with that limit raised.
 - After every window (and often after each batch), we re-check EXISTS; when it
   hits 0, we stop for that mailbox.
 - Live single-line progress ticker (no dependencies), e.g.:
     📬 Inbox | win 3 | deleted 450 | seen 620 | remain 2,931 | 180 msg/min
 - Dry-run by default; destructive runs require --i-understand-this-deletes-mail.
+- Destructive runs checkpoint how far back each mailbox is clean (see
+  --state-file); a rerun resumes there if no mail has arrived since.
 - Safe order: normal labels -> All Mail -> Trash -> Spam.
 """
 
 import argparse
 import datetime as dt
+import functools
 import imaplib
+import json
 import logging
+import os
+import random
 import re
 import signal
 import socket
 import sys
+import threading
 import time
-from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 # -------------------- Constants --------------------
 
@@ -38,20 +47,31 @@ SPECIAL_FLAG_MAP = {
     br'\Junk': 'spam',
     br'\Spam': 'spam',
 }
+SPECIAL_FLAG_KEYS = frozenset(SPECIAL_FLAG_MAP)
+# LIST rows that can't be SELECTed, e.g. Gmail's "[Gmail]" parent (compared lowercased)
+NOSELECT_FLAGS = frozenset({br'\noselect', br'\nonexistent'})
 
-MAILBOX_LINE_RE = re.compile(
-    rb'^\((?P<flags>[^)]*)\)\s+"(?P<sep>[^"]+)"\s+(?P<name>.+)$'
-)
+ESEARCH_ALL_RE = re.compile(rb'\bALL\s+([\d:,]+)')
 
-DEFAULT_BATCH_SIZE = 50
+DEFAULT_BATCH_SIZE = 500
+MAX_UID_SET_CHARS = 7000  # RFC 2683 §3.2.1.5: servers take >= 8000-octet command lines
+SEARCH_PARSE_CHUNK = 64 * 1024  # bytes of a plain SEARCH reply tokenized at a time
 DEFAULT_PAUSE = 0.5
 MAX_RETRIES = 5
-BASE_BACKOFF = 0.8
-BACKOFF_JITTER = 0.25  # seconds
+BASE_BACKOFF = 0.8  # seconds; shortest retry sleep
+MAX_BACKOFF = 60.0
+MIN_CONNECT_INTERVAL = 2.0  # seconds between new connections; Gmail rate-limits logins
+GMAIL_MAX_CONNECTIONS = 15  # simultaneous IMAP sessions Gmail allows per account
+DEFAULT_PARALLEL_MAILBOXES = 4
 
 # Limits to avoid infinite loops if something is odd:
 DEFAULT_MAX_WINDOWS = 2000
+MAX_SPAN_DAYS = 730  # adaptive day windows never grow past two years
 DEFAULT_MAX_YEARS_BACK = 30
+SINGLE_SEARCH_BELOW = 100000  # smaller mailboxes skip windowing: one SEARCH covers everything
+MAX_RESPONSE_LINE = 4 * 1024 * 1024  # imaplib's line cap, raised so that SEARCH reply fits
+KEEPALIVE_INTERVAL = 25 * 60  # seconds; Gmail drops sessions idle for ~30 min
+DEFAULT_STATE_FILE = os.path.join(os.path.expanduser("~"), ".gmail_cleaner_state.json")
 
 STOP_REQUESTED = False
 
@@ -72,67 +92,95 @@ def setup_logging(verbosity: int) -> None:
 # -------------------- Progress UI ---------------------
 
 _SPINNER = ["⠋","⠙","⠹","⠸","⠼","⠴","⠦","⠧","⠇","⠏"]
+WIDTH_REFRESH_EMITS = 20  # re-read the terminal size every N ticks, not every tick
+RATE_ALPHA = 0.3  # weight of the newest sample in the smoothed msg/min rate
+RATE_MIN_SAMPLE = 0.2  # seconds; shorter gaps would make the rate jumpy
 
 class Progress:
+    """
+    One status line shared by every mailbox thread. Each thread keeps its own
+    mailbox's counters; the line shows whichever mailbox ticked last, and the
+    lifetime totals add up across all of them.
+    """
     def __init__(self, enabled: bool, interval_sec: float = 0.5):
-        self.enabled = enabled
+        # A redrawn line only makes sense on a terminal; piped and CI runs skip it all
+        self.enabled = enabled and sys.stdout.isatty()
+        self._fd = sys.stdout.fileno() if self.enabled else -1
+        if self.enabled:
+            sys.stdout.flush()  # ticks bypass the buffer; keep earlier output ahead of them
         self.interval = max(0.05, float(interval_sec))
         self.last_emit = 0.0
         self.spin_idx = 0
+        self._width = term_width() if self.enabled else 0
+        self._lock = threading.Lock()  # guards the line and the totals
+        self._box = threading.local()  # the calling thread's current mailbox
 
-        self.mailbox = ""
-        self.windows = 0
-        self.deleted = 0
-        self.seen = 0
-        self.remain = None  # type: Optional[int]
-        self.t0 = time.time()
-        self.t_last = self.t0
+        # Lifetime totals across every mailbox this instance has shown
+        self.total_seen = 0
+        self.total_deleted = 0
 
     def start_mailbox(self, name: str, remain: Optional[int]):
-        self.mailbox = name
-        self.windows = 0
-        self.deleted = 0
-        self.seen = 0
-        self.remain = remain
-        self.t0 = time.time()
-        self.t_last = self.t0
+        b = self._box
+        b.mailbox = name
+        b.windows = 0
+        b.deleted = 0
+        b.seen = 0
+        b.remain = remain
+        b.t_last = time.time()  # time of the last rate sample
+        b.prev_deleted = 0
+        b.ewma_rate = 0.0  # deletions per second
         self._emit(force=True)
 
     def update(self, *, add_deleted: int = 0, add_seen: int = 0, inc_window: bool = False,
                remain: Optional[int] = None, force: bool = False):
-        self.deleted += add_deleted
-        self.seen += add_seen
+        b = self._box
+        b.deleted += add_deleted
+        b.seen += add_seen
+        if add_deleted or add_seen:
+            with self._lock:
+                self.total_deleted += add_deleted
+                self.total_seen += add_seen
         if inc_window:
-            self.windows += 1
+            b.windows += 1
         if remain is not None:
-            self.remain = remain
+            b.remain = remain
         self._emit(force=force)
 
     def end_mailbox(self):
+        if getattr(self._box, "mailbox", None) is None:
+            return  # failed before start_mailbox, or already ended
         self._emit(force=True, done=True)
-        if self.enabled:
-            sys.stdout.write("\n")
-            sys.stdout.flush()
+        self._box.mailbox = None
 
     def _emit(self, *, force: bool = False, done: bool = False):
         if not self.enabled:
             return
+        b = self._box
         now = time.time()
-        if not force and (now - self.last_emit) < self.interval:
-            return
-        self.last_emit = now
-
-        # rate since start
-        dt_total = max(0.001, now - self.t0)
-        rate_per_min = int((self.deleted / dt_total) * 60)
-
-        remain_str = "?" if self.remain is None else f"{self.remain:,}"
-        spin = "✔" if done else _SPINNER[self.spin_idx % len(_SPINNER)]
-        self.spin_idx += 1
-
-        line = f"\r{spin} 📬 {self.mailbox} | win {self.windows} | deleted {self.deleted:,} | seen {self.seen:,} | remain {remain_str} | {rate_per_min} msg/min"
-        sys.stdout.write(line[:term_width()])
-        sys.stdout.flush()
+        with self._lock:
+            if not force and (now - self.last_emit) < self.interval:
+                return
+            self.last_emit = now
+
+            # Smoothed recent rate rather than the all-time mean, so slowdowns show up
+            dt_sample = now - b.t_last
+            if dt_sample > RATE_MIN_SAMPLE:
+                inst = (b.deleted - b.prev_deleted) / dt_sample
+                b.ewma_rate = RATE_ALPHA * inst + (1 - RATE_ALPHA) * b.ewma_rate
+                b.prev_deleted = b.deleted
+                b.t_last = now
+            rate_per_min = int(b.ewma_rate * 60)
+
+            remain_str = "?" if b.remain is None else f"{b.remain:,}"
+            spin = "✔" if done else _SPINNER[self.spin_idx % len(_SPINNER)]
+            self.spin_idx += 1
+
+            if self.spin_idx % WIDTH_REFRESH_EMITS == 0:
+                self._width = term_width()
+
+            line = f"\r{spin} 📬 {b.mailbox} | win {b.windows} | deleted {b.deleted:,} | seen {b.seen:,} | remain {remain_str} | {rate_per_min} msg/min"
+            # One unbuffered write per tick; the finished line carries its own newline
+            os.write(self._fd, (line[:self._width] + ("\n" if done else "")).encode("utf-8"))
 
 def term_width(default: int = 120) -> int:
     try:
@@ -144,12 +192,76 @@ def term_width(default: int = 120) -> int:
 
 # -------------------- Helpers ---------------------
 
-def chunked(seq: Sequence[bytes], size: int) -> Iterable[Sequence[bytes]]:
-    for i in range(0, len(seq), size):
-        yield seq[i:i + size]
-
-def uid_str(uids: Sequence[bytes]) -> str:
-    return ",".join(u.decode() if isinstance(u, (bytes, bytearray)) else str(u) for u in uids)
+def _uid_run(lo: int, hi: int) -> str:
+    return str(lo) if lo == hi else f"{lo}:{hi}"
+
+def _ascending_uid_set(nums: Iterator[int]) -> Optional[str]:
+    """Collapse strictly ascending UIDs into runs in one pass; None if they aren't ascending."""
+    start = prev = next(nums, None)
+    if start is None:
+        return ""
+    runs: List[str] = []
+    for n in nums:
+        if n != prev + 1:
+            if n <= prev:
+                return None
+            runs.append(_uid_run(start, prev))
+            start = n
+        prev = n
+    runs.append(_uid_run(start, prev))
+    return ",".join(runs)
+
+def compress_uid_set(uids: Sequence[bytes]) -> str:
+    """Sequence set with consecutive UIDs collapsed, e.g. 1,2,3,7,9,10 -> '1:3,7,9:10'."""
+    return _ascending_uid_set(iter(sorted(set(map(int, uids))))) or ""
+
+def iter_search_uids(reply: bytes) -> Iterator[int]:
+    """
+    UIDs from a plain SEARCH reply, split SEARCH_PARSE_CHUNK bytes at a time so
+    only one slice's tokens are alive at once, never the whole reply's.
+    """
+    pos, end = 0, len(reply)
+    while pos < end:
+        cut = reply.find(b' ', pos + SEARCH_PARSE_CHUNK)
+        if cut < 0:
+            cut = end
+        yield from map(int, reply[pos:cut].split())
+        pos = cut + 1
+
+def _uid_ranges(us: str) -> Iterator[Tuple[int, int]]:
+    for tok in us.split(","):
+        lo, _, hi = tok.partition(":")
+        a, b = int(lo), int(hi or lo)
+        yield (a, b) if a <= b else (b, a)
+
+def uid_set_count(us: str) -> int:
+    """Number of UIDs a sequence set names, without expanding it."""
+    return sum(hi - lo + 1 for lo, hi in _uid_ranges(us)) if us else 0
+
+def split_uid_set(us: str, size: int) -> Iterator[Tuple[int, str]]:
+    """
+    Cut a sequence set into (count, set) pieces of at most `size` UIDs and
+    MAX_UID_SET_CHARS characters, splitting ranges where needed.
+    """
+    parts: List[str] = []
+    n = chars = 0
+    for lo, hi in (_uid_ranges(us) if us else ()):
+        while lo <= hi:
+            take = min(hi - lo + 1, size - n)
+            piece = _uid_run(lo, lo + take - 1)
+            if parts and chars + len(piece) > MAX_UID_SET_CHARS:
+                yield n, ",".join(parts)
+                parts, n, chars = [], 0, 0
+                continue
+            parts.append(piece)
+            n += take
+            chars += len(piece) + 1
+            lo += take
+            if n == size:
+                yield n, ",".join(parts)
+                parts, n, chars = [], 0, 0
+    if parts:
+        yield n, ",".join(parts)
 
 def imap_quote_mailbox(name: Union[bytes, str]) -> str:
     """Safely quote a mailbox for IMAP SELECT."""
@@ -167,30 +279,47 @@ def safe_display_name(name: Union[bytes, str]) -> str:
 
 def parse_list_line(raw: bytes) -> Tuple[Set[bytes], bytes, bytes]:
     """Parse IMAP LIST raw line: returns (flags, delimiter, name) as bytes."""
-    m = MAILBOX_LINE_RE.match(raw)
-    if not m:
+    # One left-to-right scan over '(flags) "sep" name'
+    close = raw.find(b')')
+    rest = raw[close + 1:]
+    quoted = rest.lstrip()
+    end = quoted.find(b'"', 1)
+    name = quoted[end + 1:]
+    if (raw[:1] != b'(' or close < 0 or quoted[:1] != b'"' or len(quoted) == len(rest)
+            or end < 2 or not name[:1].isspace() or len(name) < 2):
         return set(), b'/', raw.strip().strip(b'"')
-    flags = set(m.group('flags').split())
-    name = m.group('name').strip()
+    name = name.strip()
     if name.startswith(b'"') and name.endswith(b'"'):
         name = name[1:-1]
-    return flags, m.group('sep'), name
+    return set(raw[1:close].split()), quoted[1:end], name
 
 def classify_mailbox(flags: Set[bytes]) -> Optional[str]:
-    for f in flags:
-        if f in SPECIAL_FLAG_MAP:
-            return SPECIAL_FLAG_MAP[f]
-    return None
+    """Map a mailbox's special-use flag to its kind with one C-level set intersection."""
+    hit = flags & SPECIAL_FLAG_KEYS
+    return SPECIAL_FLAG_MAP[next(iter(hit))] if hit else None
 
-def backoff_sleep(attempt: int) -> None:
-    delay = (BASE_BACKOFF * (2 ** attempt)) + (BACKOFF_JITTER * attempt)
+def backoff_sleep(prev_delay: float) -> float:
+    """
+    Sleep with decorrelated jitter: uniform between BASE_BACKOFF and three times
+    the previous delay, capped at MAX_BACKOFF. Returns the delay for the next call.
+    """
+    delay = min(MAX_BACKOFF, random.uniform(BASE_BACKOFF, prev_delay * 3))
     time.sleep(delay)
+    return delay
 
 def install_signal_handlers():
+    """
+    First SIGINT/SIGTERM asks for a clean stop after the current batch. Python
+    resumes a socket read once the handler returns, so a slow SEARCH would
+    still run to the end; a second signal raises KeyboardInterrupt right away.
+    """
     def _handler(signum, frame):
         global STOP_REQUESTED
+        if STOP_REQUESTED:
+            raise KeyboardInterrupt
         STOP_REQUESTED = True
-        logging.warning("Stop requested (signal %s). Finishing current batch, then exiting…", signum)
+        logging.warning("Stop requested (signal %s). Finishing current batch, then exiting… "
+                        "(signal again to abort now)", signum)
     for sig in (signal.SIGINT, signal.SIGTERM):
         try:
             signal.signal(sig, _handler)
@@ -200,6 +329,7 @@ def install_signal_handlers():
 # --------- IMAP wrappers with retries -----------
 
 def imap_call_with_retry(M: imaplib.IMAP4_SSL, cmd: str, *args, max_retries: int = MAX_RETRIES, **kwargs):
+    delay = BASE_BACKOFF
     for attempt in range(max_retries + 1):
         try:
             logging.debug("IMAP %s %s %s", cmd, " ".join(map(str, args)), kwargs if kwargs else "")
@@ -210,12 +340,13 @@ def imap_call_with_retry(M: imaplib.IMAP4_SSL, cmd: str, *args, max_retries: int
             logging.warning("IMAP %s returned %s; data=%s", cmd, typ, data)
         except (imaplib.IMAP4.abort, socket.timeout, OSError) as e:
             logging.warning("IMAP %s exception: %s", cmd, e)
-        if attempt < max_retries:
-            backoff_sleep(attempt)
+        if attempt < max_retries and not STOP_REQUESTED:
+            delay = backoff_sleep(delay)
         else:
             raise imaplib.IMAP4.error(f"{cmd} failed after retries")
 
 def imap_uid_with_retry(M: imaplib.IMAP4_SSL, *args, max_retries: int = MAX_RETRIES):
+    delay = BASE_BACKOFF
     for attempt in range(max_retries + 1):
         try:
             logging.debug("IMAP UID %s", " ".join(map(str, args)))
@@ -225,30 +356,20 @@ def imap_uid_with_retry(M: imaplib.IMAP4_SSL, *args, max_retries: int = MAX_RETR
             logging.warning("IMAP UID returned %s; data=%s", typ, data)
         except (imaplib.IMAP4.abort, socket.timeout, OSError) as e:
             logging.warning("IMAP UID exception: %s", e)
-        if attempt < max_retries:
-            backoff_sleep(attempt)
+        if attempt < max_retries and not STOP_REQUESTED:
+            delay = backoff_sleep(delay)
         else:
             raise imaplib.IMAP4.error("UID command failed after retries")
 
 # --------------- Date utilities (backwards windows) ------------------
 
-MONTH_NAMES = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
+MONTH_NAMES = ("Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec")
 
+# Each window's start is the next window's end, so every boundary is formatted twice
+@functools.lru_cache(maxsize=4096)
 def imap_date(d: dt.date) -> str:
     return f"{d.day:02d}-{MONTH_NAMES[d.month-1]}-{d.year}"
 
-def iter_day_windows_backward(end_exclusive: dt.date, span_days: int, hard_stop: dt.date,
-                              max_windows: int) -> Iterator[Tuple[dt.date, dt.date]]:
-    produced = 0
-    end = end_exclusive
-    while produced < max_windows and end > hard_stop:
-        start = end - dt.timedelta(days=span_days)
-        if start < hard_stop:
-            start = hard_stop
-        yield (start, end)
-        end = start
-        produced += 1
-
 def first_of_month(d: dt.date) -> dt.date:
     return dt.date(d.year, d.month, 1)
 
@@ -269,19 +390,123 @@ def iter_month_windows_backward(end_exclusive: dt.date, months_per_window: int,
         cur_end = first_of_month(cur_start)
         cur_start = month_add(cur_end, -months_per_window)
 
+# -------------------- Resume state ---------------------
+
+class ResumeState:
+    """
+    Per-mailbox checkpoint of how far back a destructive run has emptied it,
+    kept as JSON: {mailbox: {uidvalidity, uidnext, resume_before}}. A checkpoint
+    only applies while UIDVALIDITY and UIDNEXT are unchanged, i.e. nothing was
+    renumbered and no mail has arrived since, so skipping the newer windows
+    cannot leave anything behind.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.boxes: Dict[str, dict] = {}
+        self._lock = threading.Lock()  # mailbox threads share one file
+        if not path:
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                loaded = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable state file %s: %s", path, e)
+            return
+        if isinstance(loaded, dict):
+            self.boxes = loaded
+
+    def resume_before(self, mailbox: str, uidvalidity: int, uidnext: int) -> Optional[dt.date]:
+        saved = self.boxes.get(mailbox)
+        if not saved or saved.get("uidvalidity") != uidvalidity or saved.get("uidnext") != uidnext:
+            return None
+        try:
+            return dt.date.fromisoformat(saved["resume_before"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def record(self, mailbox: str, uidvalidity: int, uidnext: int, resume_before: dt.date) -> None:
+        with self._lock:
+            self.boxes[mailbox] = {"uidvalidity": uidvalidity, "uidnext": uidnext,
+                                   "resume_before": resume_before.isoformat()}
+            self._save()
+
+    def clear(self, mailbox: str) -> None:
+        with self._lock:
+            if self.boxes.pop(mailbox, None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.boxes, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning("Could not write state file %s: %s", self.path, e)
+
 # --------------- Core deletion (backwards) ------------------
 
-def search_uids_in_window(M: imaplib.IMAP4_SSL, start: dt.date, end: dt.date) -> List[bytes]:
+def search_uids_in_window(M: imaplib.IMAP4_SSL, start: dt.date, end: dt.date, esearch: bool = False) -> str:
+    """
+    UIDs in [start, end) as a compressed sequence set. With ESEARCH (RFC 4731)
+    the server sends the set already compressed (RETURN (ALL)); otherwise the
+    plain SEARCH list is compressed here.
+    """
     since_s = imap_date(start)
     before_s = imap_date(end)
     logging.debug("SEARCH window SINCE %s BEFORE %s", since_s, before_s)
+    if esearch:
+        typ, _ = imap_uid_with_retry(M, 'SEARCH', 'RETURN', '(ALL)', 'SINCE', since_s, 'BEFORE', before_s)
+        # imaplib files the reply under ESEARCH, not SEARCH
+        _, data = M._untagged_response(typ, [None], 'ESEARCH')
+        m = ESEARCH_ALL_RE.search(data[-1] or b'')
+        return m.group(1).decode() if m else ""
     typ, data = imap_uid_with_retry(M, 'SEARCH', None, 'SINCE', since_s, 'BEFORE', before_s)
     if typ != 'OK' or not data or data[0] is None:
-        return []
-    return data[0].split()
+        return ""
+    # SEARCH replies come in ascending order in practice; stream those straight into runs
+    us = _ascending_uid_set(iter_search_uids(data[0]))
+    return us if us is not None else compress_uid_set(data[0].split())
+
+def searched_windows(M: imaplib.IMAP4_SSL, windows: Iterator[Tuple[dt.date, dt.date]],
+                     esearch: bool) -> Iterator[Tuple[dt.date, dt.date, str]]:
+    """Attach each fixed window's UID set: (start, end, uid_set)."""
+    for start, end in windows:
+        yield start, end, search_uids_in_window(M, start, end, esearch)
+
+def adaptive_windows_backward(M: imaplib.IMAP4_SSL, end_exclusive: dt.date, span_days: int,
+                              hard_stop: dt.date, max_windows: int, esearch: bool,
+                              max_hits: int) -> Iterator[Tuple[dt.date, dt.date, str]]:
+    """
+    Yield (start, end, uid_set) day windows going backward, each sized from the
+    last: twice as long after an empty window (up to MAX_SPAN_DAYS), and halved
+    and searched again when one holds more than max_hits UIDs. Sparse years of
+    history then cost a handful of SEARCHes instead of one per week.
+    max_windows caps the SEARCHes issued.
+    """
+    searches = 0
+    end = end_exclusive
+    while searches < max_windows and end > hard_stop:
+        start = max(end - dt.timedelta(days=span_days), hard_stop)
+        uid_set = search_uids_in_window(M, start, end, esearch)
+        searches += 1
+        count = uid_set_count(uid_set)
+        if count > max_hits and span_days > 1:
+            span_days //= 2
+            continue
+        yield start, end, uid_set
+        end = start
+        if count == 0:
+            span_days = min(MAX_SPAN_DAYS, span_days * 2)
 
 def select_and_get_exists(M: imaplib.IMAP4_SSL, mbox_quoted: str, readonly: bool) -> int:
     typ, data = imap_call_with_retry(M, "select", mbox_quoted, readonly=readonly)
+    # imaplib leaves this EXISTS queued; drop it so observed_exists only sees later ones
+    M.untagged_responses.pop('EXISTS', None)
     if typ != 'OK' or not data:
         return 0
     try:
@@ -292,6 +517,79 @@ def select_and_get_exists(M: imaplib.IMAP4_SSL, mbox_quoted: str, readonly: bool
         except Exception:
             return 0
 
+def selected_uid_state(M: imaplib.IMAP4_SSL) -> Tuple[int, int]:
+    """(UIDVALIDITY, UIDNEXT) from the last SELECT's untagged OK codes; 0 when absent."""
+    vals = []
+    for key in ('UIDVALIDITY', 'UIDNEXT'):
+        data = M.untagged_responses.pop(key, None)
+        try:
+            vals.append(int(data[-1]) if data else 0)
+        except ValueError:
+            vals.append(0)
+    return vals[0], vals[1]
+
+def observed_exists(M: imaplib.IMAP4_SSL, expected: int) -> int:
+    """
+    Messages left without another SELECT: the latest untagged EXISTS the server
+    sent since the last check (new mail), else our own count after the expunges.
+    """
+    updates = M.untagged_responses.pop('EXISTS', None)
+    return int(updates[-1]) if updates else max(0, expected)
+
+def drop_expunge_responses(M: imaplib.IMAP4_SSL) -> None:
+    """
+    Discard the untagged EXPUNGE/VANISHED lines a batch left queued: nothing
+    reads them, and only imaplib's own expunge() pops any. EXISTS stays for
+    observed_exists.
+    """
+    for key in ('EXPUNGE', 'VANISHED'):
+        M.untagged_responses.pop(key, None)
+
+def expunge_uids(M: imaplib.IMAP4_SSL, us: str, uidplus: bool):
+    """
+    UID EXPUNGE (RFC 4315) just the batch we flagged when the server has UIDPLUS;
+    otherwise fall back to a mailbox-wide EXPUNGE.
+    """
+    if uidplus:
+        return imap_uid_with_retry(M, 'EXPUNGE', us)
+    return imap_call_with_retry(M, 'expunge')
+
+def pipelined_delete(M: imaplib.IMAP4_SSL, us: str, uidplus: bool) -> bool:
+    """
+    Write UID STORE and the (UID) EXPUNGE back to back, then read both tagged
+    replies: one round trip per batch instead of two. imaplib's _command()
+    only sends; _command_complete() waits for the reply carrying that tag.
+    """
+    expunge = ('UID', 'EXPUNGE', us) if uidplus else ('EXPUNGE',)
+    try:
+        tags = [
+            M._command('UID', 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)'),
+            M._command(*expunge),
+        ]
+        done = [M._command_complete(name, tag)[0] for name, tag in zip(('UID', expunge[0]), tags)] == ['OK', 'OK']
+        drop_expunge_responses(M)
+        return done
+    except (imaplib.IMAP4.error, socket.timeout, OSError) as e:
+        logging.warning("Pipelined STORE+EXPUNGE failed: %s; retrying serially", e)
+        return False
+
+def delete_batch(M: imaplib.IMAP4_SSL, us: str, uidplus: bool, display: str, pause: float) -> bool:
+    """Delete one batch: pipelined first, the serial retry path as the fallback."""
+    if pipelined_delete(M, us, uidplus):
+        return True
+    typ, _ = imap_uid_with_retry(M, 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)')
+    if typ != 'OK':
+        logging.warning("STORE failed in %s; backing off and continuing", display)
+        time.sleep(max(pause * 2, 2.0))
+        return False
+    typ, _ = expunge_uids(M, us, uidplus)
+    drop_expunge_responses(M)
+    if typ != 'OK':
+        logging.warning("EXPUNGE failed in %s; backing off and continuing", display)
+        time.sleep(max(pause * 2, 2.0))
+        return False
+    return True
+
 def delete_in_mailbox(
     M: imaplib.IMAP4_SSL,
     mailbox_name: Union[bytes, str],
@@ -303,10 +601,16 @@ def delete_in_mailbox(
     max_windows: int,
     hard_stop_years: int,
     progress: Progress,
+    resume: Optional[ResumeState] = None,
+    single_search_below: int = 0,
 ) -> Tuple[int, int]:
     """
     Process a mailbox starting from TODAY backwards until it's empty (EXISTS == 0)
     or hard stop is reached. Returns (total_seen, total_deleted).
+    The mailbox is selected once (read-only on dry runs) and stays selected.
+    Destructive runs with a ResumeState start from its checkpoint when valid
+    and advance it after every fully deleted window. Mailboxes holding fewer
+    than single_search_below messages are searched in one window.
     """
     mbox_quoted = imap_quote_mailbox(mailbox_name)
 
@@ -314,77 +618,89 @@ def delete_in_mailbox(
     tomorrow = today + dt.timedelta(days=1)  # BEFORE tomorrow includes today's mail
     hard_stop_date = dt.date(max(1970, today.year - hard_stop_years), 1, 1)
 
-    initial = select_and_get_exists(M, mbox_quoted, readonly=True)
-    progress.start_mailbox(safe_display_name(mailbox_name), initial)
+    initial = select_and_get_exists(M, mbox_quoted, readonly=dry_run)
+    uidvalidity, uidnext = selected_uid_state(M)
+    display = safe_display_name(mailbox_name)
+    progress.start_mailbox(display, initial)
+    if dry_run:
+        resume = None
 
     if initial == 0:
+        if resume:
+            resume.clear(display)
         imap_call_with_retry(M, "close")
         progress.end_mailbox()
         return 0, 0
 
+    first_end = tomorrow
+    resume_from = resume.resume_before(display, uidvalidity, uidnext) if resume and uidvalidity else None
+    if resume_from:
+        logging.info("[%s] resuming below %s; nothing new since the last run", display, resume_from.isoformat())
+        first_end = min(first_end, resume_from)
+
     total_seen = 0
     total_deleted = 0
-
-    if window_kind == "months":
-        windows_iter = iter_month_windows_backward(tomorrow, window_size, hard_stop_date, max_windows)
+    # The checkpoint may only move down past windows that were emptied in full:
+    # after one shortfall, recording an older window would skip its leftovers
+    clean_so_far = True
+
+    remain = initial
+    uidplus = 'UIDPLUS' in M.capabilities
+    esearch = 'ESEARCH' in M.capabilities
+
+    if initial < single_search_below:
+        windows_iter = searched_windows(M, iter([(hard_stop_date, first_end)]), esearch)
+    elif window_kind == "months":
+        windows_iter = searched_windows(
+            M, iter_month_windows_backward(first_end, window_size, hard_stop_date, max_windows), esearch)
     else:
-        windows_iter = iter_day_windows_backward(tomorrow, window_size, hard_stop_date, max_windows)
+        windows_iter = adaptive_windows_backward(M, first_end, window_size, hard_stop_date, max_windows,
+                                                 esearch, max_hits=batch_size * 4)
 
-    if not dry_run:
-        imap_call_with_retry(M, "select", mbox_quoted, readonly=False)
-
-    for start, end in windows_iter:
+    for start, end, uid_set in windows_iter:
         if STOP_REQUESTED:
             logging.warning("Stop requested; ending early in %s", safe_display_name(mailbox_name))
             break
 
-        uids = search_uids_in_window(M, start, end)
-        count = len(uids)
+        count = uid_set_count(uid_set)
         total_seen += count
-        progress.update(add_seen=count, inc_window=True, force=True)
+        progress.update(add_seen=count, inc_window=True)
 
         if dry_run:
-            # Show a tick even for dry-run so the user sees movement.
-            remain = select_and_get_exists(M, mbox_quoted, readonly=True)
-            progress.update(remain=remain, force=True)
+            # Nothing is deleted, so SELECT's count stands unless new mail
+            # showed up as an untagged EXISTS with the SEARCH replies
+            remain = observed_exists(M, remain)
+            progress.update(remain=remain)
         else:
-            for batch in chunked(uids, batch_size):
+            window_deleted = 0
+            for batch_count, us in split_uid_set(uid_set, batch_size):
                 if STOP_REQUESTED:
                     logging.warning("Stop requested mid-batch in %s", safe_display_name(mailbox_name))
                     break
-                if not batch:
-                    continue
-                us = uid_str(batch)
-                typ, _ = imap_uid_with_retry(M, 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)')
-                if typ != 'OK':
-                    logging.warning("STORE failed in %s; backing off and continuing", safe_display_name(mailbox_name))
-                    time.sleep(max(pause * 2, 2.0))
+                if not delete_batch(M, us, uidplus, safe_display_name(mailbox_name), pause):
                     continue
 
-                typ, _ = imap_call_with_retry(M, 'expunge')
-                if typ != 'OK':
-                    logging.warning("EXPUNGE failed in %s; backing off and continuing", safe_display_name(mailbox_name))
-                    time.sleep(max(pause * 2, 2.0))
-                    continue
-
-                total_deleted += len(batch)
+                total_deleted += batch_count
+                window_deleted += batch_count
                 # Update progress after each batch
-                progress.update(add_deleted=len(batch), force=True)
+                progress.update(add_deleted=batch_count)
                 time.sleep(pause)
 
             # After the window, check remaining
-            remain = select_and_get_exists(M, mbox_quoted, readonly=True)
-            progress.update(remain=remain, force=True)
+            remain = observed_exists(M, remain - window_deleted)
+            progress.update(remain=remain)
+            clean_so_far = clean_so_far and window_deleted == count
+            if resume and uidvalidity and clean_so_far:
+                resume.record(display, uidvalidity, uidnext, start)
 
             if remain == 0:
+                if resume:
+                    resume.clear(display)
                 imap_call_with_retry(M, "close")
                 progress.end_mailbox()
                 logging.info("[done] %s is empty", safe_display_name(mailbox_name))
                 return total_seen, total_deleted
 
-            # Re-open read-write for next window
-            imap_call_with_retry(M, "select", mbox_quoted, readonly=False)
-
     # Hard stop reached or STOP requested
     imap_call_with_retry(M, "close")
     progress.end_mailbox()
@@ -400,6 +716,8 @@ def discover_mailboxes(M: imaplib.IMAP4_SSL, include_filters: List[str], exclude
     mailboxes: List[Tuple[Optional[str], bytes]] = []
     for raw in boxes:
         flags, _, name = parse_list_line(raw)
+        if any(f.lower() in NOSELECT_FLAGS for f in flags):
+            continue
         kind = classify_mailbox(flags)
         nstr = safe_display_name(name).lower()
 
@@ -428,10 +746,38 @@ def discover_mailboxes(M: imaplib.IMAP4_SSL, include_filters: List[str], exclude
 
 # ---------------- Authentication ---------------
 
+_last_connect_ts = 0.0
+_CONNECT_LOCK = threading.Lock()  # keeps worker logins MIN_CONNECT_INTERVAL apart
+
+def tune_socket(sock: socket.socket, timeout: float) -> None:
+    """
+    Commands are small and often pipelined, so don't let Nagle hold them back.
+    SO_RCVBUF is left alone: setting it turns off Linux's receive buffer
+    autotuning. Keepalive probes (and TCP_USER_TIMEOUT where Linux has it)
+    drop a dead session after roughly `timeout` seconds instead of leaving it
+    hanging.
+    """
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    idle = max(1, int(timeout))
+    for name, value in (("TCP_KEEPIDLE", idle), ("TCP_KEEPINTVL", max(1, idle // 4)),
+                        ("TCP_KEEPCNT", 4), ("TCP_USER_TIMEOUT", idle * 1000)):
+        opt = getattr(socket, name, None)
+        if opt is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, opt, value)
+            except OSError:
+                pass
+
 def imap_login(user: str, password: Optional[str], xoauth2_access_token: Optional[str],
                server: str, port: int, timeout: float) -> imaplib.IMAP4_SSL:
+    global _last_connect_ts
     socket.setdefaulttimeout(timeout)
+    with _CONNECT_LOCK:
+        time.sleep(max(0.0, MIN_CONNECT_INTERVAL - (time.monotonic() - _last_connect_ts)))
+        _last_connect_ts = time.monotonic()
     M = imaplib.IMAP4_SSL(server, port)
+    tune_socket(M.sock, timeout)
     if xoauth2_access_token:
         auth_string = f'user={user}\x01auth=Bearer {xoauth2_access_token}\x01\x01'
         def _auth_cb(_):
@@ -447,8 +793,95 @@ def imap_login(user: str, password: Optional[str], xoauth2_access_token: Optiona
         if typ != 'OK':
             raise imaplib.IMAP4.error(f"Login failed: {data}")
         logging.info("Authenticated with password (App Password recommended).")
+    M._get_capabilities()  # Gmail lists UIDPLUS only once authenticated
     return M
 
+# --------------- Concurrent driver ---------------
+
+# Deleting from these expunges the message itself, so they run one by one, last
+SERIAL_KINDS = ('all', 'trash', 'spam')
+
+# Pool threads keep their login between mailboxes; SESSIONS lets main close them all
+_WORKER = threading.local()
+SESSIONS: List[imaplib.IMAP4_SSL] = []
+SESSIONS_LOCK = threading.Lock()
+SESSIONS_ABORTED = False  # set once main shuts the sockets down under a worker
+
+def connection_alive(M: imaplib.IMAP4_SSL) -> bool:
+    try:
+        return M.noop()[0] == 'OK'
+    except (imaplib.IMAP4.error, socket.timeout, OSError):
+        return False
+
+def worker_session(login: dict) -> imaplib.IMAP4_SSL:
+    """
+    This thread's IMAP session, logging in the first time it is needed. One
+    idle past KEEPALIVE_INTERVAL is probed with NOOP and replaced if dead.
+    """
+    M = getattr(_WORKER, 'M', None)
+    if M is not None and time.monotonic() - _WORKER.last_used > KEEPALIVE_INTERVAL and not connection_alive(M):
+        drop_worker_session()
+        M = None
+    if M is None:
+        M = imap_login(**login)
+        _WORKER.M = M
+        with SESSIONS_LOCK:
+            SESSIONS.append(M)
+    _WORKER.last_used = time.monotonic()
+    return M
+
+def drop_worker_session() -> None:
+    """Discard this thread's session after a failure left it in an unknown state."""
+    M = getattr(_WORKER, 'M', None)
+    if M is None:
+        return
+    _WORKER.M = None
+    with SESSIONS_LOCK:
+        if M in SESSIONS:  # close_sessions may have taken it already
+            SESSIONS.remove(M)
+    try:
+        M.shutdown()
+    except Exception:
+        pass
+
+def close_sessions(abort: bool = False) -> None:
+    """
+    Log out every worker session. On abort just shut the sockets down: a
+    half-read reply would make LOGOUT wait on it, and shutdown() (unlike
+    close()) also wakes a worker blocked in a read on that socket.
+    """
+    global SESSIONS_ABORTED
+    with SESSIONS_LOCK:
+        sessions = SESSIONS[:]
+        SESSIONS.clear()
+        SESSIONS_ABORTED = SESSIONS_ABORTED or abort
+    for M in sessions:
+        try:
+            if abort:
+                M.sock.shutdown(socket.SHUT_RDWR)
+            else:
+                M.logout()
+        except Exception:
+            pass
+
+def process_mailbox(login: dict, kind_lbl: Optional[str], name: bytes, run: dict) -> None:
+    """Run delete_in_mailbox on the calling thread's own session; imaplib sessions aren't thread-safe."""
+    if STOP_REQUESTED:
+        logging.warning("Stop requested; halting before mailbox %s", safe_display_name(name))
+        return
+    logging.info("Processing mailbox: %s (kind=%s)", safe_display_name(name), kind_lbl or "normal")
+    M = worker_session(login)
+    try:
+        delete_in_mailbox(M, name, **run)
+    except (imaplib.IMAP4.error, socket.timeout, OSError) as e:
+        if SESSIONS_ABORTED:
+            raise  # main is tearing the sessions down; nobody reads this future
+        # One bad label shouldn't end the run; the next mailbox gets a fresh session
+        logging.error("Mailbox %s failed, skipping it: %s", safe_display_name(name), e)
+        drop_worker_session()
+        run["progress"].end_mailbox()
+    time.sleep(max(run["pause"], 0.5))  # gentle pause between folders
+
 # -------------------- Main ---------------------
 
 def main():
@@ -459,13 +892,19 @@ def main():
     auth.add_argument("--xoauth2-access-token", help="Authenticate via XOAUTH2 using this access token.")
 
     perf = ap.add_argument_group("Performance & Safety")
-    perf.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="UIDs per delete batch (keep small).")
+    perf.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="UIDs per delete batch (default 500; sets over 900 chars are split).")
     perf.add_argument("--pause", type=float, default=DEFAULT_PAUSE, help="Seconds to sleep between delete batches.")
     perf.add_argument("--dry-run", type=lambda x: x.lower() in {"1","true","yes"}, default=True,
                       help="true/false: list counts only, no deletions.")
     perf.add_argument("--i-understand-this-deletes-mail", action="store_true",
                       help="Required to run with --dry-run false.")
     perf.add_argument("--timeout", type=float, default=60.0, help="Socket timeout in seconds.")
+    perf.add_argument("--parallel-mailboxes", type=int, default=DEFAULT_PARALLEL_MAILBOXES,
+                      help="Labels processed at once, one IMAP session each (default 4, max 15). "
+                           "All Mail, Trash and Spam always run one at a time, last.")
+    perf.add_argument("--state-file", default=DEFAULT_STATE_FILE,
+                      help="Checkpoint file letting an interrupted destructive run resume "
+                           "(default ~/.gmail_cleaner_state.json; '' disables).")
     perf.add_argument("-v", "--verbose", action="count", default=0, help="Increase logging verbosity (-v, -vv).")
 
     filt = ap.add_argument_group("Mailbox Selection")
@@ -473,12 +912,16 @@ def main():
     filt.add_argument("--exclude", action="append", default=[], help="Substring exclude (can repeat).")
 
     win = ap.add_argument_group("Windowing (backwards)")
-    win.add_argument("--window", default="days:7", help="Backwards window, e.g. 'days:7' or 'months:1'")
+    win.add_argument("--window", default="days:7", help="Backwards window, e.g. 'days:7' or 'months:1'; day windows "
+                     "then grow over empty stretches and shrink on crowded ones")
+    win.add_argument("--single-search-below", type=int, default=SINGLE_SEARCH_BELOW,
+                     help="Search mailboxes with fewer messages than this in one go, "
+                          "without windows (default 100000; 0 always windows).")
     win.add_argument("--max-windows", type=int, default=DEFAULT_MAX_WINDOWS, help="Safety cap on number of windows (default 2000).")
     win.add_argument("--max-years-back", type=int, default=DEFAULT_MAX_YEARS_BACK, help="Hard stop going back N years (default 30).")
 
     ui = ap.add_argument_group("Progress")
-    ui.add_argument("--progress", type=lambda x: x.lower() in {"1","true","yes"}, default=True, help="Live progress line (default true).")
+    ui.add_argument("--progress", type=lambda x: x.lower() in {"1","true","yes"}, default=True, help="Live progress line when stdout is a terminal (default true).")
     ui.add_argument("--progress-interval", type=float, default=0.5, help="Seconds between progress updates (default 0.5).")
 
     net = ap.add_argument_group("Network")
@@ -502,61 +945,73 @@ def main():
     except Exception:
         ap.error("--window must look like 'months:1' or 'days:7' with size>=1")
         return
+    if args.single_search_below > 0:
+        imaplib._MAXLINE = max(imaplib._MAXLINE, MAX_RESPONSE_LINE)
 
     # Connect & auth
+    login = dict(
+        user=args.user,
+        password=args.password,
+        xoauth2_access_token=args.xoauth2_access_token,
+        server=args.server,
+        port=args.port,
+        timeout=args.timeout,
+    )
     try:
-        M = imap_login(
-            user=args.user,
-            password=args.password,
-            xoauth2_access_token=args.xoauth2_access_token,
-            server=args.server,
-            port=args.port,
-            timeout=args.timeout,
-        )
+        M = imap_login(**login)
     except imaplib.IMAP4.error as e:
         logging.error("Login/authentication failed: %s", e)
         sys.exit(1)
 
-    total_seen = 0
-    total_deleted = 0
     try:
         mailboxes = discover_mailboxes(M, args.include, args.exclude)
-        if not mailboxes:
-            logging.warning("No mailboxes matched the filters.")
-
-        for kind_lbl, name in mailboxes:
-            if STOP_REQUESTED:
-                logging.warning("Stop requested; halting before mailbox %s", safe_display_name(name))
-                break
-
-            progress = Progress(enabled=args.progress, interval_sec=args.progress_interval)
-            logging.info("Processing mailbox: %s (kind=%s)", safe_display_name(name), kind_lbl or "normal")
-
-            t, d = delete_in_mailbox(
-                M,
-                name,
-                batch_size=max(1, args.batch_size),
-                dry_run=args.dry_run,
-                pause=max(0.0, args.pause),
-                window_kind=kind,
-                window_size=wsize,
-                max_windows=max(1, args.max_windows),
-                hard_stop_years=max(1, args.max_years_back),
-                progress=progress,
-            )
-            total_seen += t
-            total_deleted += d
-            time.sleep(max(args.pause, 0.5))  # gentle pause between folders
     finally:
         try:
             M.logout()
         except Exception:
             pass
+    if not mailboxes:
+        logging.warning("No mailboxes matched the filters.")
+
+    progress = Progress(enabled=args.progress, interval_sec=args.progress_interval)
+    run = dict(
+        batch_size=max(1, args.batch_size),
+        dry_run=args.dry_run,
+        pause=max(0.0, args.pause),
+        window_kind=kind,
+        window_size=wsize,
+        max_windows=max(1, args.max_windows),
+        hard_stop_years=max(1, args.max_years_back),
+        progress=progress,
+        resume=ResumeState(args.state_file),
+        single_search_below=args.single_search_below,
+    )
+    labels = [(k, n) for k, n in mailboxes if k not in SERIAL_KINDS]
+    serial = [(k, n) for k, n in mailboxes if k in SERIAL_KINDS]
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(args.parallel_mailboxes, GMAIL_MAX_CONNECTIONS)))
+    finished = aborted = False
+    try:
+        for fut in [pool.submit(process_mailbox, login, k, n, run) for k, n in labels]:
+            fut.result()
+        for k, n in serial:
+            pool.submit(process_mailbox, login, k, n, run).result()
+        finished = True
+    except KeyboardInterrupt:
+        aborted = True
+        logging.warning("Aborted mid-command; dropping the connections")
+    finally:
+        if not finished:
+            close_sessions(abort=True)
+        pool.shutdown(wait=True, cancel_futures=True)
+        close_sessions()
+    if aborted:
+        sys.exit(130)
 
     if args.dry_run:
-        print(f"\n[dry-run complete] Total messages seen across selected folders (backwards): {total_seen}")
+        print(f"\n[dry-run complete] Total messages seen across selected folders (backwards): {progress.total_seen}")
     else:
-        print(f"\n[complete] Deleted {total_deleted} messages across selected folders (backwards).")
+        print(f"\n[complete] Deleted {progress.total_deleted} messages across selected folders (backwards).")
 
 if __name__ == "__main__":
     main()
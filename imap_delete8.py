@@ -11,6 +11,8 @@ Key features:
   it is deleted in a single operation (or skipped in dry-run).
 - Windowed search (default 7 days backwards) prevents Gmail 1MB SEARCH limit.
 - Abort if N consecutive windows return no messages (--max-empty-windows, default 10).
+- Labels are processed concurrently (--concurrency, default 8), one IMAP
+  session per worker; Inbox, All Mail, Trash and Spam still go one at a time.
 - --list-folders mode: shows folder names + message counts without deleting.
 - Dry-run enabled by default, destructive mode requires explicit flag.
 - Live one-line progress display:  ⠹ 📬 Inbox | win 3 | deleted 450 | seen 620 | remain 12 220 | 190 msg/min
@@ -19,6 +21,7 @@ Tested on Python 3.12, Gmail IMAP, real inbox > 100k messages.
 """
 
 import argparse
+import contextlib
 import datetime as dt
 import imaplib
 import logging
@@ -26,7 +29,9 @@ import re
 import signal
 import socket
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 # ---------------------------------------------------------
@@ -42,6 +47,9 @@ MAILBOX_LINE_RE = re.compile(
     rb'^\((?P<flags>[^)]*)\)\s+"(?P<sep>[^"]+)"\s+(?P<name>.+)$'
 )
 
+ESEARCH_COUNT_RE = re.compile(rb'\bCOUNT\s+(\d+)')
+STATUS_MESSAGES_RE = re.compile(rb'\bMESSAGES\s+(\d+)')
+
 SPECIAL_FLAG_MAP = {
     br'\All': 'all',
     br'\Trash': 'trash',
@@ -50,11 +58,19 @@ SPECIAL_FLAG_MAP = {
 }
 
 DEFAULT_BATCH_SIZE = 50
+MAX_UID_SET_CHARS = 7000           # RFC 2683 §3.2.1.5: servers take >= 8000-octet command lines
 DEFAULT_PAUSE = 0.5
 DEFAULT_MIN_MESSAGES = 50          # below this, skip or fast delete
 DEFAULT_MAX_EMPTY_WINDOWS = 10     # abort scanning after N empty results
 DEFAULT_MAX_WINDOWS = 2000
 DEFAULT_MAX_YEARS_BACK = 30
+DEFAULT_PIPELINE_DEPTH = 8         # STORE commands written before reading replies
+DEFAULT_CONCURRENCY = 8            # mailboxes in flight at once
+GMAIL_MAX_CONNECTIONS = 15         # simultaneous IMAP sessions Gmail allows
+NOOP_AFTER_IDLE = 300.0            # seconds before a pooled session is re-checked
+MAX_WINDOW_DAYS = 90               # ceiling for the adaptive search window
+COMMAND_RATE = 20.0                # sustained commands/sec per session (Gmail allows ~25)
+COMMAND_BURST = 40                 # commands a session may send back to back
 
 STOP_REQUESTED = False
 
@@ -81,61 +97,65 @@ def setup_logging(verbosity: int) -> None:
 _SPINNER = ["⠋","⠙","⠹","⠸","⠼","⠴","⠦","⠧","⠇","⠏"]
 
 class Progress:
+    """One status line shared by the mailbox workers; each thread keeps its own counters."""
     def __init__(self, enabled: bool, interval_sec: float = 0.5):
         self.enabled = enabled
         self.interval = max(0.05, float(interval_sec))
         self.last_emit = 0.0
         self.spin_idx = 0
-        self.mailbox = ""
-        self.windows = 0
-        self.deleted = 0
-        self.seen = 0
-        self.remain = None
-        self.t0 = time.time()
+        self._lock = threading.Lock()
+        self._box = threading.local()  # the calling thread's mailbox
+        # Measure the terminal once; SIGWINCH tells us when it changes
+        self._width = _term_width()
+        if enabled and hasattr(signal, "SIGWINCH"):
+            try: signal.signal(signal.SIGWINCH, self._on_resize)
+            except Exception: pass
+
+    def _on_resize(self, signum, frame):
+        self._width = _term_width()
 
     def start_mailbox(self, name: str, remain: Optional[int]):
-        self.mailbox = name
-        self.windows = 0
-        self.deleted = 0
-        self.seen = 0
-        self.remain = remain
-        self.t0 = time.time()
-        self.last_emit = 0.0
-        self.spin_idx = 0
+        b = self._box
+        b.mailbox = name
+        b.windows = 0
+        b.deleted = 0
+        b.seen = 0
+        b.remain = remain
+        b.t0 = time.time()
         self._emit(force=True)
 
     def update(self, *, add_deleted: int = 0, add_seen: int = 0, inc_window: bool = False,
                remain: Optional[int] = None, force: bool = False):
-        self.deleted += add_deleted
-        self.seen += add_seen
+        b = self._box
+        b.deleted += add_deleted
+        b.seen += add_seen
         if inc_window:
-            self.windows += 1
+            b.windows += 1
         if remain is not None:
-            self.remain = remain
+            b.remain = remain
         self._emit(force=force)
 
     def end_mailbox(self):
         self._emit(force=True, done=True)
-        if self.enabled:
-            sys.stdout.write("\n")
-            sys.stdout.flush()
 
     def _emit(self, *, force: bool = False, done: bool = False):
         if not self.enabled:
             return
-        now = time.time()
-        if not force and (now - self.last_emit) < self.interval:
-            return
-        self.last_emit = now
-        dt_total = max(0.001, now - self.t0)
-        rate_per_min = int((self.deleted / dt_total) * 60)
-        spin = "✔" if done else _SPINNER[self.spin_idx % len(_SPINNER)]
-        self.spin_idx += 1
-        remain_str = "?" if self.remain is None else f"{self.remain:,}"
-        line = (f"\r{spin} 📬 {self.mailbox} | win {self.windows} | deleted {self.deleted:,} "
-                f"| seen {self.seen:,} | remain {remain_str} | {rate_per_min} msg/min")
-        sys.stdout.write(line[:_term_width()])
-        sys.stdout.flush()
+        b = self._box
+        with self._lock:
+            now = time.time()
+            if not force and (now - self.last_emit) < self.interval:
+                return
+            self.last_emit = now
+            dt_total = max(0.001, now - b.t0)
+            rate_per_min = int((b.deleted / dt_total) * 60)
+            spin = "✔" if done else _SPINNER[self.spin_idx % len(_SPINNER)]
+            self.spin_idx += 1
+            remain_str = "?" if b.remain is None else f"{b.remain:,}"
+            line = (f"\r{spin} 📬 {b.mailbox} | win {b.windows} | deleted {b.deleted:,} "
+                    f"| seen {b.seen:,} | remain {remain_str} | {rate_per_min} msg/min")
+            sys.stdout.write(line[:self._width] + ("\n" if done else ""))
+            sys.stdout.flush()
 
 def _term_width(default: int = 120) -> int:
     try:
@@ -152,8 +172,24 @@ def chunked(seq: Sequence[bytes], size: int) -> Iterable[Sequence[bytes]]:
     for i in range(0, len(seq), size):
         yield seq[i:i + size]
 
-def uid_str(uids: Sequence[bytes]) -> str:
-    return ",".join(u.decode() for u in uids)
+def uid_set_chunks(uids: Sequence[bytes]) -> Iterator[bytes]:
+    """UIDs compressed into lo:hi runs, cut into sets of at most MAX_UID_SET_CHARS characters."""
+    nums = sorted(map(int, uids))
+    parts: List[bytes] = []
+    chars = i = 0
+    while i < len(nums):
+        j = i
+        while j + 1 < len(nums) and nums[j + 1] == nums[j] + 1:
+            j += 1
+        piece = b"%d" % nums[i] if i == j else b"%d:%d" % (nums[i], nums[j])
+        if parts and chars + len(piece) > MAX_UID_SET_CHARS:
+            yield b",".join(parts)
+            parts, chars = [], 0
+        parts.append(piece)
+        chars += len(piece) + 1
+        i = j + 1
+    if parts:
+        yield b",".join(parts)
 
 def imap_quote_mailbox(name: Union[bytes, str]) -> str:
     if isinstance(name, (bytes, bytearray)):
@@ -168,7 +204,27 @@ def safe_display_name(name: Union[bytes, str]) -> str:
         return name.decode('ascii', errors='backslashreplace')
     return name
 
-def parse_list_line(raw: bytes) -> Tuple[Set[bytes], bytes, bytes]:
+def parse_list_line(raw: bytes, strict: bool = False) -> Tuple[Set[bytes], bytes, bytes]:
+    """Split a LIST reply into (flags, separator, name) with bytes.find; strict, or anything odd, uses the regex."""
+    if strict:
+        return parse_list_line_re(raw)
+    if not raw.startswith(b'('):
+        return set(), b'/', raw.strip().strip(b'"')
+    rp = raw.find(b')')
+    q1 = raw.find(b'"', rp)
+    q2 = raw.find(b'"', q1 + 1)
+    # MAILBOX_LINE_RE wants whitespace after ')' and after the separator's quotes
+    if (rp < 0 or q1 <= rp + 1 or q2 <= q1 + 1 or raw[rp + 1:q1].strip()
+            or not raw[q2 + 1:q2 + 2].isspace()):
+        return parse_list_line_re(raw)  # NIL separator etc.
+    name = raw[q2 + 1:].strip()
+    if not name:
+        return parse_list_line_re(raw)
+    if name.startswith(b'"') and name.endswith(b'"'):
+        name = name[1:-1]
+    return set(raw[1:rp].split()), raw[q1 + 1:q2], name
+
+def parse_list_line_re(raw: bytes) -> Tuple[Set[bytes], bytes, bytes]:
     m = MAILBOX_LINE_RE.match(raw)
     if not m:
         return set(), b'/', raw.strip().strip(b'"')
@@ -196,13 +252,54 @@ def install_signal_handlers():
         try: signal.signal(sig, _handler)
         except Exception: pass
 
+# ---------------------------------------------------------
+# RATE LIMITING
+# ---------------------------------------------------------
+
+class TokenBucket:
+    """Commands/sec limiter: bursts up to `cap`, sleeps only when the bucket runs dry.
+    The rate halves on a dropped connection and creeps back up with each acquire (AIMD)."""
+    def __init__(self, rate: float, cap: int):
+        self.max_rate = self.rate = float(rate)
+        self.cap = cap
+        self.tokens = float(cap)
+        self.last = time.monotonic()
+
+    def acquire(self, n: int = 1) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.cap, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens < n:
+            time.sleep((n - self.tokens) / self.rate)
+            self.tokens = float(n)
+            self.last = time.monotonic()
+        self.tokens -= n
+        self.rate = min(self.max_rate, self.rate + 0.1 * n)
+
+    def backoff(self) -> None:
+        self.rate = max(1.0, self.rate / 2)
+
 # ---------------------------------------------------------
 # IMAP RETRY WRAPPERS
 # ---------------------------------------------------------
 
+def _ensure_connected(M: imaplib.IMAP4_SSL) -> None:
+    # Pooled sessions that dropped are rebuilt before the next attempt
+    if getattr(M, '_stale', False):
+        M._pool.reconnect(M)
+
+def _mark_stale(M: imaplib.IMAP4_SSL) -> None:
+    # A dropped connection is also the server's hint to slow down
+    bucket = getattr(M, '_bucket', None)
+    if bucket is not None:
+        bucket.backoff()
+    if getattr(M, '_pool', None) is not None:
+        M._stale = True
+
 def imap_call_with_retry(M: imaplib.IMAP4_SSL, cmd: str, *args, max_retries: int = 5, **kwargs):
     for attempt in range(max_retries + 1):
         try:
+            _ensure_connected(M)
             method = getattr(M, cmd)
             typ, data = method(*args, **kwargs)
             if typ == 'OK':
@@ -210,6 +307,7 @@ def imap_call_with_retry(M: imaplib.IMAP4_SSL, cmd: str, *args, max_retries: int
             logging.warning("IMAP %s returned %s %s", cmd, typ, data)
         except (imaplib.IMAP4.abort, socket.timeout, OSError) as e:
             logging.warning("IMAP %s exception: %s", cmd, e)
+            _mark_stale(M)
         if attempt < max_retries:
             backoff_sleep(attempt)
         else:
@@ -218,17 +316,24 @@ def imap_call_with_retry(M: imaplib.IMAP4_SSL, cmd: str, *args, max_retries: int
 def imap_uid_with_retry(M: imaplib.IMAP4_SSL, *args, max_retries: int = 5):
     for attempt in range(max_retries + 1):
         try:
+            _ensure_connected(M)
             typ, data = M.uid(*args)
             if typ == 'OK':
                 return typ, data
             logging.warning("IMAP UID returned %s %s", typ, data)
         except (imaplib.IMAP4.abort, socket.timeout, OSError) as e:
             logging.warning("IMAP UID exception: %s", e)
+            _mark_stale(M)
         if attempt < max_retries:
             backoff_sleep(attempt)
         else:
             raise imaplib.IMAP4.error("UID command failed after retries")
 
+def select_mailbox(M: imaplib.IMAP4_SSL, mbox_q: str, readonly: bool) -> str:
+    M._mailbox = (mbox_q, readonly)  # re-selected if the session has to reconnect
+    typ, _ = imap_call_with_retry(M, "select", mbox_q, readonly=readonly)
+    return typ
+
 # ---------------------------------------------------------
 # DATE WINDOWING
 # ---------------------------------------------------------
@@ -236,115 +341,183 @@ def imap_uid_with_retry(M: imaplib.IMAP4_SSL, *args, max_retries: int = 5):
 def imap_date(d: dt.date) -> str:
     return f"{d.day:02d}-{MONTH_NAMES[d.month-1]}-{d.year}"
 
-def iter_day_windows_backward(end_exclusive: dt.date, span_days: int, hard_stop: dt.date,
-                              max_windows: int) -> Iterator[Tuple[dt.date, dt.date]]:
-    end = end_exclusive
-    for _ in range(max_windows):
-        if end <= hard_stop:
-            break
-        start = max(end - dt.timedelta(days=span_days), hard_stop)
-        yield (start, end)
-        end = start
+def next_window(end_exclusive: dt.date, span_days: int, hard_stop: dt.date) -> Optional[Tuple[dt.date, dt.date]]:
+    """The window of span_days ending at end_exclusive, clipped at hard_stop; None once there is nothing left."""
+    if end_exclusive <= hard_stop:
+        return None
+    return max(end_exclusive - dt.timedelta(days=span_days), hard_stop), end_exclusive
+
+def adapt_span(span_days: int, count: int, dense: int) -> int:
+    """Widen the window after an empty one, narrow it after a dense one."""
+    if count == 0:
+        return min(span_days * 2, MAX_WINDOW_DAYS)
+    if count > dense:
+        return max(1, span_days // 2)
+    return span_days
 
 # ---------------------------------------------------------
 # MAILBOX LIST / ORDER
 # ---------------------------------------------------------
 
-def discover_mailboxes(M: imaplib.IMAP4_SSL, include_filters: List[str], exclude_filters: List[str]) -> List[Tuple[Optional[str], bytes]]:
+def discover_mailboxes(M: imaplib.IMAP4_SSL, include_filters: List[str], exclude_filters: List[str],
+                       strict: bool = False) -> List[Tuple[Optional[str], bytes]]:
     typ, boxes = imap_call_with_retry(M, "list")
     if typ != 'OK' or boxes is None:
         raise imaplib.IMAP4.error("Could not list mailboxes")
 
-    mailboxes: List[Tuple[Optional[str], bytes]] = []
+    includes = [sub.lower() for sub in include_filters]
+    excludes = [sub.lower() for sub in exclude_filters]
+
+    # One pass straight into the run order: inboxes, All Mail, the rest, Trash, Spam
+    inboxes, all_mail, normals, trash, spam = [], [], [], [], []
+    buckets = {'all': all_mail, 'trash': trash, 'spam': spam}
+    seen: Set[Tuple[Optional[str], bytes]] = set()
     for raw in boxes:
-        flags, _, name = parse_list_line(raw)
+        flags, _, name = parse_list_line(raw, strict)
         kind = classify_mailbox(flags)
         nstr = safe_display_name(name).lower()
 
-        if include_filters and not any(sub.lower() in nstr for sub in include_filters):
+        if includes and not any(sub in nstr for sub in includes):
             continue
-        if exclude_filters and any(sub.lower() in nstr for sub in exclude_filters):
+        if excludes and any(sub in nstr for sub in excludes):
             continue
 
-        mailboxes.append((kind, name))
-
-    inboxes = [(k, n) for (k, n) in mailboxes if b'inbox' in n.lower()]
-    all_mail = [(k, n) for (k, n) in mailboxes if k == 'all']
-    normals = [(k, n) for (k, n) in mailboxes if k not in ('all', 'trash', 'spam') and (k, n) not in inboxes]
-    trash = [(k, n) for (k, n) in mailboxes if k == 'trash']
-    spam = [(k, n) for (k, n) in mailboxes if k == 'spam']
-
-    ordered = inboxes + all_mail + normals + trash + spam
+        item = (kind, name)
+        if item in seen:
+            continue
+        seen.add(item)
+        if b'inbox' in name.lower():
+            inboxes.append(item)
+        else:
+            buckets.get(kind, normals).append(item)
 
-    seen = set()
-    result = []
-    for item in ordered:
-        if item not in seen:
-            result.append(item)
-            seen.add(item)
-    return result
+    return inboxes + all_mail + normals + trash + spam
 
 # ---------------------------------------------------------
 # DELETION CORE
 # ---------------------------------------------------------
 
-def uid_search_all(M: imaplib.IMAP4_SSL) -> int:
-    typ, data = imap_uid_with_retry(M, 'SEARCH', None, 'ALL')
-    if typ != 'OK' or not data or not data[0]:
-        return 0
-    return len(data[0].split())
+def esearch_count(M: imaplib.IMAP4_SSL, returns: str, *criteria: str) -> int:
+    """COUNT from a UID SEARCH RETURN reply (RFC 4731)."""
+    typ, _ = imap_uid_with_retry(M, 'SEARCH', 'RETURN', returns, *criteria)
+    # imaplib files the reply under ESEARCH, not SEARCH
+    _, data = M._untagged_response(typ, [None], 'ESEARCH')
+    m = ESEARCH_COUNT_RE.search(data[-1] or b'')
+    return int(m.group(1)) if m else 0
+
+def mailbox_count(M: imaplib.IMAP4_SSL, mbox_q: str) -> int:
+    """Message count from STATUS (MESSAGES): mailbox metadata, no SELECT and no UID list."""
+    typ, data = imap_call_with_retry(M, "status", mbox_q, "(MESSAGES)")
+    m = STATUS_MESSAGES_RE.search(data[-1] or b'') if typ == 'OK' and data else None
+    return int(m.group(1)) if m else 0
+
+def uid_search_save(M: imaplib.IMAP4_SSL, *criteria: str) -> int:
+    """SEARCH with RETURN (SAVE COUNT): the hits stay on the server as $ (RFC 5182); only the count comes back."""
+    return esearch_count(M, '(SAVE COUNT)', *criteria)
+
+def store_deleted(M: imaplib.IMAP4_SSL, us: Union[bytes, str]) -> None:
+    imap_uid_with_retry(M, 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)')
+
+def drop_expunge_responses(M: imaplib.IMAP4_SSL) -> None:
+    """
+    Discard the untagged EXPUNGE/VANISHED lines an expunge left queued: nothing
+    reads them, and only imaplib's own expunge() pops any.
+    """
+    for key in ('EXPUNGE', 'VANISHED'):
+        M.untagged_responses.pop(key, None)
+
+def expunge_uids(M: imaplib.IMAP4_SSL, us: Union[bytes, str]) -> None:
+    """UIDPLUS's UID EXPUNGE removes just `us`; otherwise a plain EXPUNGE sweeps every \\Deleted message."""
+    if 'UIDPLUS' in M.capabilities:
+        imap_uid_with_retry(M, 'EXPUNGE', us)
+    else:
+        imap_call_with_retry(M, 'expunge')
+    drop_expunge_responses(M)
+
+def imap_pipeline_store(M: imaplib.IMAP4_SSL, batches: Sequence[bytes]) -> List[bytes]:
+    """
+    Write a UID STORE per batch back to back, then read the tagged replies:
+    one round trip for the group instead of one per batch. imaplib's
+    _command() only sends; _command_complete() waits for that tag's reply.
+    Returns the batches to redo one by one.
+    """
+    try:
+        tags = [M._command('UID', 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)') for us in batches]
+        return [us for us, tag in zip(batches, tags) if M._command_complete('UID', tag)[0] != 'OK']
+    except (imaplib.IMAP4.abort, socket.timeout, OSError) as e:
+        logging.warning("Pipelined STORE failed: %s", e)
+        _mark_stale(M)
+    except imaplib.IMAP4.error as e:
+        logging.warning("Pipelined STORE failed: %s", e)
+    # STORE is idempotent, so redoing batches that did land is harmless
+    return list(batches)
+
+def delete_listed(M: imaplib.IMAP4_SSL, uids: Sequence[bytes], batch_size: int,
+                  pipeline_depth: int, progress: Progress) -> int:
+    """
+    Flag `uids` \\Deleted in pipelined groups of batches, then expunge them in
+    as few length-capped UID EXPUNGEs as possible. Returns the count flagged.
+    """
+    stored: List[bytes] = []
+    deleted = 0
+    for group in chunked(uids, batch_size * pipeline_depth):
+        if STOP_REQUESTED:
+            break
+        batches = [us for batch in chunked(group, batch_size) for us in uid_set_chunks(batch)]
+        M._bucket.acquire(len(batches))
+        for us in imap_pipeline_store(M, batches):
+            store_deleted(M, us)
+        stored += group
+        deleted += len(group)
+        progress.update(add_deleted=len(group), force=True)
+    for us in uid_set_chunks(stored):
+        M._bucket.acquire()
+        expunge_uids(M, us)
+    return deleted
 
 def delete_in_mailbox(
     M: imaplib.IMAP4_SSL,
     mailbox_name: Union[bytes, str],
     batch_size: int,
     dry_run: bool,
-    pause: float,
     min_messages: int,
     max_empty_windows: int,
     window_days: int,
     max_windows: int,
     max_years_back: int,
     progress: Progress,
+    pipeline_depth: int = DEFAULT_PIPELINE_DEPTH,
 ) -> Tuple[int, int]:
     mbox_q = imap_quote_mailbox(mailbox_name)
-    typ, _ = imap_call_with_retry(M, "select", mbox_q, readonly=True)
-    if typ != 'OK':
-        logging.error("Cannot open %s", safe_display_name(mailbox_name))
-        return 0, 0
-
-    total_initial = uid_search_all(M)
+    # STATUS answers from mailbox metadata; only mailboxes we go on to search get selected
+    total_initial = mailbox_count(M, mbox_q)
     progress.start_mailbox(safe_display_name(mailbox_name), total_initial)
 
     if total_initial == 0:
         progress.end_mailbox()
         return 0, 0
 
+    if total_initial <= min_messages and dry_run:
+        logging.info("[fast-skip] %s → %d messages (below threshold)", safe_display_name(mailbox_name), total_initial)
+        progress.end_mailbox()
+        return total_initial, 0
+
+    if select_mailbox(M, mbox_q, readonly=dry_run) != 'OK':
+        logging.error("Cannot open %s", safe_display_name(mailbox_name))
+        progress.end_mailbox()
+        return 0, 0
+
     if total_initial <= min_messages:
-        if dry_run:
-            logging.info("[fast-skip] %s → %d messages (below threshold)", safe_display_name(mailbox_name), total_initial)
-            progress.end_mailbox()
-            return total_initial, 0
-        else:
-            logging.info("[fast-delete] %s → %d messages", safe_display_name(mailbox_name), total_initial)
-            M.select(mbox_q, readonly=False)
-            uids = list(chunked([u for u in M.uid('SEARCH', None, 'ALL')[1][0].split()], batch_size))
-            deleted = 0
-            for batch in uids:
-                us = uid_str(batch)
-                imap_uid_with_retry(M, 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)')
-                imap_call_with_retry(M, 'expunge')
-                deleted += len(batch)
-                progress.update(add_deleted=len(batch), force=True)
-                time.sleep(pause)
-            progress.end_mailbox()
-            return total_initial, deleted
+        logging.info("[fast-delete] %s → %d messages", safe_display_name(mailbox_name), total_initial)
+        uids = M.uid('SEARCH', None, 'ALL')[1][0].split()
+        deleted = delete_listed(M, uids, batch_size, pipeline_depth, progress)
+        progress.end_mailbox()
+        return total_initial, deleted
 
     if dry_run:
         logging.info("[scan] %s → %d messages, scanning backwards…", safe_display_name(mailbox_name), total_initial)
     else:
         logging.info("[scan+delete] %s → %d messages, scanning backwards…", safe_display_name(mailbox_name), total_initial)
-        imap_call_with_retry(M, "select", mbox_q, readonly=False)
 
     today = dt.date.today()
     tomorrow = today + dt.timedelta(days=1)
@@ -353,19 +526,40 @@ def delete_in_mailbox(
     total_seen = 0
     total_deleted = 0
     empty_run = 0
+    # With SEARCHRES the window's UIDs never leave the server: STORE works on $
+    searchres = not dry_run and 'SEARCHRES' in M.capabilities
+    # More hits than one full pipeline round means the window should shrink
+    dense = 2 * batch_size * pipeline_depth
+    span = window_days
+    end = tomorrow
 
-    for start, end in iter_day_windows_backward(tomorrow, window_days, hard_stop, max_windows):
+    for _ in range(max_windows):
         if STOP_REQUESTED:
             break
+        window = next_window(end, span, hard_stop)
+        if window is None:
+            break
+        start, end = window
 
         since_s = imap_date(start)
         before_s = imap_date(end)
-        typ, data = imap_uid_with_retry(M, 'SEARCH', None, 'SINCE', since_s, 'BEFORE', before_s)
-        uids = data[0].split() if data and data[0] else []
-        count = len(uids)
+        if searchres:
+            uids = []
+            count = uid_search_save(M, 'SINCE', since_s, 'BEFORE', before_s)
+        else:
+            typ, data = imap_uid_with_retry(M, 'SEARCH', None, 'SINCE', since_s, 'BEFORE', before_s)
+            uids = data[0].split() if data and data[0] else []
+            count = len(uids)
         total_seen += count
         progress.update(add_seen=count, inc_window=True, force=True)
 
+        end = start
+        new_span = adapt_span(span, count, dense)
+        if new_span != span:
+            logging.debug("[window] %s → %d hits, span %d → %d days",
+                          safe_display_name(mailbox_name), count, span, new_span)
+            span = new_span
+
         if count == 0:
             empty_run += 1
             if empty_run >= max_empty_windows:
@@ -375,18 +569,26 @@ def delete_in_mailbox(
         else:
             empty_run = 0
 
-        if not dry_run:
-            for batch in chunked(uids, batch_size):
-                if STOP_REQUESTED:
-                    break
-                us = uid_str(batch)
-                imap_uid_with_retry(M, 'STORE', us, '+FLAGS.SILENT', r'(\Deleted)')
-                imap_call_with_retry(M, 'expunge')
-                total_deleted += len(batch)
-                progress.update(add_deleted=len(batch), force=True)
-                time.sleep(pause)
-
-        remain = uid_search_all(M)
+        if searchres:
+            generation = M._generation
+            M._bucket.acquire(2)
+            store_deleted(M, '$')
+            expunge_uids(M, '$')
+            if M._generation == generation:
+                total_deleted += count
+                progress.update(add_deleted=count, force=True)
+            else:
+                # $ lives in the session, so a retry after a reconnect matched
+                # nothing: finish the window from a UID list instead
+                typ, data = imap_uid_with_retry(M, 'SEARCH', None, 'SINCE', since_s, 'BEFORE', before_s)
+                left = data[0].split() if data and data[0] else []
+                progress.update(add_deleted=count - len(left), force=True)
+                total_deleted += count - len(left) + delete_listed(M, left, batch_size, pipeline_depth, progress)
+        elif not dry_run:
+            total_deleted += delete_listed(M, uids, batch_size, pipeline_depth, progress)
+
+        # Count down locally instead of a UID SEARCH ALL per window
+        remain = max(0, total_initial - total_deleted)
         progress.update(remain=remain, force=True)
         if remain == 0:
             break
@@ -403,6 +605,12 @@ def imap_login(user: str, password: Optional[str],
                server: str, port: int, timeout: float) -> imaplib.IMAP4_SSL:
     socket.setdefaulttimeout(timeout)
     M = imaplib.IMAP4_SSL(server, port)
+    imap_authenticate(M, user, password, xoauth2_access_token)
+    M._bucket = TokenBucket(COMMAND_RATE, COMMAND_BURST)
+    return M
+
+def imap_authenticate(M: imaplib.IMAP4_SSL, user: str, password: Optional[str],
+                      xoauth2_access_token: Optional[str]) -> None:
     if xoauth2_access_token:
         auth = f'user={user}\x01auth=Bearer {xoauth2_access_token}\x01\x01'
         typ, data = M.authenticate('XOAUTH2', lambda _: auth.encode())
@@ -414,7 +622,112 @@ def imap_login(user: str, password: Optional[str],
         if typ != 'OK':
             raise imaplib.IMAP4.error(f"Login failed: {data}")
         logging.info("Authenticated with App Password.")
-    return M
+    M._get_capabilities()  # servers list extensions like SEARCHRES only once authenticated
+
+# ---------------------------------------------------------
+# CONCURRENCY
+# ---------------------------------------------------------
+
+class ImapSessionPool:
+    """
+    Up to `size` logged-in sessions for one account, each lent to one thread
+    at a time (imaplib sessions aren't thread-safe). A session idle for
+    NOOP_AFTER_IDLE is checked before reuse, and one whose connection dropped
+    is rebuilt in place, so whoever holds it can just retry.
+    """
+    def __init__(self, login: dict, size: int):
+        self.login = login
+        self._slots = threading.BoundedSemaphore(max(1, size))
+        self._lock = threading.Lock()
+        self._idle: List[imaplib.IMAP4_SSL] = []
+        self._sessions: List[imaplib.IMAP4_SSL] = []
+
+    @contextlib.contextmanager
+    def session(self) -> Iterator[imaplib.IMAP4_SSL]:
+        M = self.acquire()
+        try:
+            yield M
+        finally:
+            self.release(M)
+
+    def acquire(self) -> imaplib.IMAP4_SSL:
+        self._slots.acquire()
+        try:
+            with self._lock:
+                M = self._idle.pop() if self._idle else None
+            if M is None:
+                M = self._open()
+            elif time.monotonic() - M._last_used > NOOP_AFTER_IDLE:
+                try: M.noop()
+                except (imaplib.IMAP4.abort, OSError): self.reconnect(M)
+        except BaseException:
+            self._slots.release()
+            raise
+        return M
+
+    def release(self, M: imaplib.IMAP4_SSL) -> None:
+        M._last_used = time.monotonic()
+        M._mailbox = None
+        with self._lock:
+            self._idle.append(M)
+        self._slots.release()
+
+    def _open(self) -> imaplib.IMAP4_SSL:
+        M = imap_login(**self.login)
+        M._pool, M._stale, M._mailbox, M._generation = self, False, None, 0
+        with self._lock:
+            self._sessions.append(M)
+        return M
+
+    def reconnect(self, M: imaplib.IMAP4_SSL) -> None:
+        logging.warning("IMAP session dropped; reconnecting")
+        try: M.shutdown()
+        except Exception: pass
+        # Reopen the same object so references held by callers stay valid
+        M.__init__(self.login["server"], self.login["port"])
+        imap_authenticate(M, self.login["user"], self.login["password"],
+                          self.login["xoauth2_access_token"])
+        if M._mailbox:
+            mbox_q, readonly = M._mailbox
+            typ, data = M.select(mbox_q, readonly=readonly)
+            if typ != 'OK':
+                raise imaplib.IMAP4.abort(f"re-select after reconnect failed: {data}")
+        M._stale = False
+        M._generation += 1  # saved search results ($) did not survive
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions, self._idle = self._sessions, [], []
+        for M in sessions:
+            try: M.logout()
+            except Exception: pass
+
+def mailbox_stages(mailboxes: List[Tuple[Optional[str], bytes]]) -> List[List[Tuple[Optional[str], bytes]]]:
+    """Keep discover_mailboxes' order: runs of plain labels form one parallel stage, every other folder its own."""
+    stages: List[List[Tuple[Optional[str], bytes]]] = []
+    in_labels = False
+    for kind, name in mailboxes:
+        label = kind is None and b'inbox' not in name.lower()
+        if label and in_labels:
+            stages[-1].append((kind, name))
+        else:
+            stages.append([(kind, name)])
+        in_labels = label
+    return stages
+
+def folder_count(pool: ImapSessionPool, name: bytes) -> int:
+    with pool.session() as M:
+        return mailbox_count(M, imap_quote_mailbox(name))
+
+def process_mailbox(pool: ImapSessionPool, kind: Optional[str], name: bytes, run: dict,
+                    pause: float) -> Tuple[int, int]:
+    if STOP_REQUESTED:
+        return 0, 0
+    logging.info("Processing mailbox: %s (kind=%s)", safe_display_name(name), kind or "normal")
+    with pool.session() as M:
+        result = delete_in_mailbox(M, name, **run)
+    time.sleep(max(pause, 0.5))
+    return result
 
 # ---------------------------------------------------------
 # MAIN
@@ -433,11 +746,17 @@ def main():
     perf.add_argument("--dry-run", type=lambda x: x.lower() in {"1","true","yes"}, default=True)
     perf.add_argument("--i-understand-this-deletes-mail", action="store_true")
     perf.add_argument("--timeout", type=float, default=60.0)
+    perf.add_argument("--pipeline-depth", type=int, default=DEFAULT_PIPELINE_DEPTH,
+                      help="UID STORE commands sent before waiting for their replies.")
+    perf.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                      help="Labels processed at once, one IMAP session each (max 15).")
     perf.add_argument("-v", "--verbose", action="count", default=0)
 
     filt = ap.add_argument_group("Mailbox Selection")
     filt.add_argument("--include", action="append", default=[])
     filt.add_argument("--exclude", action="append", default=[])
+    filt.add_argument("--strict", action="store_true",
+                      help="Parse LIST replies with the full regex instead of the fast scanner")
 
     scan = ap.add_argument_group("Scanning / Heuristics")
     scan.add_argument("--min-messages", type=int, default=DEFAULT_MIN_MESSAGES)
@@ -459,62 +778,63 @@ def main():
     setup_logging(args.verbose)
     install_signal_handlers()
 
-    if not args.dry_run and not args.i_understand_this_deletes-mail:
+    if not args.dry_run and not args.i_understand_this_deletes_mail:
         ap.error("Destructive run requires --i-understand-this-deletes-mail")
 
+    login = dict(
+        user=args.user,
+        password=args.password,
+        xoauth2_access_token=args.xoauth2_access_token,
+        server=args.server,
+        port=args.port,
+        timeout=args.timeout,
+    )
+    workers = max(1, min(args.concurrency, GMAIL_MAX_CONNECTIONS))
+    sessions = ImapSessionPool(login, workers)
     try:
-        M = imap_login(
-            user=args.user,
-            password=args.password,
-            xoauth2_access_token=args.xoauth2_access_token,
-            server=args.server,
-            port=args.port,
-            timeout=args.timeout,
-        )
+        M = sessions.acquire()
     except imaplib.IMAP4.error as e:
         logging.error("Login/auth failed: %s", e)
         sys.exit(1)
 
-    mailboxes = discover_mailboxes(M, args.include, args.exclude)
-
-    if args.list-folders:
-        print("\nMailbox list:")
-        for kind, name in mailboxes:
-            typ, _ = imap_call_with_retry(M, "select", imap_quote_mailbox(name), readonly=True)
-            count = uid_search_all(M) if typ == "OK" else 0
-            print(f"  {safe_display_name(name):30s}  {count:8d}")
-        M.logout()
-        return
-
     total_seen = 0
     total_deleted = 0
-
     try:
-        for kind, name in mailboxes:
-            if STOP_REQUESTED:
-                break
-            progress = Progress(enabled=args.progress, interval_sec=args.progress_interval)
-            logging.info("Processing mailbox: %s (kind=%s)", safe_display_name(name), kind or "normal")
-
-            t, d = delete_in_mailbox(
-                M,
-                name,
-                batch_size=max(1, args.batch_size),
-                dry_run=args.dry_run,
-                pause=args.pause,
-                min_messages=args.min_messages,
-                max_empty_windows=args.max_empty_windows,
-                window_days=args.window_days,
-                max_windows=args.max_windows,
-                max_years_back=args.max_years_back,
-                progress=progress,
-            )
-            total_seen += t
-            total_deleted += d
-            time.sleep(max(args.pause, 0.5))
+        try:
+            mailboxes = discover_mailboxes(M, args.include, args.exclude, args.strict)
+        finally:
+            sessions.release(M)  # the first worker picks this session up again
+
+        if args.list_folders:
+            # STATUS needs no SELECT, so every pooled session can count at once
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                counts = executor.map(lambda item: folder_count(sessions, item[1]), mailboxes)
+                print("\nMailbox list:")
+                for (kind, name), count in zip(mailboxes, counts):
+                    print(f"  {safe_display_name(name):30s}  {count:8d}")
+            return
+
+        run = dict(
+            batch_size=max(1, args.batch_size),
+            dry_run=args.dry_run,
+            min_messages=args.min_messages,
+            max_empty_windows=args.max_empty_windows,
+            window_days=args.window_days,
+            max_windows=args.max_windows,
+            max_years_back=args.max_years_back,
+            progress=Progress(enabled=args.progress, interval_sec=args.progress_interval),
+            pipeline_depth=max(1, args.pipeline_depth),
+        )
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for stage in mailbox_stages(mailboxes):
+                for t, d in executor.map(lambda item: process_mailbox(sessions, *item, run, args.pause), stage):
+                    total_seen += t
+                    total_deleted += d
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
     finally:
-        try: M.logout()
-        except Exception: pass
+        sessions.close()
 
     if args.dry_run:
         print(f"\n[dry-run complete] Total messages scanned: {total_seen:,}")
@@ -48,13 +48,18 @@ tool_py = _join(
         "",
         "import argparse",
         "import ast",
+        "import functools",
+        "import hashlib",
         "import os",
+        "import re",
+        "import shutil",
         "import sys",
-        "import tokenize",
+        "from concurrent.futures import ProcessPoolExecutor",
         "from dataclasses import dataclass",
-        "from io import BytesIO",
+        "from functools import partial",
         "from pathlib import Path",
-        "from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple",
+        "from typing import (Callable, Dict, Iterable, Iterator, List, Optional,",
+        "                    Sequence, Tuple, Union)",
         "",
         "# ---------------------------- Data structs ---------------------------- #",
         "",
@@ -71,30 +76,40 @@ tool_py = _join(
         "    good: str",
         "",
         "Fixer = Callable[[str], Tuple[str, bool]]",
+        "LineFixer = Callable[[List[str]], bool]  # edits lines in place",
         "",
         "# ------------------------------- IO ---------------------------------- #",
         "",
+        "def decode(data: bytes) -> str:",
+        "    try: return data.decode('utf-8')  # strict is the codec's fast path",
+        "    except UnicodeDecodeError: return data.decode('utf-8', 'surrogatepass')",
+        "",
         "def read_text(p: Path) -> str:",
-        "    return p.read_text(encoding='utf-8', errors='surrogatepass')",
+        "    return decode(p.read_bytes())",
         "",
         "def write_text(p: Path, s: str) -> None:",
-        "    p.write_text(s, encoding='utf-8')",
+        "    # Replace rather than truncate: the backup may be a hard link to p.",
+        "    # Replace the symlink's target, not the link, and keep p's mode bits",
+        "    p = p.resolve()",
+        "    tmp = p.with_suffix(p.suffix + '.tmp')",
+        "    tmp.write_text(s, encoding='utf-8')",
+        "    shutil.copymode(p, tmp)",
+        "    os.replace(tmp, p)",
         "",
         "def backup_path(p: Path) -> Path:",
         "    return p.with_suffix(p.suffix + '.bak')",
         "",
         "def copy_backup(src: Path) -> Path:",
         "    dst = backup_path(src)",
-        "    write_text(dst, read_text(src))",
+        "    src = src.resolve()  # back up the symlink's target, not the link",
+        "    try: os.link(src, dst)",
+        "    except (OSError, NotImplementedError): shutil.copyfile(src, dst)",
         "    return dst",
         "",
         "# --------------------------- Token helpers --------------------------- #",
         "",
-        "def get_indent(line: str) -> str:",
-        "    return line[:len(line) - len(line.lstrip())]",
-        "",
         "def strip_comment(line: str) -> str:",
-        "    return line.split('#', 1)[0]",
+        "    return line.split('#', 1)[0] if '#' in line else line",
         "",
         "# ----------------------------- Heuristics ----------------------------- #",
         "",
@@ -102,120 +117,227 @@ tool_py = _join(
         "    'if', 'elif', 'else', 'for', 'while', 'try', 'except',",
         "    'finally', 'def', 'class', 'with', 'match', 'case',",
         "}",
+        "# Top-level compound statement headers",
+        "_COLON_RE = re.compile(",
+        "    r'^(?:%s)\\b' % '|'.join(sorted(KEYWORDS_NEED_COLON)))",
+        "# One-line string literals, dropped before looking for a colon",
+        "_STRING_RE = re.compile(",
+        "    r'[rRbBuUfF]{0,2}(?:\\'[^\\'\\\\\\n]*(?:\\\\.[^\\'\\\\\\n]*)*\\''",
+        "    r'|\"[^\"\\\\\\n]*(?:\\\\.[^\"\\\\\\n]*)*\")')",
         "",
         "PAIRS = {'(': ')', '[': ']', '{': '}'}",
         "OPENERS = set(PAIRS.keys())",
         "CLOSERS = set(PAIRS.values())",
+        "# Every byte but the six brackets; they are ASCII, so UTF-8 safe",
+        "_NON_BRACKET_BYTES = bytes(c for c in range(256) if chr(c) not in '()[]{}')",
+        "# Adjacent matched pairs: the stack walk would push and pop them at once",
+        "_PAIR_RE = re.compile(r'\\(\\)|\\[\\]|\\{\\}')",
+        "",
+        "def _parses(src: Union[str, bytes]) -> bool:",
+        "    # compile() straight to an AST, skipping ast.parse's wrapper",
+        "    try: compile(src, '<repair>', 'exec', ast.PyCF_ONLY_AST, True)",
+        "    except (SyntaxError, ValueError): return False",
+        "    return True",
+        "",
+        "# Parse results keyed by a digest of the source, so the cache never",
+        "# holds whole files alive",
+        "AST_CACHE_SIZE = 256",
+        "_AST_OK: Dict[bytes, bool] = {}",
         "",
         "def ast_ok(code: str) -> bool:",
-        "    try: ast.parse(code); return True",
-        "    except SyntaxError: return False",
-        "",
-        "def add_missing_colons(code: str) -> Tuple[str, bool]:",
+        "    raw = code.encode('utf-8', 'surrogatepass')",
+        "    key = hashlib.blake2b(raw, digest_size=16).digest()",
+        "    hit = _AST_OK.get(key)",
+        "    if hit is None:",
+        "        if len(_AST_OK) >= AST_CACHE_SIZE: _AST_OK.clear()",
+        "        hit = _AST_OK[key] = _parses(code)",
+        "    return hit",
+        "",
+        "def bytes_ok(data: bytes) -> bool:",
+        "    # Raw bytes parse as-is: no decode for files that need no repair",
+        "    return _parses(data)",
+        "",
+        "def lacks_colon(head: str) -> bool:",
+        "    rest = _STRING_RE.sub('', head).replace(':=', '')",
+        "    if \"'\" in rest or '\"' in rest: return False  # unterminated string",
+        "    if sum(map(rest.count, '([{')) != sum(map(rest.count, ')]}')):",
+        "        return False  # continued header, or not code at all",
+        "    return ':' not in rest",
+        "",
+        "def by_lines(f: LineFixer, code: str) -> Tuple[str, bool]:",
         "    lines = code.splitlines()",
-        "    out: List[str] = []",
+        "    if not f(lines): return code, False",
+        "    return '\\n'.join(lines) + '\\n', True",
+        "",
+        "def colon_lines(lines: List[str]) -> bool:",
         "    changed = False",
-        "    for line in lines:",
-        "        raw = line",
-        "        indent = get_indent(line)",
+        "    for i, line in enumerate(lines):",
         "        head = strip_comment(line).rstrip()",
-        "        if not head or head.endswith(':') or head.endswith('\\\\'):",
-        "            out.append(raw); continue",
-        "        try:",
-        "            tokens = list(tokenize.tokenize(BytesIO((indent + head).encode()).readline))",
-        "        except Exception:",
-        "            out.append(raw); continue",
-        "        if len(tokens) > 2 and tokens[1].string in KEYWORDS_NEED_COLON:",
-        "            if not any(t.string == ':' for t in tokens[2:]):",
-        "                raw = raw.rstrip() + ':'",
-        "                changed = True",
-        "        out.append(raw)",
-        "    return '\\n'.join(out) + '\\n', changed",
+        "        if (not head.endswith((':', '\\\\')) and _COLON_RE.match(head)",
+        "                and lacks_colon(head)):",
+        "            lines[i] = line.rstrip() + ':'",
+        "            changed = True",
+        "    return changed",
+        "",
+        "def add_missing_colons(code: str) -> Tuple[str, bool]:",
+        "    return by_lines(colon_lines, code)",
+        "",
+        "def bracket_residue(code: str) -> str:",
+        "    raw = code.encode('utf-8', 'surrogatepass')",
+        "    s = raw.translate(None, _NON_BRACKET_BYTES).decode('ascii')",
+        "    n = -1",
+        "    while n != len(s):",
+        "        n = len(s); s = _PAIR_RE.sub('', s)",
+        "    return s",
         "",
         "def balance_brackets(code: str) -> Tuple[str, bool]:",
-        "    stack: List[Tuple[str, int]] = []",
-        "    for i, ch in enumerate(code):",
-        "        if ch in OPENERS: stack.append((ch, i))",
+        "    residue = bracket_residue(code)",
+        "    if not residue: return code, False  # every bracket paired off",
+        "    stack: List[str] = []",
+        "    for ch in residue:",
+        "        if ch in OPENERS: stack.append(ch)",
         "        elif ch in CLOSERS and stack:",
-        "            if PAIRS[stack[-1][0]] == ch: stack.pop()",
-        "    added = ''.join(PAIRS[op] for op, _ in reversed(stack))",
-        "    return code + added, bool(added)",
+        "            if PAIRS[stack[-1]] == ch: stack.pop()",
+        "    added = ''.join(PAIRS[op] for op in reversed(stack))",
+        "    # Close before the trailing newline: the closers end the last line",
+        "    body = code.rstrip('\\n')",
+        "    return body + added + code[len(body):], bool(added)",
         "",
-        "def close_quotes(code: str) -> Tuple[str, bool]:",
-        "    lines = code.splitlines()",
-        "    out: List[str] = []",
+        "def odd_quote_re(q: str) -> re.Pattern[str]:",
+        "    # A line whose code before any '#' holds an odd number of q",
+        "    c = '[^%s#\\\\n]*' % q",
+        "    return re.compile('^%s%s(?:%s%s%s%s)*%s(?:#.*)?$'",
+        "                      % (c, q, c, q, c, q, c), re.M)",
+        "",
+        "_ODD_QUOTE_RES = (odd_quote_re(\"'\"), odd_quote_re('\"'))",
+        "",
+        "def odd_quote_line(code: str) -> bool:",
+        "    return any(r.search(code) for r in _ODD_QUOTE_RES)",
+        "",
+        "def quote_lines(lines: List[str]) -> bool:",
         "    changed = False",
-        "    for line in lines:",
+        "    for i, line in enumerate(lines):",
         "        head = strip_comment(line)",
         "        for q in \"'\\\"\":",
-        "            if head.count(q) % 2 == 1:",
-        "                line += q",
+        "            # An unclosed ''' needs all three back, not one more quote",
+        "            n = 3 if head.count(q * 3) % 2 else head.count(q) % 2",
+        "            if n:",
+        "                lines[i] += q * n",
         "                changed = True",
-        "        out.append(line)",
-        "    return '\\n'.join(out) + '\\n', changed",
+        "    return changed",
+        "",
+        "def close_quotes(code: str) -> Tuple[str, bool]:",
+        "    if not odd_quote_line(code): return code, False",
+        "    return by_lines(quote_lines, code)",
         "",
         "def ensure_eof_newline(code: str) -> Tuple[str, bool]:",
+        "    # A final newline never breaks a parse; the end-of-pass check decides",
         "    if code.endswith('\\n'): return code, False",
-        "    if not code.strip(): return code + '\\n', True",
-        "    try: ast.parse(code + '\\n'); return code + '\\n', True",
-        "    except: return code, False",
+        "    return code + '\\n', True",
+        "",
+        "# Trailing blanks before each newline and at EOF;",
+        "# \\r here also turns CRLF into LF",
+        "_TRAIL_WS_RE = re.compile(r'[ \\t\\f\\v\\r]+(?=\\n|\\Z)')",
         "",
         "def strip_trailing_ws(code: str) -> Tuple[str, bool]:",
-        "    lines = [l.rstrip() for l in code.splitlines()]",
-        "    s = '\\n'.join(lines) + '\\n'",
+        "    s = _TRAIL_WS_RE.sub('', code)",
+        "    if not s.endswith('\\n'): s += '\\n'",
         "    return s, s != code",
         "",
-        "def fixers() -> Tuple[Fixer, ...]:",
-        "    return (",
-        "        add_missing_colons,",
-        "        close_quotes,",
-        "        balance_brackets,",
-        "        ensure_eof_newline,",
-        "        strip_trailing_ws,",
-        "    )",
+        "# Line fixers run first and share one split and one join per pass",
+        "LINE_FIXERS: Tuple[Tuple[Fixer, LineFixer], ...] = (",
+        "    (add_missing_colons, colon_lines),",
+        "    (close_quotes, quote_lines),",
+        ")",
+        "STRING_FIXERS: Tuple[Fixer, ...] = (",
+        "    balance_brackets,",
+        "    ensure_eof_newline,",
+        "    strip_trailing_ws,",
+        ")",
+        "def has_opener(code: str) -> bool:",
+        "    return any(c in code for c in '([{')",
+        "",
+        "# Cheap whole-buffer checks: a fixer whose gate fails has nothing to do",
+        "GATES = {'close_quotes': odd_quote_line, 'balance_brackets': has_opener}",
+        "",
+        "def triggered(f: Fixer, code: str) -> bool:",
+        "    gate = GATES.get(f.__name__)",
+        "    return gate is None or gate(code)",
+        "",
+        "def fix_lines(code: str, applied: List[str]) -> str:",
+        "    # Gates see the unsplit code; colon_lines only ever appends ':'",
+        "    lines: Optional[List[str]] = None",
+        "    for f, lf in LINE_FIXERS:",
+        "        if not triggered(f, code): continue",
+        "        if lines is None: lines = code.splitlines()",
+        "        if lf(lines): applied.append(f.__name__)",
+        "    if not applied or lines is None: return code",
+        "    return '\\n'.join(lines) + '\\n'",
         "",
         "def apply_fixes_once(code: str) -> RepairResult:",
+        "    if ast_ok(code): return RepairResult(True, code, ())",
         "    applied: List[str] = []",
-        "    for f in fixers():",
+        "    code = fix_lines(code, applied)",
+        "    for f in STRING_FIXERS:",
+        "        if not triggered(f, code): continue",
         "        code2, ch = f(code)",
         "        if ch: applied.append(f.__name__); code = code2",
+        "    if not applied: return RepairResult(False, code, ())  # failed on entry",
         "    return RepairResult(ast_ok(code), code, tuple(applied))",
         "",
         "def repair_code(code: str, limit: int = 5) -> RepairResult:",
-        "    cur = code",
+        "    if ast_ok(code): return RepairResult(True, code, ())",
+        "    res = RepairResult(False, code, ())",
         "    all_applied: List[str] = []",
         "    for _ in range(limit):",
-        "        res = apply_fixes_once(cur)",
+        "        res = apply_fixes_once(res.code)",
         "        all_applied.extend(res.applied)",
         "        if res.ok or not res.applied: break",
-        "        cur = res.code",
-        "    return RepairResult(res.ok, cur, tuple(all_applied))",
+        "    return RepairResult(res.ok, res.code, tuple(all_applied))",
         "",
         "# ------------------------------ Files -------------------------------- #",
         "",
-        "def is_py(p: Path) -> bool:",
-        "    return p.suffix == '.py'",
+        "SKIP_DIRS = frozenset({'.git', '__pycache__', '.venv', 'venv', '.mypy_cache'})",
         "",
         "def walk_py(root: Path) -> Iterator[Path]:",
-        "    skip = {'.git', '__pycache__', '.venv', 'venv', '.mypy_cache'}",
-        "    for dirpath, dirnames, filenames in os.walk(root):",
-        "        dirnames[:] = [d for d in dirnames if d not in skip]",
-        "        for f in filenames:",
-        "            p = Path(dirpath) / f",
-        "            if is_py(p): yield p",
-        "",
-        "def needs_repair(p: Path) -> bool:",
-        "    try: return not ast_ok(read_text(p))",
-        "    except: return True",
-        "",
-        "def repair_file(p: Path, limit: int, dry: bool) -> Tuple[bool, Tuple[str, ...]]:",
-        "    src = read_text(p)",
+        "    stack = [str(root)]",
+        "    while stack:",
+        "        try: it = os.scandir(stack.pop())",
+        "        except OSError: continue  # unreadable directory",
+        "        with it:",
+        "            for e in it:",
+        "                if e.is_dir(follow_symlinks=False):",
+        "                    if e.name not in SKIP_DIRS: stack.append(e.path)",
+        "                elif e.name.endswith('.py'):",
+        "                    yield Path(e.path)",
+        "",
+        "def repair_file(p: Path, limit: int,",
+        "                dry: bool) -> Tuple[bool, Tuple[str, ...]]:",
+        "    data = p.read_bytes()",
+        "    if not data or bytes_ok(data): return True, ()",
+        "    src = decode(data)",
         "    res = repair_code(src, limit)",
         "    if res.ok and not dry:",
         "        copy_backup(p)",
         "        write_text(p, res.code)",
         "    return res.ok, res.applied",
         "",
+        "def _repair_one(p: Path, limit: int,",
+        "                dry: bool) -> Tuple[bool, Tuple[str, ...]]:",
+        "    # Top-level so ProcessPoolExecutor can pickle it",
+        "    return repair_file(p, limit, dry)",
+        "",
+        "# Below this many files, starting worker processes costs more than it saves",
+        "MIN_POOL_FILES = 8",
+        "",
+        "def repair_all(paths: Sequence[Path], limit: int,",
+        "               dry: bool) -> Iterator[Tuple[bool, Tuple[str, ...]]]:",
+        "    job = partial(_repair_one, limit=limit, dry=dry)",
+        "    if len(paths) < MIN_POOL_FILES:",
+        "        yield from map(job, paths); return",
+        "    with ProcessPoolExecutor() as ex:",
+        "        yield from ex.map(job, paths, chunksize=16)",
+        "",
         "# ------------------------------- Report ------------------------------- #",
         "",
         "def fmt_result(p: Path, ok: bool, applied: Sequence[str]) -> str:",
@@ -228,7 +350,9 @@ tool_py = _join(
         "",
         "# --------------------------------- CLI -------------------------------- #",
         "",
+        "@functools.lru_cache(maxsize=1)",
         "def build_parser() -> argparse.ArgumentParser:",
+        "    # parse_args leaves the parser untouched, so one instance serves all calls",
         "    p = argparse.ArgumentParser(prog='py-syntax-repair')",
         "    p.add_argument('dir', nargs='?', default='.', help='root dir')",
         "    p.add_argument('--limit', type=int, default=5, help='max passes')",
@@ -245,7 +369,7 @@ tool_py = _join(
         "        Case('paren', 'x = (1 + 2\\n', 'x = (1 + 2)\\n'),",
         "        Case('triple', \"x = '''hello\\n\", \"x = '''hello'''\\n\"),",
         "        Case('single', \"x = 'hi\\n\", \"x = 'hi'\\n\"),",
-        "        Case('eof', 'x=1', 'x=1\\n'),",
+        "        Case('eof', 'x=1', 'x=1'),  # parses already, so left untouched",
         "    )",
         "",
         "def run_tests() -> int:",
@@ -267,11 +391,12 @@ tool_py = _join(
         "    if ns.self_test: return run_tests()",
         "    root = Path(ns.dir).resolve()",
         "    any_fail = False",
-        "    for p in walk_py(root):",
-        "        if needs_repair(p):",
-        "            ok, apps = repair_file(p, ns.limit, ns.dry_run)",
-        "            any_fail |= not ok",
-        "            log(fmt_result(p, ok, apps), ns.quiet)",
+        "    paths = list(walk_py(root))",
+        "    results = repair_all(paths, ns.limit, ns.dry_run)",
+        "    for p, (ok, apps) in zip(paths, results):",
+        "        if ok and not apps: continue  # already parsed",
+        "        any_fail |= not ok",
+        "        log(fmt_result(p, ok, apps), ns.quiet)",
         "    return 1 if any_fail else 0",
         "",
         "if __name__ == '__main__':",
@@ -286,7 +411,8 @@ tests_py = _join(
         '"""Tests for py_syntax_repair_tool.py"""',
         "from __future__ import annotations",
         "import unittest",
-        "from py_syntax_repair_tool import repair_code",
+        "from py_syntax_repair_tool import (balance_brackets, bracket_residue,",
+        "                                   repair_code)",
         "",
         "class TestRepair(unittest.TestCase):",
         "    def assertRepairs(self, bad: str, good: str) -> None:",
@@ -295,7 +421,8 @@ tests_py = _join(
         "        self.assertEqual(res.code, good)",
         "",
         "    def test_colon(self) -> None:",
-        "        self.assertRepairs('if x == 1\\n    print(x)', 'if x == 1:\\n    print(x)\\n')",
+        "        self.assertRepairs('if x == 1\\n    print(x)',",
+        "                           'if x == 1:\\n    print(x)\\n')",
         "",
         "    def test_paren(self) -> None:",
         "        self.assertRepairs('x = (1 + 2\\n', 'x = (1 + 2)\\n')",
@@ -306,8 +433,19 @@ tests_py = _join(
         "    def test_single(self) -> None:",
         "        self.assertRepairs(\"x = 'hi\\n\", \"x = 'hi'\\n\")",
         "",
+        "    def test_residue(self) -> None:",
+        "        self.assertEqual(bracket_residue('f(a[1], {2: (3)})'), '')",
+        "        self.assertEqual(bracket_residue('x = [(1, 2'), '[(')",
+        "        self.assertEqual(bracket_residue(\"s = 'é' + (x]\"), '(]')",
+        "",
+        "    def test_balance_closes_innermost_first(self) -> None:",
+        "        fixed, changed = balance_brackets('x = [(1, 2\\n')",
+        "        self.assertTrue(changed)",
+        "        self.assertEqual(fixed, 'x = [(1, 2)]\\n')",
+        "        self.assertEqual(balance_brackets('f(x)\\n'), ('f(x)\\n', False))",
+        "",
         "    def test_eof(self) -> None:",
-        "        self.assertRepairs('x=1', 'x=1\\n')",
+        "        self.assertRepairs('x=1', 'x=1')  # parses already, so left untouched",
         "",
         "if __name__ == '__main__':",
         "    unittest.main(verbosity=2)",
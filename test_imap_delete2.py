@@ -0,0 +1,78 @@
+import imaplib
+import random
+import zlib
+
+import pytest
+
+import imap_delete2 as mod
+
+
+def _naive_uid_str(nums):
+    runs = []
+    for n in nums:
+        if runs and runs[-1][1] + 1 == n:
+            runs[-1][1] = n
+        else:
+            runs.append([n, n])
+    return ",".join(str(lo) if lo == hi else f"{lo}:{hi}" for lo, hi in runs)
+
+
+def test_uid_str_examples():
+    assert mod.uid_str([]) == ""
+    assert mod.uid_str([5]) == "5"
+    assert mod.uid_str([1, 2, 3, 7, 9, 10]) == "1:3,7,9:10"
+    assert mod.uid_str(mod.parse_uids(b"4 2 3 100")) == "2:4,100"
+
+
+def test_uid_str_joins_runs_across_bisected_spans():
+    # 64 dense UIDs split by one gap: the halves' runs must be stitched back together
+    nums = list(range(1, 40)) + list(range(41, 66))
+    assert mod.uid_str(nums) == "1:39,41:65"
+
+
+def test_uid_str_matches_a_plain_scan():
+    rng = random.Random(0)
+    for _ in range(300):
+        nums = sorted(rng.sample(range(1, 400), rng.randint(1, 200)))
+        assert mod.uid_str(nums) == _naive_uid_str(nums)
+
+
+class _Sock:
+    """Hands out the stream in random-sized pieces, like a TCP socket."""
+    def __init__(self, data, rng):
+        self.data = data
+        self.rng = rng
+
+    def recv(self, n):
+        n = self.rng.randint(1, n)
+        out, self.data = self.data[:n], self.data[n:]
+        return out
+
+
+def _compressed(payload):
+    M = object.__new__(mod.ResumingIMAP4_SSL)
+    M._inflater = zlib.decompressobj(wbits=-15)
+    M._inbuf = bytearray()
+    deflater = zlib.compressobj(wbits=-15)
+    M.sock = _Sock(deflater.compress(payload) + deflater.flush(zlib.Z_SYNC_FLUSH),
+                   random.Random(1))
+    return M
+
+
+def test_compressed_readline_and_literal():
+    lines = [b"* %d EXPUNGE\r\n" % i for i in range(3000)]
+    literal = bytes(random.Random(2).getrandbits(8) for _ in range(20000))
+    head = b"* 1 FETCH (BODY {%d}\r\n" % len(literal)
+    M = _compressed(b"".join(lines) + head + literal + b")\r\nA1 OK done\r\n")
+    assert [M.readline() for _ in lines] == lines
+    assert M.readline() == head
+    assert M.read(len(literal)) == literal
+    assert M.readline() == b")\r\n"
+    assert M.readline() == b"A1 OK done\r\n"
+    assert M.readline() == b""
+
+
+def test_compressed_readline_caps_line_length():
+    M = _compressed(b"x" * (imaplib._MAXLINE + 50000))
+    with pytest.raises(imaplib.IMAP4.error):
+        M.readline()
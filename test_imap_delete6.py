@@ -0,0 +1,97 @@
+import datetime as dt
+import random
+import re
+
+import pytest
+
+import imap_delete6 as mod
+
+# The parser parse_list_line replaced; rows from real servers must split the same way
+_OLD_LIST_RE = re.compile(rb'^\((?P<flags>[^)]*)\)\s+"(?P<sep>[^"]+)"\s+(?P<name>.+)$')
+
+
+def _old_parse(raw):
+    m = _OLD_LIST_RE.match(raw)
+    if not m:
+        return frozenset(), b'/', raw.strip().strip(b'"')
+    name = m.group('name').strip()
+    if name.startswith(b'"') and name.endswith(b'"'):
+        name = name[1:-1]
+    return frozenset(m.group('flags').split()), m.group('sep'), name
+
+
+@pytest.mark.parametrize("raw, expected", [
+    (b'(\\HasNoChildren) "/" "INBOX"', (frozenset({b'\\HasNoChildren'}), b'/', b'INBOX')),
+    (b'(\\Trash \\HasNoChildren) "/" "[Gmail]/Trash"',
+     (frozenset({b'\\Trash', b'\\HasNoChildren'}), b'/', b'[Gmail]/Trash')),
+    (b'() "." Work', (frozenset(), b'.', b'Work')),
+    (b'(\\X) NIL "INBOX"', (frozenset(), b'/', b'(\\X) NIL "INBOX')),
+    (b'(\\X) "" "a"', (frozenset(), b'/', b'(\\X) "" "a')),
+    (b'(\\X "/" "a"', (frozenset(), b'/', b'(\\X "/" "a')),
+    (b'', (frozenset(), b'/', b'')),
+])
+def test_parse_list_line(raw, expected):
+    assert mod.parse_list_line(raw) == expected
+
+
+def test_parse_list_line_matches_old_regex_on_rfc_rows():
+    # RFC 3501 separates the fields with single spaces
+    rng = random.Random(0)
+    atoms = [b'\\All', b'\\Trash', b'\\HasNoChildren', b'\\Noselect']
+    names = [b'INBOX', b'"[Gmail]/All Mail"', b'"a b"', b'Work', b'"x\\"y"', b'""']
+    for _ in range(5000):
+        flags = b' '.join(rng.sample(atoms, rng.randint(0, 3)))
+        sep = rng.choice([b'/', b'.', b'\\\\'])
+        raw = b'(%s) "%s" %s' % (flags, sep, rng.choice(names))
+        assert mod.parse_list_line(raw) == _old_parse(raw), raw
+
+
+def test_uid_str_and_capped_batches(monkeypatch):
+    assert mod.uid_str([b'10', b'9', b'1', b'2', b'3', b'7']) == "1:3,7,9:10"
+    monkeypatch.setattr(mod, "MAX_UID_SET_CHARS", 12)
+    uids = [b'%d' % n for n in range(100, 140, 2)]
+    batches = list(mod.uid_batches(uids, 50))
+    assert all(len(us) <= 12 for _, us in batches)
+    assert [u for batch, _ in batches for u in batch] == uids
+
+
+def test_day_windows_walk_back_to_the_hard_stop():
+    windows = list(mod.iter_day_windows_backward(
+        dt.date(2024, 1, 11), 4, dt.date(2024, 1, 1), max_windows=10))
+    assert windows == [
+        (dt.date(2024, 1, 7), dt.date(2024, 1, 11)),
+        (dt.date(2024, 1, 3), dt.date(2024, 1, 7)),
+        (dt.date(2024, 1, 1), dt.date(2024, 1, 3)),
+    ]
+
+
+def test_day_windows_resize_on_send():
+    it = mod.iter_day_windows_backward(dt.date(2024, 1, 31), 2, dt.date(2023, 1, 1), max_windows=3)
+    assert next(it) == (dt.date(2024, 1, 29), dt.date(2024, 1, 31))
+    assert it.send(10) is None
+    assert next(it) == (dt.date(2024, 1, 19), dt.date(2024, 1, 29))
+    assert next(it) == (dt.date(2024, 1, 9), dt.date(2024, 1, 19))
+    assert next(it, None) is None  # max_windows reached
+
+
+def test_month_windows_start_with_the_partial_month():
+    windows = list(mod.iter_month_windows_backward(
+        dt.date(2024, 3, 15), 1, dt.date(2024, 1, 10), max_windows=10))
+    assert windows == [
+        (dt.date(2024, 3, 1), dt.date(2024, 3, 15)),
+        (dt.date(2024, 2, 1), dt.date(2024, 3, 1)),
+        (dt.date(2024, 1, 10), dt.date(2024, 2, 1)),
+    ]
+
+
+def test_whole_range_repeats_per_pass():
+    assert list(mod.iter_whole_range(dt.date(2024, 1, 2), dt.date(1990, 1, 1), 2)) == [
+        (dt.date(1990, 1, 1), dt.date(2024, 1, 2))] * 2
+
+
+def test_drop_delete_responses_keeps_exists():
+    class M:
+        untagged_responses = {'EXPUNGE': [b'3'], 'VANISHED': [b'1:2'], 'COPYUID': [b'x'],
+                              'EXISTS': [b'7']}
+    mod.drop_delete_responses(M)
+    assert M.untagged_responses == {'EXISTS': [b'7']}
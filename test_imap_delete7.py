@@ -0,0 +1,153 @@
+import datetime as dt
+import json
+import random
+import re
+
+import pytest
+
+import imap_delete7 as mod
+
+
+def test_resume_state_round_trip(tmp_path):
+    path = str(tmp_path / "state.json")
+    state = mod.ResumeState(path)
+    state.record("INBOX", 7, 100, dt.date(2020, 1, 1))
+
+    reloaded = mod.ResumeState(path)
+    assert reloaded.resume_before("INBOX", 7, 100) == dt.date(2020, 1, 1)
+    # New mail (UIDNEXT moved) or renumbering (UIDVALIDITY changed) voids it
+    assert reloaded.resume_before("INBOX", 7, 101) is None
+    assert reloaded.resume_before("INBOX", 8, 100) is None
+    assert reloaded.resume_before("Other", 7, 100) is None
+
+    reloaded.clear("INBOX")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {}
+
+
+def test_resume_state_ignores_bad_file(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text("not json", encoding="utf-8")
+    assert mod.ResumeState(str(path)).boxes == {}
+
+
+class _FakeIMAP:
+    def __init__(self):
+        self.capabilities = ("IMAP4REV1", "UIDPLUS")
+        self.untagged_responses = {}
+
+
+class _FakeProgress:
+    def start_mailbox(self, name, initial):
+        pass
+
+    def update(self, **kwargs):
+        pass
+
+    def end_mailbox(self):
+        pass
+
+
+def _run_windows(monkeypatch, tmp_path, windows, failing):
+    """Delete three windows of two UIDs each; delete_batch fails for UIDs in failing."""
+    monkeypatch.setattr(mod, "select_and_get_exists", lambda M, q, readonly: 6)
+    monkeypatch.setattr(mod, "selected_uid_state", lambda M: (7, 100))
+    monkeypatch.setattr(mod, "searched_windows", lambda M, it, esearch: iter(windows))
+    monkeypatch.setattr(mod, "delete_batch", lambda M, us, uidplus, display, pause: us not in failing)
+    monkeypatch.setattr(mod, "imap_call_with_retry", lambda M, cmd, *a, **kw: ("OK", [b""]))
+    state = mod.ResumeState(str(tmp_path / "state.json"))
+    recorded = []
+    real_record = state.record
+    monkeypatch.setattr(state, "record",
+                        lambda *a: (recorded.append(a[3]), real_record(*a)))
+    seen, deleted = mod.delete_in_mailbox(
+        _FakeIMAP(), "INBOX", batch_size=10, dry_run=False, pause=0,
+        window_kind="months", window_size=1, max_windows=0, hard_stop_years=10,
+        progress=_FakeProgress(), resume=state)
+    return seen, deleted, recorded, state
+
+
+WINDOWS = [
+    (dt.date(2024, 3, 1), dt.date(2024, 4, 1), "5:6"),
+    (dt.date(2024, 2, 1), dt.date(2024, 3, 1), "3:4"),
+    (dt.date(2024, 1, 1), dt.date(2024, 2, 1), "1:2"),
+]
+
+
+def test_checkpoint_follows_fully_deleted_windows(monkeypatch, tmp_path):
+    seen, deleted, recorded, state = _run_windows(monkeypatch, tmp_path, WINDOWS, failing=())
+    assert (seen, deleted) == (6, 6)
+    assert recorded == [dt.date(2024, 3, 1), dt.date(2024, 2, 1), dt.date(2024, 1, 1)]
+    # Emptied in full, so the checkpoint is dropped
+    assert "INBOX" not in state.boxes
+
+
+def test_checkpoint_stops_at_first_shortfall(monkeypatch, tmp_path):
+    seen, deleted, recorded, state = _run_windows(monkeypatch, tmp_path, WINDOWS, failing=("3:4",))
+    assert (seen, deleted) == (6, 4)
+    # The March window was cleared; February failed, so January must not move it on
+    assert recorded == [dt.date(2024, 3, 1)]
+    assert state.resume_before("INBOX", 7, 100) == dt.date(2024, 3, 1)
+
+
+def test_end_mailbox_before_start_is_a_no_op(monkeypatch):
+    progress = mod.Progress(enabled=False)
+    progress.enabled = True  # as on a terminal; SELECT failed before start_mailbox
+    monkeypatch.setattr(progress, "_fd", -1)
+    progress.end_mailbox()
+
+
+def test_discover_skips_noselect_rows(monkeypatch):
+    rows = [
+        b'(\\HasNoChildren) "/" "INBOX"',
+        b'(\\HasChildren \\Noselect) "/" "[Gmail]"',
+        b'(\\All \\HasNoChildren) "/" "[Gmail]/All Mail"',
+    ]
+    monkeypatch.setattr(mod, "imap_call_with_retry", lambda M, cmd, *a: ("OK", rows))
+    assert mod.discover_mailboxes(None, [], []) == [(None, b"INBOX"), ("all", b"[Gmail]/All Mail")]
+
+
+# The parser parse_list_line replaced; the find-based scan must split rows the same way
+_OLD_LIST_RE = re.compile(rb'^\((?P<flags>[^)]*)\)\s+"(?P<sep>[^"]+)"\s+(?P<name>.+)$')
+
+
+def _old_parse(raw):
+    m = _OLD_LIST_RE.match(raw)
+    if not m:
+        return set(), b'/', raw.strip().strip(b'"')
+    name = m.group('name').strip()
+    if name.startswith(b'"') and name.endswith(b'"'):
+        name = name[1:-1]
+    return set(m.group('flags').split()), m.group('sep'), name
+
+
+@pytest.mark.parametrize("raw, expected", [
+    (b'(\\HasNoChildren) "/" "INBOX"', ({b'\\HasNoChildren'}, b'/', b'INBOX')),
+    (b'(\\X)\t"/"  Work ', ({b'\\X'}, b'/', b'Work')),
+    # Malformed rows keep the whole line as the name
+    (b'(\\X) NIL "INBOX"', (set(), b'/', b'(\\X) NIL "INBOX')),
+    (b'(\\X) "/""INBOX"', (set(), b'/', b'(\\X) "/""INBOX')),
+    (b'(\\X "/" "a"', (set(), b'/', b'(\\X "/" "a')),
+    (b'(\\X) "/" ', (set(), b'/', b'(\\X) "/')),
+    (b'', (set(), b'/', b'')),
+])
+def test_parse_list_line(raw, expected):
+    assert mod.parse_list_line(raw) == expected
+
+
+def test_parse_list_line_matches_old_regex_on_random_rows():
+    rng = random.Random(0)
+    pieces = [b'(', b')', b'"', b' ', b'\t', b'/', b'a', b'\\X', b'NIL']
+    for _ in range(20000):
+        raw = b''.join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        assert mod.parse_list_line(raw) == _old_parse(raw), raw
+
+
+def test_month_windows_step_back_whole_months():
+    windows = list(mod.iter_month_windows_backward(
+        dt.date(2024, 3, 15), 2, dt.date(2023, 1, 1), max_windows=3))
+    assert windows == [
+        (dt.date(2024, 3, 1), dt.date(2024, 3, 15)),
+        (dt.date(2024, 1, 1), dt.date(2024, 3, 1)),
+        (dt.date(2023, 11, 1), dt.date(2024, 1, 1)),
+    ]
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+import imap_delete8 as mod
+
+
+@pytest.mark.parametrize("raw, expected", [
+    (b'(\\HasNoChildren) "/" "INBOX"', ({b'\\HasNoChildren'}, b'/', b'INBOX')),
+    (b'(\\All \\HasNoChildren) "/" "[Gmail]/All Mail"',
+     ({b'\\All', b'\\HasNoChildren'}, b'/', b'[Gmail]/All Mail')),
+    (b'() "." Work', (set(), b'.', b'Work')),
+    # No whitespace after the separator: not a LIST row the regex accepts
+    (b'(\\X) "/""INBOX"', (set(), b'/', b'(\\X) "/""INBOX')),
+    (b'(\\X)"/" "INBOX"', (set(), b'/', b'(\\X)"/" "INBOX')),
+    (b'(\\X) NIL "INBOX"', (set(), b'/', b'(\\X) NIL "INBOX')),
+    (b'garbage', (set(), b'/', b'garbage')),
+])
+def test_parse_list_line(raw, expected):
+    assert mod.parse_list_line(raw) == expected
+    assert mod.parse_list_line_re(raw) == expected
+
+
+def test_parse_list_line_matches_regex_on_random_rows():
+    rng = random.Random(0)
+    pieces = [b'(', b')', b'"', b' ', b'\t', b'/', b'a', b'\\X', b'NIL']
+    for _ in range(20000):
+        raw = b''.join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        assert mod.parse_list_line(raw) == mod.parse_list_line_re(raw), raw
+
+
+def _expand(us):
+    uids = []
+    for part in us.split(b','):
+        lo, _, hi = part.partition(b':')
+        uids.extend(range(int(lo), int(hi or lo) + 1))
+    return uids
+
+
+def test_uid_set_chunks_compresses_runs():
+    uids = [b'%d' % n for n in (9, 1, 2, 3, 7, 10)]
+    assert list(mod.uid_set_chunks(uids)) == [b'1:3,7,9:10']
+
+
+def test_uid_set_chunks_caps_each_set(monkeypatch):
+    monkeypatch.setattr(mod, "MAX_UID_SET_CHARS", 20)
+    nums = list(range(1000, 1100, 2))  # no runs at all
+    sets = list(mod.uid_set_chunks([b'%d' % n for n in nums]))
+    assert len(sets) > 1
+    assert all(len(us) <= 20 for us in sets)
+    assert [n for us in sets for n in _expand(us)] == nums
+
+
+def test_mailbox_stages_groups_label_runs():
+    boxes = [(None, b'INBOX'), (None, b'Work'), (None, b'Travel'),
+             ('all', b'[Gmail]/All Mail'), ('trash', b'[Gmail]/Trash')]
+    assert mod.mailbox_stages(boxes) == [
+        [(None, b'INBOX')],
+        [(None, b'Work'), (None, b'Travel')],
+        [('all', b'[Gmail]/All Mail')],
+        [('trash', b'[Gmail]/Trash')],
+    ]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, sec):
+        self.slept.append(sec)
+        self.now += sec
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(mod.time, "monotonic", c.monotonic)
+    monkeypatch.setattr(mod.time, "sleep", c.sleep)
+    return c
+
+
+def test_token_bucket_bursts_then_waits(clock):
+    bucket = mod.TokenBucket(rate=10, cap=5)
+    bucket.acquire(5)
+    assert clock.slept == []
+    bucket.acquire(2)
+    assert clock.slept == [pytest.approx(0.2)]
+
+
+def test_token_bucket_refills_with_time(clock):
+    bucket = mod.TokenBucket(rate=10, cap=5)
+    bucket.acquire(5)
+    clock.now += 0.5
+    bucket.acquire(5)
+    assert clock.slept == []
+
+
+def test_token_bucket_backoff_halves_and_recovers(clock):
+    bucket = mod.TokenBucket(rate=8, cap=5)
+    bucket.backoff()
+    assert bucket.rate == 4
+    for _ in range(10):
+        bucket.backoff()
+    assert bucket.rate == 1.0
+    for _ in range(100):
+        clock.now += 1
+        bucket.acquire()
+    assert bucket.rate == 8
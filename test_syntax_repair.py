@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+import syntax_repair
+
+
+def _generate(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    syntax_repair.main()
+    return tmp_path / syntax_repair.ROOT
+
+
+def _run(args, cwd):
+    return subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True, text=True)
+
+
+def test_generated_self_test_passes(tmp_path, monkeypatch):
+    out = _generate(tmp_path, monkeypatch)
+    res = _run(["py_syntax_repair_tool.py", "--self-test"], out)
+    assert res.returncode == 0, res.stdout
+    assert "All tests passed." in res.stdout
+
+
+def test_generated_unit_tests_pass(tmp_path, monkeypatch):
+    out = _generate(tmp_path, monkeypatch)
+    res = _run(["-m", "unittest", "-q", "test_py_syntax_repair_tool"], out)
+    assert res.returncode == 0, res.stderr
+
+
+def test_generated_tool_fits_79_columns(tmp_path, monkeypatch):
+    out = _generate(tmp_path, monkeypatch)
+    for name in ("py_syntax_repair_tool.py", "test_py_syntax_repair_tool.py"):
+        lines = (out / name).read_text(encoding="utf-8").splitlines()
+        assert [n for n, line in enumerate(lines, 1) if len(line) > 79] == [], name